@@ -3,7 +3,8 @@ from .models import (
     AttendanceSession, AttendanceRecord,
     SisCourse, SisLecturer, SisStudent, SisCourseClass, 
     SisCourseClassLecturer, SisEnrollment,
-    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset
+    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset,
+    BiometricVoiceFeature, BiometricAsset, BiometricJob
 )
 
 
@@ -208,3 +209,29 @@ class BiometricVoiceDatasetAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(BiometricVoiceFeature)
+class BiometricVoiceFeatureAdmin(admin.ModelAdmin):
+    list_display = ['student_nim', 'recording_slot', 'dimensions', 'feature_version', 'updated_at']
+    list_filter = ['feature_version', 'recording_slot']
+    search_fields = ['student_nim']
+    readonly_fields = ['id', 'content_hash', 'vector', 'created_at', 'updated_at']
+    raw_id_fields = ['dataset']
+
+
+@admin.register(BiometricAsset)
+class BiometricAssetAdmin(admin.ModelAdmin):
+    list_display = ['content_hash', 'mime', 'size', 'ref_count', 'created_at']
+    list_filter = ['mime']
+    search_fields = ['content_hash']
+    readonly_fields = ['content_hash', 'mime', 'size', 'ref_count', 'created_at']
+    exclude = ['data']
+
+
+@admin.register(BiometricJob)
+class BiometricJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'action', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind', 'action']
+    readonly_fields = ['id', 'target_id', 'result', 'error', 'created_at', 'started_at', 'finished_at']
+    exclude = ['payload']
@@ -0,0 +1,32 @@
+"""
+Helper untuk membaca data biometrik (foto wajah & rekaman suara)
+yang disimpan sebagai data URL base64 di model Biometric*.
+"""
+import base64
+import binascii
+
+
+FACE_ANGLES = ('front', 'left', 'right', 'up')
+VOICE_SLOTS = (1, 2)
+
+
+def decode_data_url(value, default_mime=''):
+    """
+    Decode string "data:<mime>;base64,<payload>" (atau base64 polos).
+    Return tuple (mime, bytes). Payload kosong/rusak -> (mime, b'').
+    """
+    if not value:
+        return default_mime, b''
+
+    mime = default_mime
+    payload = value
+    if value.startswith('data:') and ',' in value:
+        header, payload = value.split(',', 1)
+        header_mime = header[5:].split(';', 1)[0]
+        if header_mime:
+            mime = header_mime
+
+    try:
+        return mime, base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError):
+        return mime, b''
@@ -0,0 +1,133 @@
+"""
+Laporan cakupan data biometrik per kelas / program studi.
+
+Satu query atas SisEnrollment dengan subquery EXISTS ke tabel biometrik
+(join pada student_nim). Hasil di-cache dengan key berisi versi data
+biometrik yang dihitung dari database (jumlah baris + updated_at terakhir
+tiap tabel), sehingga tulisan dari proses lain (worker
+process_biometric_jobs) langsung terlihat tanpa perlu cache bersama.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, Exists, Max, OuterRef, Q, Value
+
+from .biometrics import FACE_ANGLES, VOICE_SLOTS
+from .models import (
+    SisEnrollment,
+    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset
+)
+
+
+COVERAGE_CACHE_TIMEOUT = 60 * 10
+BIOMETRIC_MODELS = (BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset)
+
+
+def _has_media(field):
+    return Q(**{f'{field}_asset__isnull': False}) | ~Q(**{field: ''})
+
+
+def _complete(fields):
+    condition = Q()
+    for field in fields:
+        condition &= _has_media(field)
+    return condition
+
+
+FACE_FIELDS = [f'face_{angle}' for angle in FACE_ANGLES]
+VOICE_FIELDS = [f'voice_recording_{slot}' for slot in VOICE_SLOTS]
+
+
+def biometric_annotations(nim):
+    """Anotasi EXISTS biometrik untuk OuterRef NIM (dipakai coverage dan roster)."""
+    return {
+        'face_dataset': Exists(
+            BiometricFaceDataset.objects.filter(_complete(FACE_FIELDS), student_nim=nim)
+        ),
+        'voice_dataset': Exists(
+            BiometricVoiceDataset.objects.filter(_complete(VOICE_FIELDS), student_nim=nim)
+        ),
+        'registration': Exists(
+            BiometricRegistration.objects.filter(is_complete=True, student_nim=nim)
+        ),
+    }
+
+
+def classify_coverage(row):
+    """Return (has_face, has_voice, coverage) dari row hasil biometric_annotations."""
+    has_face = row['face_dataset'] or row['registration']
+    has_voice = row['voice_dataset'] or row['registration']
+    if has_face and has_voice:
+        coverage = 'complete'
+    elif has_face:
+        coverage = 'face_only'
+    elif has_voice:
+        coverage = 'voice_only'
+    else:
+        coverage = 'neither'
+    return has_face, has_voice, coverage
+
+
+def build_coverage(class_id=None, program=None):
+    enrollments = SisEnrollment.objects.all()
+    if class_id:
+        enrollments = enrollments.filter(course_class_id=class_id)
+    if program:
+        enrollments = enrollments.filter(course_class__course__program=program)
+
+    nim = OuterRef('student_id')
+    rows = (
+        enrollments
+        .values('student_id', 'student__name')
+        .annotate(**biometric_annotations(nim))
+        .order_by('student_id')
+        .distinct()
+    )
+
+    students = []
+    summary = {'total': 0, 'complete': 0, 'face_only': 0, 'voice_only': 0, 'neither': 0}
+    for row in rows:
+        has_face, has_voice, coverage = classify_coverage(row)
+        summary['total'] += 1
+        summary[coverage] += 1
+        students.append({
+            'nim': row['student_id'],
+            'name': row['student__name'],
+            'has_face': has_face,
+            'has_voice': has_voice,
+            'coverage': coverage,
+        })
+
+    return {
+        'class_id': class_id,
+        'program': program,
+        'summary': summary,
+        'students': students,
+    }
+
+
+def coverage_version():
+    """
+    Versi data biometrik dari database (satu query UNION ALL): berubah setiap
+    kali dataset dibuat, diubah (updated_at) atau dihapus (jumlah baris).
+    """
+    parts = [
+        model.objects.order_by()
+        .annotate(table=Value(model._meta.db_table, output_field=CharField()))
+        .values('table')
+        .annotate(total=Count('pk'), latest=Max('updated_at'))
+        .values_list('table', 'total', 'latest')
+        for model in BIOMETRIC_MODELS
+    ]
+    rows = sorted(parts[0].union(*parts[1:], all=True))
+    return hashlib.sha1(repr(rows).encode('utf-8')).hexdigest()[:16]
+
+
+def get_coverage(class_id=None, program=None):
+    key = f'attendance:biometric-coverage:{coverage_version()}:{class_id or ""}:{program or ""}'
+    report = cache.get(key)
+    if report is None:
+        report = build_coverage(class_id=class_id, program=program)
+        cache.set(key, report, COVERAGE_CACHE_TIMEOUT)
+    return report
+
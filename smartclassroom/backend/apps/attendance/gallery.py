@@ -0,0 +1,174 @@
+"""
+Cache in-process galeri biometrik per sesi absensi.
+
+Saat sesi dimulai, referensi wajah seluruh mahasiswa di kelas tersebut
+dimuat sekali dan disimpan di memori sebagai data URL siap kirim,
+sehingga pengenalan pertama tidak perlu menunggu query ke database dan
+request galeri tidak meng-encode ulang gambar. Asset yang sama (hash
+isi sama) hanya di-encode sekali.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+
+from .biometrics import FACE_ANGLES
+from .models import (
+    AttendanceSession, SisEnrollment,
+    BiometricRegistration, BiometricFaceDataset
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GALLERY_CACHE_SIZE = 8
+
+
+def get_session_student_nims(session):
+    """NIM mahasiswa yang terdaftar pada sesi (record sesi + KRS kelas di SIS)."""
+    nims = set(session.records.values_list('student_id', flat=True))
+    if session.course_id and session.class_name:
+        class_id = f"{session.course_id}_{session.class_name}"
+        nims.update(
+            SisEnrollment.objects.filter(course_class_id=class_id)
+            .values_list('student_id', flat=True)
+        )
+    nims.discard('')
+    return nims
+
+
+def _face_references(row, encoded):
+    """{angle: data URL}; `encoded` memo data URL per content hash asset."""
+    references = {}
+    for angle in FACE_ANGLES:
+        field = f'face_{angle}'
+        asset = getattr(row, f'{field}_asset')
+        if asset is not None:
+            if asset.content_hash not in encoded:
+                encoded[asset.content_hash] = asset.as_data_url()
+            references[angle] = encoded[asset.content_hash]
+            continue
+        value = getattr(row, field)
+        if not value:
+            continue
+        # Data URL lama disimpan apa adanya, tanpa decode / encode ulang
+        if not value.startswith('data:'):
+            value = f"data:{getattr(row, f'{field}_mime', '') or 'image/jpeg'};base64,{value}"
+        references[angle] = value
+    return references
+
+
+def build_class_gallery(nims):
+    """
+    Ambil referensi wajah terbaru untuk setiap NIM.
+    Prioritas BiometricFaceDataset, fallback ke BiometricRegistration.
+    """
+    face_fields = [f'face_{angle}' for angle in FACE_ANGLES]
+
+    gallery = {}
+    encoded = {}
+    for model in (BiometricFaceDataset, BiometricRegistration):
+        pending = [nim for nim in nims if nim not in gallery]
+        if not pending:
+            break
+        rows = (
+            model.objects.filter(student_nim__in=pending)
+            .select_related(*model.media_asset_fields(face_fields))
+            .order_by('student_nim', '-created_at')
+            .iterator()
+        )
+        for row in rows:
+            if row.student_nim in gallery:
+                continue
+            references = _face_references(row, encoded)
+            if references:
+                gallery[row.student_nim] = references
+    return gallery
+
+
+class ClassGalleryCache:
+    """LRU cache galeri per sesi (key: session id)."""
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        if self.max_sessions is not None:
+            return self.max_sessions
+        return getattr(settings, 'ATTENDANCE_GALLERY_CACHE_SIZE', DEFAULT_GALLERY_CACHE_SIZE)
+
+    def get(self, session_id):
+        key = str(session_id)
+        with self._lock:
+            gallery = self._entries.get(key)
+            if gallery is not None:
+                self._entries.move_to_end(key)
+            return gallery
+
+    def put(self, session_id, gallery):
+        key = str(session_id)
+        with self._lock:
+            self._entries[key] = gallery
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.capacity, 1):
+                self._entries.popitem(last=False)
+
+    def evict(self, session_id):
+        with self._lock:
+            self._entries.pop(str(session_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def warm(self, session):
+        """Bangun dan simpan galeri untuk sesi aktif."""
+        if session.status != 'active':
+            self.evict(session.id)
+            return None
+        gallery = build_class_gallery(get_session_student_nims(session))
+        self.put(session.id, gallery)
+        return gallery
+
+    def get_or_warm(self, session):
+        gallery = self.get(session.id)
+        if gallery is None:
+            gallery = self.warm(session)
+        return gallery
+
+    def warm_async(self, session_id):
+        """Warm di background thread agar response create tidak tertahan."""
+        thread = threading.Thread(
+            target=self._warm_by_id, args=(session_id,), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _warm_by_id(self, session_id):
+        try:
+            session = AttendanceSession.objects.filter(pk=session_id).first()
+            if session:
+                self.warm(session)
+        except Exception:
+            logger.exception("Failed to warm biometric gallery for session %s", session_id)
+        finally:
+            connection.close()
+
+
+gallery_cache = ClassGalleryCache()
+
+
+def sync_session_gallery(session, background=True):
+    """Warm galeri untuk sesi aktif, evict untuk sesi completed/cancelled."""
+    if session.status == 'active':
+        if background:
+            gallery_cache.warm_async(session.id)
+        else:
+            gallery_cache.warm(session)
+    else:
+        gallery_cache.evict(session.id)
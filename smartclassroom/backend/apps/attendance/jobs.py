@@ -0,0 +1,163 @@
+"""
+Antrian job biometrik berbasis database.
+
+View hanya menyimpan payload sebagai BiometricJob lalu langsung merespons.
+Worker (`manage.py process_biometric_jobs`) meng-claim job dan menjalankan
+run_job di process pool. Import model dilakukan di dalam fungsi agar modul
+ini aman di-import oleh proses worker sebelum Django di-setup.
+"""
+from datetime import timedelta
+
+
+def _setup_django():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _job_targets():
+    from .models import (
+        BiometricJob,
+        BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset
+    )
+    from .serializers import (
+        BiometricRegistrationSerializer,
+        BiometricFaceDatasetSerializer,
+        BiometricVoiceDatasetSerializer
+    )
+
+    return {
+        BiometricJob.KIND_REGISTRATION: (BiometricRegistration, BiometricRegistrationSerializer),
+        BiometricJob.KIND_FACE_DATASET: (BiometricFaceDataset, BiometricFaceDatasetSerializer),
+        BiometricJob.KIND_VOICE_DATASET: (BiometricVoiceDataset, BiometricVoiceDatasetSerializer),
+    }
+
+
+def enqueue_job(kind, payload, instance=None, partial=False):
+    from .models import BiometricJob
+
+    return BiometricJob.objects.create(
+        kind=kind,
+        action='update' if instance is not None else 'create',
+        partial=partial,
+        target_id=instance.pk if instance is not None else None,
+        payload=payload,
+    )
+
+
+def claim_jobs(limit):
+    """Ambil maksimal `limit` job pending dan tandai running (aman untuk banyak worker)."""
+    from django.db.models import F
+    from django.utils import timezone
+    from .models import BiometricJob
+
+    candidates = BiometricJob.objects.filter(
+        status=BiometricJob.STATUS_PENDING
+    ).order_by('created_at').values_list('id', flat=True)[:limit]
+
+    claimed = []
+    for job_id in list(candidates):
+        updated = BiometricJob.objects.filter(
+            pk=job_id, status=BiometricJob.STATUS_PENDING
+        ).update(
+            status=BiometricJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs(stale_after_minutes, max_attempts, exclude=()):
+    """
+    Job running yang terlalu lama (worker / child process mati) dikembalikan
+    ke pending atau digagalkan. `exclude`: job yang masih dikerjakan worker ini.
+    """
+    from django.utils import timezone
+    from .models import BiometricJob
+
+    cutoff = timezone.now() - timedelta(minutes=stale_after_minutes)
+    stale = BiometricJob.objects.filter(
+        status=BiometricJob.STATUS_RUNNING, started_at__lt=cutoff
+    ).exclude(pk__in=list(exclude))
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=BiometricJob.STATUS_FAILED,
+        error={'message': 'Worker stopped while processing this job.'},
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=BiometricJob.STATUS_PENDING)
+    return requeued, failed
+
+
+def _extract_voice_features(dataset):
+    from .models import BiometricVoiceFeature
+    from .voice_features import build_feature_tasks, process_recording, save_feature_results
+
+    existing = {
+        (feature.dataset_id, feature.recording_slot): feature
+        for feature in BiometricVoiceFeature.objects.filter(dataset=dataset)
+    }
+    tasks, student_nims, _ = build_feature_tasks([dataset], existing)
+    if tasks:
+        save_feature_results([process_recording(task) for task in tasks], student_nims)
+
+
+def run_job(job_id):
+    """Entry point worker: validasi + simpan (decode/dedup asset) + ekstraksi fitur."""
+    _setup_django()
+
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from .models import BiometricJob
+
+    try:
+        job = BiometricJob.objects.get(pk=job_id)
+        model, serializer_class = _job_targets()[job.kind]
+
+        instance = None
+        if job.action == 'update':
+            instance = model.objects.filter(pk=job.target_id).first()
+            if instance is None:
+                job.status = BiometricJob.STATUS_FAILED
+                job.error = {'message': 'Target object no longer exists.'}
+                job.finished_at = timezone.now()
+                job.save(update_fields=['status', 'error', 'finished_at'])
+                return job.status
+
+        serializer = serializer_class(instance, data=job.payload, partial=job.partial)
+        if not serializer.is_valid():
+            job.status = BiometricJob.STATUS_FAILED
+            job.error = serializer.errors
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            return job.status
+
+        with transaction.atomic():
+            obj = serializer.save()
+            if job.kind == BiometricJob.KIND_VOICE_DATASET:
+                _extract_voice_features(obj)
+
+        job.status = BiometricJob.STATUS_COMPLETED
+        job.target_id = obj.pk
+        job.result = {
+            'id': str(obj.pk),
+            'student_nim': obj.student_nim,
+            'is_complete': getattr(obj, 'is_complete', None),
+        }
+        job.error = None
+        job.payload = {}  # media sudah tersimpan sebagai asset
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'target_id', 'result', 'error', 'payload', 'finished_at'])
+        return job.status
+    except Exception as exc:
+        BiometricJob.objects.filter(pk=job_id).update(
+            status=BiometricJob.STATUS_FAILED,
+            error={'message': str(exc) or exc.__class__.__name__},
+            finished_at=timezone.now(),
+        )
+        return BiometricJob.STATUS_FAILED
+    finally:
+        connection.close()
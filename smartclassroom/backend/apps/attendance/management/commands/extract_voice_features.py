@@ -0,0 +1,90 @@
+"""
+Django management command untuk ekstraksi fitur suara dari BiometricVoiceDataset
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.attendance.models import BiometricVoiceDataset, BiometricVoiceFeature
+from apps.attendance.voice_features import (
+    build_feature_tasks, process_recording, save_feature_results
+)
+
+
+class Command(BaseCommand):
+    help = 'Extract fixed-size voice feature vectors for BiometricVoiceDataset recordings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--nim',
+            nargs='+',
+            help='Only process these student NIMs',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker processes (default: CPU count)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Datasets per batch; progress is saved after every batch',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute features even if the recording hash is unchanged',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        force = options['force']
+
+        queryset = BiometricVoiceDataset.objects.order_by('id')
+        if options.get('nim'):
+            queryset = queryset.filter(student_nim__in=options['nim'])
+        dataset_ids = list(queryset.values_list('id', flat=True))
+
+        self.stdout.write(f"Found {len(dataset_ids)} voice datasets")
+
+        processed = 0
+        skipped = 0
+        failed = 0
+        started = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=options.get('workers')) as pool:
+            for offset in range(0, len(dataset_ids), batch_size):
+                chunk_ids = dataset_ids[offset:offset + batch_size]
+                tasks, student_nims, chunk_skipped = self._build_tasks(chunk_ids, force)
+                skipped += chunk_skipped
+                if not tasks:
+                    continue
+
+                results = list(pool.map(process_recording, tasks))
+                failed += sum(1 for result in results if result['error'])
+                processed += len(results)
+                save_feature_results(results, student_nims)
+
+                self.stdout.write(
+                    f"  batch {offset // batch_size + 1}: {len(results)} recordings processed"
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS("\n=== Voice Feature Extraction Complete ==="))
+        self.stdout.write(f"Processed: {processed} ({failed} failed)")
+        self.stdout.write(f"Skipped (unchanged): {skipped}")
+        self.stdout.write(f"Elapsed: {elapsed:.2f}s")
+
+    def _build_tasks(self, chunk_ids, force):
+        existing = {
+            (feature.dataset_id, feature.recording_slot): feature
+            for feature in BiometricVoiceFeature.objects.filter(dataset_id__in=chunk_ids)
+            .only('dataset_id', 'recording_slot', 'content_hash', 'feature_version', 'error')
+        }
+        datasets = BiometricVoiceDataset.objects.filter(id__in=chunk_ids).select_related(
+            *BiometricVoiceDataset.media_asset_fields()
+        )
+        return build_feature_tasks(datasets, existing, force)
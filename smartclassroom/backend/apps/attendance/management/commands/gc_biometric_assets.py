@@ -0,0 +1,81 @@
+"""
+Django management command untuk garbage collection BiometricAsset
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.attendance.models import (
+    BiometricAsset,
+    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset
+)
+
+
+MEDIA_MODELS = (BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset)
+
+
+class Command(BaseCommand):
+    help = 'Recount BiometricAsset references and delete orphaned assets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60,
+            help='Only delete orphans older than this many minutes (protects in-flight uploads)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        cutoff = timezone.now() - timedelta(minutes=options['min_age'])
+
+        with transaction.atomic():
+            actual = Counter()
+            for model in MEDIA_MODELS:
+                for field in model.media_asset_fields():
+                    for asset_id in model.objects.filter(
+                        **{f'{field}__isnull': False}
+                    ).values_list(f'{field}_id', flat=True).iterator():
+                        actual[asset_id] += 1
+
+            drifted = {}
+            orphan_ids = []
+            assets = BiometricAsset.objects.values_list('id', 'ref_count', 'created_at')
+            for asset_id, ref_count, created_at in assets.iterator():
+                count = actual.get(asset_id, 0)
+                if count == 0 and created_at < cutoff:
+                    orphan_ids.append(asset_id)
+                elif count != ref_count:
+                    drifted[asset_id] = count
+
+            if not dry_run:
+                by_count = {}
+                for asset_id, count in drifted.items():
+                    by_count.setdefault(count, []).append(asset_id)
+                for count, asset_ids in by_count.items():
+                    self._in_batches(
+                        asset_ids,
+                        lambda ids: BiometricAsset.objects.filter(id__in=ids).update(ref_count=count),
+                    )
+                self._in_batches(
+                    orphan_ids,
+                    lambda ids: BiometricAsset.objects.filter(id__in=ids).delete(),
+                )
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(f"\n=== {prefix}Biometric Asset GC Complete ==="))
+        self.stdout.write(f"Referenced assets: {len(actual)}")
+        self.stdout.write(f"Ref counts corrected: {len(drifted)}")
+        self.stdout.write(f"Orphaned assets deleted: {len(orphan_ids)}")
+
+    def _in_batches(self, ids, apply, batch_size=500):
+        for offset in range(0, len(ids), batch_size):
+            apply(ids[offset:offset + batch_size])
@@ -0,0 +1,113 @@
+"""
+Django management command: worker antrian BiometricJob
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.attendance.jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued biometric jobs (validation, decoding, feature extraction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Number of worker processes',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=15,
+            help='Minutes before a running job is considered abandoned',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=3,
+            help='Abandoned jobs are failed after this many attempts',
+        )
+        parser.add_argument(
+            '--requeue-every',
+            type=int,
+            default=30,
+            help='Check for abandoned jobs every N polls while running',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        poll_interval = options['poll_interval']
+        requeue_every = max(options['requeue_every'], 1)
+
+        self._requeue_stale(options)
+
+        # Child process membuka koneksi database sendiri
+        connections.close_all()
+
+        processed = 0
+        polls = 0
+        in_flight = {}
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            while True:
+                polls += 1
+                if polls % requeue_every == 0:
+                    # Child yang mati di tengah job meninggalkan job berstatus running
+                    self._requeue_stale(options, exclude=in_flight.values())
+
+                capacity = workers * 2 - len(in_flight)
+                if capacity > 0:
+                    for job_id in claim_jobs(capacity):
+                        in_flight[pool.submit(run_job, job_id)] = job_id
+
+                if not in_flight:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id = in_flight.pop(future)
+                    processed += 1
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        # Job tetap running; dikembalikan ke pending oleh _requeue_stale
+                        broken = True
+                        result = 'worker process died'
+                    self.stdout.write(f"  job {job_id}: {result}")
+
+                if broken:
+                    in_flight.clear()
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping worker, waiting for running jobs...")
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} biometric jobs"))
+
+    def _requeue_stale(self, options, exclude=()):
+        requeued, failed = requeue_stale_jobs(options['stale_after'], options['max_attempts'], exclude=exclude)
+        if requeued or failed:
+            self.stdout.write(f"Recovered stale jobs: {requeued} requeued, {failed} failed")
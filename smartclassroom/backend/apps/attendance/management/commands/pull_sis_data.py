@@ -0,0 +1,137 @@
+"""
+Django management command: pull export SIS Trisakti secara berkala lalu sync
+"""
+import os
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.attendance.management.commands.sync_sis_data import default_sis_dir
+from apps.attendance.sis_pull import PullResult, PullState, backoff_delay, export_filename, pull_due_programs
+
+
+class Command(BaseCommand):
+    help = 'Poll the SIS export endpoint with conditional requests and sync changed programs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url-template',
+            type=str,
+            default=None,
+            help='Export URL with a {program} placeholder (default: settings.SIS_PULL_URL_TEMPLATE)',
+        )
+        parser.add_argument(
+            '--program',
+            type=str,
+            nargs='+',
+            default=None,
+            help='Program codes to pull (default: settings.SIS_PULL_PROGRAMS)',
+        )
+        parser.add_argument(
+            '--sis-dir',
+            type=str,
+            default=None,
+            help='Folder the exports are written to (default: sisTrisakti)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between polls (default: settings.SIS_PULL_INTERVAL)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='HTTP timeout per request in seconds',
+        )
+        parser.add_argument(
+            '--backoff-base',
+            type=float,
+            default=60,
+            help='First retry delay in seconds after an error (doubles per failure)',
+        )
+        parser.add_argument(
+            '--backoff-max',
+            type=float,
+            default=3600,
+            help='Maximum retry delay in seconds',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single poll cycle and exit',
+        )
+
+    def handle(self, *args, **options):
+        url_template = options['url_template'] or getattr(settings, 'SIS_PULL_URL_TEMPLATE', '')
+        if '{program}' not in url_template:
+            raise CommandError("URL template must contain a {program} placeholder")
+        programs = options['program'] or list(getattr(settings, 'SIS_PULL_PROGRAMS', ['IF']))
+        sis_dir = options['sis_dir'] or default_sis_dir()
+        interval = options['interval'] or getattr(settings, 'SIS_PULL_INTERVAL', 900)
+
+        state = PullState.load(sis_dir)
+        self.stdout.write(f"Pulling {', '.join(programs)} into {sis_dir} every {interval:.0f}s")
+
+        try:
+            while True:
+                self._poll(programs, url_template, sis_dir, state, options)
+                if options['once']:
+                    break
+                time.sleep(self._sleep_seconds(programs, state, interval))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping SIS pull")
+        finally:
+            state.save()
+
+    def _poll(self, programs, url_template, sis_dir, state, options):
+        results, to_sync = pull_due_programs(
+            programs, url_template, sis_dir, state,
+            timeout=options['timeout'],
+            backoff_base=options['backoff_base'],
+            backoff_max=options['backoff_max'],
+        )
+        for program, result in results.items():
+            self.stdout.write(f"  {program}: {result}")
+
+        if to_sync:
+            # Semua program ikut di-sync agar mahasiswa / dosen yang muncul di beberapa
+            # program di-resolve dari semua file; course yang tidak berubah dilewati
+            # oleh fingerprint sync_sis_data
+            available = [
+                program for program in programs
+                if os.path.exists(os.path.join(sis_dir, export_filename(program)))
+            ]
+            self.stdout.write(f"Changed programs: {', '.join(to_sync)}; syncing {', '.join(available)}")
+            try:
+                call_command('sync_sis_data', program=available, sis_dir=sis_dir, stdout=self.stdout)
+            except Exception as exc:
+                # File sudah tersimpan; sync diulang pada siklus berikutnya setelah backoff
+                self.stderr.write(self.style.ERROR(f"Sync failed: {exc}"))
+                now = time.time()
+                for program in to_sync:
+                    program_state = state.get(program)
+                    program_state['failures'] += 1
+                    program_state['next_attempt'] = now + backoff_delay(
+                        program_state['failures'], options['backoff_base'], options['backoff_max']
+                    )
+            else:
+                for program in to_sync:
+                    program_state = state.get(program)
+                    program_state['synced_hash'] = program_state['content_hash']
+        elif all(result in (PullResult.NOT_MODIFIED, PullResult.UNCHANGED) for result in results.values()):
+            self.stdout.write("No changes")
+
+        state.save()
+
+    def _sleep_seconds(self, programs, state, interval):
+        now = time.time()
+        retries = [
+            state.get(program)['next_attempt'] - now
+            for program in programs
+            if state.get(program)['next_attempt'] > now
+        ]
+        return max(1.0, min([interval] + retries))
@@ -3,13 +3,45 @@ Django management command to sync SIS Trisakti data from JSON files
 """
 import json
 import os
-from datetime import datetime
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from apps.attendance.models import (
     SisCourse, SisLecturer, SisStudent,
     SisCourseClass, SisCourseClassLecturer, SisEnrollment
 )
+from apps.attendance.sis_parser import (
+    discover_program_files, iter_chunks, iter_course_entries, iter_spooled_entries,
+    normalize_course, spool_program_entries
+)
+from apps.attendance.sis_sync import (
+    PhaseTimer, SisChangeSet, SisSyncState, apply_changes, diff_courses, resolve_shared
+)
+
+
+_DONE = object()
+
+
+def default_sis_dir():
+    # Default path - look in sisTrisakti folder
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )))
+    # Go up to project root and then to sisTrisakti
+    project_root = os.path.dirname(os.path.dirname(base_dir))
+    return os.path.join(project_root, 'sisTrisakti')
+
+
+def _timed(iterable, timer, phase):
+    """Hitung waktu tiap next() sebagai fase `phase`."""
+    iterator = iter(iterable)
+    while True:
+        with timer.phase(phase):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
 
 
 class Command(BaseCommand):
@@ -19,199 +51,228 @@ class Command(BaseCommand):
         parser.add_argument(
             '--json-path',
             type=str,
-            help='Path to the JSON file containing SIS data (response-datakelasIF.json)',
+            help='Path to the JSON file containing SIS data (response-datakelasIF.json); single program only',
         )
         parser.add_argument(
             '--program',
             type=str,
-            default='IF',
-            help='Program code (IF, SI, etc.)',
+            nargs='+',
+            default=['IF'],
+            help='Program code(s) (IF, SI, etc.). Programs are applied in alphabetical order, '
+                 'so a student listed in several programs ends up with the last one',
+        )
+        parser.add_argument(
+            '--sis-dir',
+            type=str,
+            default=None,
+            help='Folder containing response-datakelas<PROGRAM>.json files (default: sisTrisakti)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Sync every response-datakelas<PROGRAM>.json found in the sisTrisakti folder',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes used to parse program files in parallel (default: one per file, up to CPU count)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-sync every course even if its content fingerprint is unchanged',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute the full change set without writing and print it as JSON',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk insert/update/delete statement',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Courses parsed and applied per chunk (bounds memory used by parsed file content)',
         )
     
     def handle(self, *args, **options):
-        json_path = options.get('json_path')
-        program = options.get('program', 'IF')
+        batch_size = max(options['batch_size'], 1)
+        chunk_size = max(options['chunk_size'], 1)
+        dry_run = options.get('dry_run', False)
+        # Saat dry-run stdout hanya berisi JSON; pesan progres ke stderr
+        self.log = self.stderr if dry_run else self.stdout
+        
+        sources = self._resolve_sources(options)
+        if not sources:
+            return
         
-        if not json_path:
-            # Default path - look in sisTrisakti folder
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(
-                os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            )))
-            # Go up to project root and then to sisTrisakti
-            project_root = os.path.dirname(os.path.dirname(base_dir))
-            json_path = os.path.join(project_root, 'sisTrisakti', f'response-datakelas{program}.json')
+        for program, json_path in sources:
+            self.log.write(f"Loading {program} data from: {json_path}")
+        timer = PhaseTimer()
         
-        self.stdout.write(f"Looking for JSON file at: {json_path}")
+        with timer.phase('load'):
+            state = SisSyncState.load()
         
-        if not os.path.exists(json_path):
-            self.stderr.write(self.style.ERROR(f"JSON file not found: {json_path}"))
+        changes = SisChangeSet()
+        if dry_run:
+            # Tanpa apply/flush: seluruh change set terkumpul di memori
+            for program, entries in self._iter_program_entries(sources, options.get('workers'), timer):
+                for chunk in iter_chunks(entries, chunk_size):
+                    with timer.phase('diff'):
+                        diff_courses(chunk, state, changes, force=options.get('force', False))
+            with timer.phase('diff'):
+                resolve_shared(state, changes)
+            self._print_dry_run(changes, timer)
             return
         
-        self.stdout.write(f"Loading data from: {json_path}")
+        with transaction.atomic():
+            # Satu writer: program di-apply berurutan, file di-parse paralel
+            for program, entries in self._iter_program_entries(sources, options.get('workers'), timer):
+                for chunk in iter_chunks(entries, chunk_size):
+                    with timer.phase('diff'):
+                        diff_courses(chunk, state, changes, force=options.get('force', False))
+                    
+                    apply_changes(changes, state, batch_size=batch_size, timer=timer)
+                    changes.flush()
+            
+            # Nilai akhir course / dosen / mahasiswa dari semua program (last writer wins)
+            with timer.phase('diff'):
+                resolve_shared(state, changes)
+            apply_changes(changes, state, batch_size=batch_size, timer=timer)
+            changes.flush()
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        self.stdout.write(
+            f"Processed {changes.courses_processed} courses from {len(sources)} JSON file(s)"
+        )
         
-        self.stdout.write(f"Found {len(data)} courses in JSON file")
+        self._print_summary(changes, timer)
+    
+    def _resolve_sources(self, options):
+        """Return [(program, json_path)] terurut, atau None jika ada error."""
+        json_path = options.get('json_path')
+        programs = options.get('program') or ['IF']
+        if isinstance(programs, str):
+            programs = [programs]
+        programs = sorted(set(programs))
+        sis_dir = options.get('sis_dir') or default_sis_dir()
         
-        # Counters
-        courses_created = 0
-        courses_updated = 0
-        lecturers_created = 0
-        lecturers_updated = 0
-        students_created = 0
-        classes_created = 0
-        classes_updated = 0
-        enrollments_created = 0
-        class_lecturers_created = 0
+        if options.get('all'):
+            if json_path:
+                self.stderr.write(self.style.ERROR("--json-path cannot be combined with --all"))
+                return None
+            self.log.write(f"Scanning SIS folder: {sis_dir}")
+            if not os.path.isdir(sis_dir):
+                self.stderr.write(self.style.ERROR(f"SIS folder not found: {sis_dir}"))
+                return None
+            found = discover_program_files(sis_dir)
+            if not found:
+                self.stderr.write(self.style.ERROR(f"No response-datakelas*.json files in: {sis_dir}"))
+                return None
+            return sorted(found.items())
         
-        with transaction.atomic():
-            for course_id, course_data in data.items():
-                kelas = course_data.get('kelas', {})
-                dosen = course_data.get('dosen', {})
-                students = course_data.get('Std', [])
-                
-                # 1. Create/Update Course
-                course, created = SisCourse.objects.update_or_create(
-                    id=kelas.get('IdCourse', course_id),
-                    defaults={
-                        'code': kelas.get('KodeMk', ''),
-                        'name': kelas.get('Matakuliah', ''),
-                        'program': program,
-                    }
-                )
-                if created:
-                    courses_created += 1
-                else:
-                    courses_updated += 1
-                
-                # 2. Create/Update Course Class
-                class_code = kelas.get('KodeKelas', '01')
-                class_id = f"{course.id}_{class_code}"
-                
-                # Parse time
-                start_time = None
-                end_time = None
-                try:
-                    if kelas.get('mulai'):
-                        start_time = datetime.strptime(kelas.get('mulai'), '%H:%M:%S').time()
-                    if kelas.get('selesai'):
-                        end_time = datetime.strptime(kelas.get('selesai'), '%H:%M:%S').time()
-                except ValueError:
-                    pass
-                
-                course_class, created = SisCourseClass.objects.update_or_create(
-                    id=class_id,
-                    defaults={
-                        'course': course,
-                        'class_code': class_code,
-                        'room': kelas.get('KodeRuang', ''),
-                        'day': kelas.get('hari', ''),
-                        'start_time': start_time,
-                        'end_time': end_time,
-                    }
-                )
-                if created:
-                    classes_created += 1
-                else:
-                    classes_updated += 1
-                
-                # 3. Create/Update Lecturers and link to class
-                current_lecturer_ids = set()
-                for lecturer_key, lecturer_data in dosen.items():
-                    # Handle case where lecturer_data is not a dict
-                    if not isinstance(lecturer_data, dict):
-                        continue
-                    
-                    staff_id = str(lecturer_data.get('StaffId', lecturer_key))
-                    
-                    lecturer, created = SisLecturer.objects.update_or_create(
-                        id=staff_id,
-                        defaults={
-                            'id_staff': lecturer_data.get('IdStaff'),
-                            'name': lecturer_data.get('StaffName', '') or '',
-                            'photo_url': lecturer_data.get('photo', '') or '',
-                        }
-                    )
-                    current_lecturer_ids.add(lecturer.id)
-                    if created:
-                        lecturers_created += 1
-                    else:
-                        lecturers_updated += 1
-                    
-                    # Link lecturer to course class
-                    _, created = SisCourseClassLecturer.objects.get_or_create(
-                        course_class=course_class,
-                        lecturer=lecturer
-                    )
-                    if created:
-                        class_lecturers_created += 1
-
-                # Remove lecturers no longer linked in API for this class
-                if current_lecturer_ids:
-                    SisCourseClassLecturer.objects.filter(course_class=course_class).exclude(
-                        lecturer_id__in=current_lecturer_ids
-                    ).delete()
-                else:
-                    SisCourseClassLecturer.objects.filter(course_class=course_class).delete()
-                
-                # 4. Create Students and Enrollments
-                current_student_nims = set()
-                for student_data in students:
-                    nim = student_data.get('nim', '')
-                    if not nim:
-                        continue
-
-                    name = student_data.get('nama') or student_data.get('name') or student_data.get('NamaMhs') or ''
-                    photo = student_data.get('photo') or student_data.get('foto') or student_data.get('Photo') or ''
-                    
-                    # Create student (include name/photo if provided)
-                    student, created = SisStudent.objects.get_or_create(
-                        nim=nim,
-                        defaults={
-                            'program': program,
-                            'name': name or '',
-                            'photo_url': photo or '',
-                        }
-                    )
-                    if created:
-                        students_created += 1
-                    else:
-                        updates = {}
-                        if name and student.name != name:
-                            updates['name'] = name
-                        if photo and student.photo_url != photo:
-                            updates['photo_url'] = photo
-                        if program and student.program != program:
-                            updates['program'] = program
-                        if updates:
-                            SisStudent.objects.filter(nim=nim).update(**updates)
-                    current_student_nims.add(nim)
-                    
-                    # Create enrollment
-                    _, created = SisEnrollment.objects.get_or_create(
-                        course_class=course_class,
-                        student=student
-                    )
-                    if created:
-                        enrollments_created += 1
-
-                # Remove enrollments no longer present in API for this class
-                if current_student_nims:
-                    SisEnrollment.objects.filter(course_class=course_class).exclude(
-                        student_id__in=current_student_nims
-                    ).delete()
-                else:
-                    SisEnrollment.objects.filter(course_class=course_class).delete()
+        if json_path:
+            if len(programs) > 1:
+                self.stderr.write(self.style.ERROR("--json-path can only be used with a single --program"))
+                return None
+            sources = [(programs[0], json_path)]
+        else:
+            sources = [
+                (program, os.path.join(sis_dir, f'response-datakelas{program}.json'))
+                for program in programs
+            ]
+        
+        for program, path in sources:
+            self.log.write(f"Looking for JSON file at: {path}")
+            if not os.path.exists(path):
+                self.stderr.write(self.style.ERROR(f"JSON file not found: {path}"))
+                return None
+        return sources
+    
+    def _iter_program_entries(self, sources, workers, timer):
+        """Yield (program, entry ternormalisasi) per file sesuai urutan sources."""
+        if len(sources) == 1:
+            # Satu file: streaming di proses ini, tanpa overhead pool
+            program, json_path = sources[0]
+            entries = (
+                normalize_course(course_id, course_data, program)
+                for course_id, course_data in iter_course_entries(json_path)
+            )
+            yield program, _timed(entries, timer, 'parse')
+            return
+        
+        programs = [program for program, _ in sources]
+        paths = [path for _, path in sources]
+        workers = workers or min(len(sources), os.cpu_count() or 1)
+        with tempfile.TemporaryDirectory(prefix='sis-sync-') as spool_dir, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            # Worker menulis entry ke file spool; writer membacanya kembali
+            # per entry sesuai urutan input -> apply deterministik
+            spools = [os.path.join(spool_dir, f'{index}-{program}.pickle') for index, program in enumerate(programs)]
+            results = pool.map(spool_program_entries, paths, programs, spools)
+            for program, spool_path, _ in zip(programs, spools, _timed(results, timer, 'parse')):
+                yield program, iter_spooled_entries(spool_path)
+    
+    def _print_dry_run(self, changes, timer):
+        report = changes.to_report()
         
-        # Summary
+        row_counts = {}
+        for name, model in (
+            ('SisCourse', SisCourse),
+            ('SisCourseClass', SisCourseClass),
+            ('SisLecturer', SisLecturer),
+            ('SisStudent', SisStudent),
+            ('SisCourseClassLecturer', SisCourseClassLecturer),
+            ('SisEnrollment', SisEnrollment),
+        ):
+            model_changes = report['models'][name]
+            before = model.objects.count()
+            row_counts[name] = {
+                'rows_before': before,
+                'create': len(model_changes['create']),
+                'update': len(model_changes['update']),
+                'delete': len(model_changes['delete']),
+                'rows_after': before + len(model_changes['create']) - len(model_changes['delete']),
+            }
+        
+        report['dry_run'] = True
+        report['row_counts'] = row_counts
+        report['timings'] = {phase: round(seconds, 6) for phase, seconds in timer.timings.items()}
+        self.stdout.write(json.dumps(report, indent=2, default=str))
+    
+    def _print_summary(self, changes, timer):
         self.stdout.write(self.style.SUCCESS("\n=== Sync Complete ==="))
-        self.stdout.write(f"Courses: {courses_created} created, {courses_updated} updated")
-        self.stdout.write(f"Course Classes: {classes_created} created, {classes_updated} updated")
-        self.stdout.write(f"Lecturers: {lecturers_created} created, {lecturers_updated} updated")
-        self.stdout.write(f"Students: {students_created} created")
-        self.stdout.write(f"Class-Lecturer links: {class_lecturers_created} created")
-        self.stdout.write(f"Enrollments: {enrollments_created} created")
+        self.stdout.write(
+            f"Courses skipped (unchanged fingerprint): {changes.courses_skipped}"
+        )
+        labels = [
+            ('courses', 'Courses'),
+            ('classes', 'Course Classes'),
+            ('lecturers', 'Lecturers'),
+            ('students', 'Students'),
+        ]
+        for key, label in labels:
+            self.stdout.write(
+                f"{label}: {len(changes.created[key])} created, "
+                f"{len(changes.updated[key])} updated, {changes.unchanged(key)} unchanged"
+            )
+        self.stdout.write(
+            f"Class-Lecturer links: {changes.links_created} created, "
+            f"{changes.links_removed} removed"
+        )
+        self.stdout.write(
+            f"Enrollments: {changes.enrollments_created} created, "
+            f"{changes.enrollments_removed} removed"
+        )
+        
+        self.stdout.write(self.style.SUCCESS("\n=== Timings ==="))
+        for phase, seconds in timer.timings.items():
+            self.stdout.write(f"{phase}: {seconds:.3f}s")
         
         # Show totals
         self.stdout.write(self.style.SUCCESS("\n=== Database Totals ==="))
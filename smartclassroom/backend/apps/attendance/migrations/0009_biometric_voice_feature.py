@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0008_biometric_datasets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BiometricVoiceFeature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recording_slot', models.PositiveSmallIntegerField(help_text='1 = voice_recording_1, 2 = voice_recording_2')),
+                ('student_nim', models.CharField(db_index=True, help_text='NIM mahasiswa', max_length=50)),
+                ('content_hash', models.CharField(help_text='SHA-256 isi rekaman sumber', max_length=64)),
+                ('feature_version', models.PositiveSmallIntegerField(default=1)),
+                ('dimensions', models.PositiveSmallIntegerField(default=0)),
+                ('vector', models.BinaryField(blank=True, default=b'', help_text='float32 little-endian')),
+                ('duration', models.FloatField(blank=True, help_text='Durasi audio hasil decode (detik)', null=True)),
+                ('error', models.TextField(blank=True, default='', help_text='Pesan error jika decode gagal')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voice_features', to='attendance.biometricvoicedataset')),
+            ],
+            options={
+                'verbose_name': 'Biometric Voice Feature',
+                'verbose_name_plural': 'Biometric Voice Features',
+                'ordering': ['student_nim', 'recording_slot'],
+                'unique_together': {('dataset', 'recording_slot')},
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0009_biometric_voice_feature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BiometricAsset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 isi file', max_length=64, unique=True)),
+                ('mime', models.CharField(blank=True, default='', max_length=50)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('ref_count', models.IntegerField(default=0, help_text='Jumlah field biometrik yang memakai asset ini')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Biometric Asset',
+                'verbose_name_plural': 'Biometric Assets',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='biometricfacedataset',
+            name='face_front_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah depan', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricfacedataset',
+            name='face_left_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah kiri', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricfacedataset',
+            name='face_right_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah kanan', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricfacedataset',
+            name='face_up_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah atas', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricregistration',
+            name='face_front_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah depan', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricregistration',
+            name='face_left_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah kiri', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricregistration',
+            name='face_right_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah kanan', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricregistration',
+            name='face_up_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset foto wajah atas', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricregistration',
+            name='voice_recording_1_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset rekaman suara 1', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricregistration',
+            name='voice_recording_2_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset rekaman suara 2', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricvoicedataset',
+            name='voice_recording_1_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset rekaman suara 1', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+        migrations.AddField(
+            model_name='biometricvoicedataset',
+            name='voice_recording_2_asset',
+            field=models.ForeignKey(blank=True, help_text='Asset rekaman suara 2', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.biometricasset'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+import base64
+import binascii
+import hashlib
+from collections import Counter
+
+from django.db import migrations
+
+
+MEDIA_FIELDS = {
+    'BiometricRegistration': (
+        'face_front', 'face_left', 'face_right', 'face_up',
+        'voice_recording_1', 'voice_recording_2',
+    ),
+    'BiometricFaceDataset': ('face_front', 'face_left', 'face_right', 'face_up'),
+    'BiometricVoiceDataset': ('voice_recording_1', 'voice_recording_2'),
+}
+
+
+def _decode(value, default_mime):
+    mime = default_mime
+    payload = value
+    if value.startswith('data:') and ',' in value:
+        header, payload = value.split(',', 1)
+        mime = header[5:].split(';', 1)[0] or default_mime
+    try:
+        return mime, base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError):
+        return mime, b''
+
+
+def collapse_media(apps, schema_editor):
+    """Pindahkan data URL lama ke BiometricAsset (satu asset per isi file)."""
+    BiometricAsset = apps.get_model('attendance', 'BiometricAsset')
+    asset_ids = {}
+    ref_counts = Counter()
+
+    for model_name, fields in MEDIA_FIELDS.items():
+        Model = apps.get_model('attendance', model_name)
+        for row in Model.objects.iterator(chunk_size=100):
+            changed = []
+            for field in fields:
+                value = getattr(row, field)
+                if not value:
+                    continue
+                mime, data = _decode(value, getattr(row, f'{field}_mime', ''))
+                if not data:
+                    continue
+                content_hash = hashlib.sha256(data).hexdigest()
+                asset_id = asset_ids.get(content_hash)
+                if asset_id is None:
+                    asset, _ = BiometricAsset.objects.get_or_create(
+                        content_hash=content_hash,
+                        defaults={'mime': mime, 'size': len(data), 'data': data},
+                    )
+                    asset_id = asset_ids[content_hash] = asset.pk
+                setattr(row, f'{field}_asset_id', asset_id)
+                setattr(row, field, '')
+                ref_counts[asset_id] += 1
+                changed += [field, f'{field}_asset']
+            if changed:
+                row.save(update_fields=changed)
+
+    for asset_id, count in ref_counts.items():
+        BiometricAsset.objects.filter(pk=asset_id).update(ref_count=count)
+
+
+def restore_media(apps, schema_editor):
+    for model_name, fields in MEDIA_FIELDS.items():
+        Model = apps.get_model('attendance', model_name)
+        related = [f'{field}_asset' for field in fields]
+        for row in Model.objects.select_related(*related).iterator(chunk_size=100):
+            changed = []
+            for field in fields:
+                asset = getattr(row, f'{field}_asset')
+                if asset is None:
+                    continue
+                encoded = base64.b64encode(bytes(asset.data)).decode('ascii')
+                setattr(row, field, f"data:{asset.mime};base64,{encoded}")
+                setattr(row, f'{field}_asset', None)
+                changed += [field, f'{field}_asset']
+            if changed:
+                row.save(update_fields=changed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0010_biometric_asset_store'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_media, restore_media),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:26
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0011_collapse_biometric_media'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BiometricJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('registration', 'Biometric Registration'), ('face_dataset', 'Face Dataset'), ('voice_dataset', 'Voice Dataset')], max_length=20)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update')], default='create', max_length=10)),
+                ('partial', models.BooleanField(default=False)),
+                ('target_id', models.UUIDField(blank=True, help_text='ID objek yang diupdate / hasil create', null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Biometric Job',
+                'verbose_name_plural': 'Biometric Jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0012_biometric_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='siscourseclass',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 entry kelas/dosen/Std ternormalisasi dari sync terakhir', max_length=64),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+DAY_NAME_TO_INDEX = {
+    "monday": 0, "mon": 0, "senin": 0,
+    "tuesday": 1, "tue": 1, "selasa": 1,
+    "wednesday": 2, "wed": 2, "rabu": 2,
+    "thursday": 3, "thu": 3, "kamis": 3,
+    "friday": 4, "fri": 4, "jumat": 4, "jum'at": 4,
+    "saturday": 5, "sat": 5, "sabtu": 5,
+    "sunday": 6, "sun": 6, "minggu": 6,
+}
+
+
+def backfill_weekday(apps, schema_editor):
+    """Isi weekday kelas yang sudah ada dari nama hari."""
+    SisCourseClass = apps.get_model('attendance', 'SisCourseClass')
+    days = SisCourseClass.objects.exclude(day='').values_list('day', flat=True).distinct()
+    for day in list(days):
+        weekday = DAY_NAME_TO_INDEX.get(day.strip().lower())
+        if weekday is not None:
+            SisCourseClass.objects.filter(day=day).update(weekday=weekday)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0013_siscourseclass_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='siscourseclass',
+            name='weekday',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Hari kuliah sebagai weekday (Senin = 0)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='siscourseclass',
+            index=models.Index(fields=['weekday', 'start_time'], name='sis_class_weekday_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='siscourseclass',
+            index=models.Index(fields=['room', 'weekday'], name='sis_class_room_weekday_idx'),
+        ),
+        migrations.RunPython(backfill_weekday, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,14 @@
-from django.db import models
+from collections import Counter
+import hashlib
+import base64
+
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 import uuid
 
+from .biometrics import decode_data_url
+
 
 # ==========================================
 # Master Data Models (Cache dari SIS Trisakti)
@@ -80,14 +87,25 @@ class SisCourseClass(models.Model):
     class_code = models.CharField(max_length=20, help_text="Kode kelas (KodeKelas)")
     room = models.CharField(max_length=50, blank=True, default='', help_text="Ruangan (KodeRuang)")
     day = models.CharField(max_length=20, blank=True, default='', help_text="Hari kuliah")
+    weekday = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Hari kuliah sebagai weekday (Senin = 0)"
+    )
     start_time = models.TimeField(null=True, blank=True, help_text="Jam mulai")
     end_time = models.TimeField(null=True, blank=True, help_text="Jam selesai")
+    content_hash = models.CharField(
+        max_length=64, blank=True, default='',
+        help_text="SHA-256 entry kelas/dosen/Std ternormalisasi dari sync terakhir"
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['course__code', 'class_code']
+        indexes = [
+            models.Index(fields=['weekday', 'start_time'], name='sis_class_weekday_idx'),
+            models.Index(fields=['room', 'weekday'], name='sis_class_room_weekday_idx'),
+        ]
         verbose_name = 'SIS Course Class'
         verbose_name_plural = 'SIS Course Classes'
     
@@ -267,10 +285,160 @@ class AttendanceRecord(models.Model):
         self.save()
 
 
-class BiometricRegistration(models.Model):
+class BiometricAssetManager(models.Manager):
+    def intern(self, value, default_mime=''):
+        """
+        Simpan data URL sebagai asset (dedup berdasarkan SHA-256 isi file).
+        Return asset yang sudah ada jika isinya identik, None jika kosong.
+        """
+        mime, data = decode_data_url(value, default_mime)
+        if not data:
+            return None
+        content_hash = hashlib.sha256(data).hexdigest()
+        asset, _ = self.get_or_create(
+            content_hash=content_hash,
+            defaults={'mime': mime, 'size': len(data), 'data': data},
+        )
+        return asset
+
+    def swap_references(self, old_ids, new_ids):
+        """Sesuaikan ref_count dari kumpulan referensi lama ke yang baru."""
+        delta = Counter(asset_id for asset_id in new_ids if asset_id)
+        delta.subtract(Counter(asset_id for asset_id in old_ids if asset_id))
+
+        by_delta = {}
+        for asset_id, change in delta.items():
+            if change:
+                by_delta.setdefault(change, []).append(asset_id)
+        for change, asset_ids in by_delta.items():
+            self.filter(pk__in=asset_ids).update(ref_count=F('ref_count') + change)
+
+
+class BiometricAsset(models.Model):
+    """
+    File biometrik (foto wajah / rekaman suara) yang disimpan sekali,
+    dipakai bersama oleh BiometricRegistration, BiometricFaceDataset
+    dan BiometricVoiceDataset.
+    """
+    content_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 isi file")
+    mime = models.CharField(max_length=50, blank=True, default='')
+    size = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+    ref_count = models.IntegerField(default=0, help_text="Jumlah field biometrik yang memakai asset ini")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BiometricAssetManager()
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Biometric Asset'
+        verbose_name_plural = 'Biometric Assets'
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.mime}, {self.size} bytes)"
+
+    def as_data_url(self):
+        encoded = base64.b64encode(bytes(self.data)).decode('ascii')
+        return f"data:{self.mime};base64,{encoded}"
+
+
+class BiometricMediaModel(models.Model):
+    """
+    Base model untuk field media biometrik.
+    Setiap field di MEDIA_FIELDS (TextField data URL) punya pasangan
+    FK `<field>_asset`. Saat save, data URL dipindah ke BiometricAsset
+    dan TextField dikosongkan.
+    """
+    MEDIA_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def media_asset_fields(cls, fields=None):
+        return [f'{field}_asset' for field in (fields or cls.MEDIA_FIELDS)]
+
+    def has_media(self, field):
+        return bool(getattr(self, field) or getattr(self, f'{field}_asset_id'))
+
+    def get_media(self, field):
+        """Return (mime, bytes) untuk field media."""
+        default_mime = getattr(self, f'{field}_mime', '')
+        asset = getattr(self, f'{field}_asset')
+        if asset is not None:
+            return asset.mime or default_mime, bytes(asset.data)
+        return decode_data_url(getattr(self, field), default_mime)
+
+    def get_media_hash(self, field):
+        asset = getattr(self, f'{field}_asset')
+        if asset is not None:
+            return asset.content_hash
+        _, data = self.get_media(field)
+        return hashlib.sha256(data).hexdigest() if data else ''
+
+    def get_media_data_url(self, field):
+        value = getattr(self, field)
+        if value:
+            return value
+        asset = getattr(self, f'{field}_asset')
+        return asset.as_data_url() if asset is not None else ''
+
+    def _asset_ids(self):
+        return [getattr(self, f'{name}_id') for name in self.media_asset_fields()]
+
+    def _stored_asset_ids(self):
+        if self._state.adding:
+            return []
+        stored = type(self).objects.filter(pk=self.pk).values_list(
+            *[f'{name}_id' for name in self.media_asset_fields()]
+        ).first()
+        return list(stored or [])
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        media_fields = self.MEDIA_FIELDS
+        if update_fields is not None:
+            # updated_at selalu ditulis: dipakai sebagai versi data biometrik (coverage)
+            update_fields = set(update_fields) | {'updated_at'}
+            kwargs['update_fields'] = update_fields
+            media_fields = [field for field in self.MEDIA_FIELDS if field in update_fields]
+            if not media_fields:
+                super().save(*args, **kwargs)
+                return
+            kwargs['update_fields'] = update_fields | set(self.media_asset_fields(media_fields))
+
+        with transaction.atomic():
+            for field in media_fields:
+                value = getattr(self, field)
+                if not value:
+                    continue
+                asset = BiometricAsset.objects.intern(value, getattr(self, f'{field}_mime', ''))
+                if asset is not None:
+                    setattr(self, f'{field}_asset', asset)
+                    setattr(self, field, '')
+
+            previous = self._stored_asset_ids()
+            super().save(*args, **kwargs)
+            BiometricAsset.objects.swap_references(previous, self._asset_ids())
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._stored_asset_ids()
+            result = super().delete(*args, **kwargs)
+            BiometricAsset.objects.swap_references(previous, [])
+        return result
+
+
+class BiometricRegistration(BiometricMediaModel):
     """
     Model untuk menyimpan registrasi biometrik mahasiswa (wajah + suara)
     """
+    MEDIA_FIELDS = (
+        'face_front', 'face_left', 'face_right', 'face_up',
+        'voice_recording_1', 'voice_recording_2',
+    )
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     student = models.ForeignKey(
@@ -296,6 +464,23 @@ class BiometricRegistration(models.Model):
     face_right_mime = models.CharField(max_length=50, blank=True, default='image/jpeg')
     face_up_mime = models.CharField(max_length=50, blank=True, default='image/jpeg')
 
+    face_front_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah depan"
+    )
+    face_left_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah kiri"
+    )
+    face_right_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah kanan"
+    )
+    face_up_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah atas"
+    )
+
     voice_prompt_1_text = models.TextField(blank=True, default='')
     voice_prompt_2_text = models.TextField(blank=True, default='')
     voice_recording_1 = models.TextField(blank=True, default='', help_text="Base64 audio rekaman 1")
@@ -305,6 +490,15 @@ class BiometricRegistration(models.Model):
     voice_recording_1_duration = models.FloatField(null=True, blank=True)
     voice_recording_2_duration = models.FloatField(null=True, blank=True)
 
+    voice_recording_1_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset rekaman suara 1"
+    )
+    voice_recording_2_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset rekaman suara 2"
+    )
+
     is_complete = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -319,10 +513,12 @@ class BiometricRegistration(models.Model):
         return f"{self.student_nim} - Biometric Registration"
 
 
-class BiometricFaceDataset(models.Model):
+class BiometricFaceDataset(BiometricMediaModel):
     """
     Dataset wajah mahasiswa (disimpan terpisah)
     """
+    MEDIA_FIELDS = ('face_front', 'face_left', 'face_right', 'face_up')
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     student = models.ForeignKey(
@@ -345,6 +541,23 @@ class BiometricFaceDataset(models.Model):
     face_right_mime = models.CharField(max_length=50, blank=True, default='image/jpeg')
     face_up_mime = models.CharField(max_length=50, blank=True, default='image/jpeg')
 
+    face_front_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah depan"
+    )
+    face_left_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah kiri"
+    )
+    face_right_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah kanan"
+    )
+    face_up_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset foto wajah atas"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -357,10 +570,12 @@ class BiometricFaceDataset(models.Model):
         return f"{self.student_nim} - Face Dataset"
 
 
-class BiometricVoiceDataset(models.Model):
+class BiometricVoiceDataset(BiometricMediaModel):
     """
     Dataset suara mahasiswa (disimpan terpisah)
     """
+    MEDIA_FIELDS = ('voice_recording_1', 'voice_recording_2')
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     student = models.ForeignKey(
@@ -382,6 +597,15 @@ class BiometricVoiceDataset(models.Model):
     voice_recording_1_duration = models.FloatField(null=True, blank=True)
     voice_recording_2_duration = models.FloatField(null=True, blank=True)
 
+    voice_recording_1_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset rekaman suara 1"
+    )
+    voice_recording_2_asset = models.ForeignKey(
+        BiometricAsset, null=True, blank=True, on_delete=models.PROTECT, related_name='+',
+        help_text="Asset rekaman suara 2"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -392,3 +616,94 @@ class BiometricVoiceDataset(models.Model):
 
     def __str__(self):
         return f"{self.student_nim} - Voice Dataset"
+
+
+class BiometricVoiceFeature(models.Model):
+    """
+    Vektor fitur suara (statistik log-mel) per rekaman BiometricVoiceDataset.
+    Vektor disimpan sebagai array float32 mentah agar ringkas.
+    """
+    dataset = models.ForeignKey(
+        BiometricVoiceDataset,
+        on_delete=models.CASCADE,
+        related_name='voice_features'
+    )
+    recording_slot = models.PositiveSmallIntegerField(help_text="1 = voice_recording_1, 2 = voice_recording_2")
+    student_nim = models.CharField(max_length=50, db_index=True, help_text="NIM mahasiswa")
+
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 isi rekaman sumber")
+    feature_version = models.PositiveSmallIntegerField(default=1)
+    dimensions = models.PositiveSmallIntegerField(default=0)
+    vector = models.BinaryField(blank=True, default=b'', help_text="float32 little-endian")
+    duration = models.FloatField(null=True, blank=True, help_text="Durasi audio hasil decode (detik)")
+    error = models.TextField(blank=True, default='', help_text="Pesan error jika decode gagal")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['student_nim', 'recording_slot']
+        unique_together = ['dataset', 'recording_slot']
+        verbose_name = 'Biometric Voice Feature'
+        verbose_name_plural = 'Biometric Voice Features'
+
+    def __str__(self):
+        return f"{self.student_nim} - Voice Feature {self.recording_slot}"
+
+    def as_array(self):
+        import numpy as np
+        return np.frombuffer(bytes(self.vector), dtype='<f4')
+
+
+class BiometricJob(models.Model):
+    """
+    Antrian job pemrosesan biometrik (validasi, decode, dedup asset,
+    ekstraksi fitur) yang dijalankan oleh worker `process_biometric_jobs`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    KIND_REGISTRATION = 'registration'
+    KIND_FACE_DATASET = 'face_dataset'
+    KIND_VOICE_DATASET = 'voice_dataset'
+    KIND_CHOICES = (
+        (KIND_REGISTRATION, 'Biometric Registration'),
+        (KIND_FACE_DATASET, 'Face Dataset'),
+        (KIND_VOICE_DATASET, 'Voice Dataset'),
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+
+    ACTION_CHOICES = (
+        ('create', 'Create'),
+        ('update', 'Update'),
+    )
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default='create')
+    partial = models.BooleanField(default=False)
+    target_id = models.UUIDField(null=True, blank=True, help_text="ID objek yang diupdate / hasil create")
+    payload = models.JSONField(default=dict, blank=True)
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Biometric Job'
+        verbose_name_plural = 'Biometric Jobs'
+
+    def __str__(self):
+        return f"{self.kind} {self.action} - {self.status}"
@@ -0,0 +1,332 @@
+"""
+Proxy + cache disk untuk foto mahasiswa / dosen dari SIS Trisakti.
+
+SisStudent.photo_url dan SisLecturer.photo_url bisa berisi URL http(s),
+path relatif di server SIS (mis. /var/www/html/sis/documents/...), data URL,
+atau base64 mentah. Foto inline langsung di-decode; path relatif di-resolve
+terhadap SIS_PHOTO_BASE_URL; foto URL diambil sekali lalu disimpan di disk
+secara content-addressed:
+
+    <cache_dir>/blobs/<hash[:2]>/<sha256>     isi foto
+    <cache_dir>/refs/<sha256(url)>.json       url -> hash, mime, fetched_at
+
+Ref lebih tua dari TTL diambil ulang (foto lama tetap dipakai jika SIS
+gagal). Ukuran total blob dibatasi dengan eviction LRU berdasarkan mtime
+yang di-touch setiap kali blob dibaca. Miss bersamaan untuk URL yang sama
+hanya memicu satu request ke SIS (request coalescing).
+"""
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .biometrics import decode_data_url
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHOTO_CACHE_TTL = 60 * 60 * 24 * 7
+DEFAULT_PHOTO_CACHE_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_PHOTO_FETCH_TIMEOUT = 10
+DEFAULT_PHOTO_BASE_URL = 'https://sis.trisakti.ac.id/'
+# Prefix document root server SIS yang kadang ikut tersimpan di photo_url
+DEFAULT_PHOTO_DOCUMENT_ROOT = '/var/www/html/sis/'
+
+_BASE64_RE = re.compile(r'[A-Za-z0-9+/=\s]+')
+
+
+class PhotoUnavailable(Exception):
+    """Foto tidak ada atau tidak dapat diambil dari SIS."""
+
+
+@dataclass
+class Photo:
+    content_hash: str
+    mime: str
+    data: bytes = None
+    path: str = None
+
+    @property
+    def etag(self):
+        return f'"{self.content_hash}"'
+
+    def read(self):
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def _sniff_mime(data, fallback='image/jpeg'):
+    if data[:3] == b'\xff\xd8\xff':
+        return 'image/jpeg'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return fallback
+
+
+def _decode_base64_photo(value):
+    """Bytes gambar jika value base64 mentah berisi format gambar yang dikenal."""
+    if not _BASE64_RE.fullmatch(value):
+        return None
+    try:
+        data = base64.b64decode(value, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+    return data if _sniff_mime(data, fallback=None) else None
+
+
+def decode_inline_photo(value):
+    """Foto yang tersimpan langsung di kolom photo_url (data URL / base64)."""
+    if value.startswith('data:'):
+        mime, data = decode_data_url(value, default_mime='image/jpeg')
+    else:
+        data = _decode_base64_photo(value)
+        if data is None:
+            raise PhotoUnavailable("Invalid inline photo")
+        mime = _sniff_mime(data)
+    if not data:
+        raise PhotoUnavailable("Empty photo")
+    return Photo(content_hash=hashlib.sha256(data).hexdigest(), mime=mime, data=data)
+
+
+def absolute_photo_url(path):
+    """Path relatif photo_url -> URL absolut di server SIS (SIS_PHOTO_BASE_URL)."""
+    base_url = getattr(settings, 'SIS_PHOTO_BASE_URL', DEFAULT_PHOTO_BASE_URL)
+    if not base_url:
+        raise PhotoUnavailable("SIS_PHOTO_BASE_URL is not configured")
+    document_root = getattr(settings, 'SIS_PHOTO_DOCUMENT_ROOT', DEFAULT_PHOTO_DOCUMENT_ROOT)
+    if document_root and path.startswith(document_root):
+        path = path[len(document_root):]
+    return urllib.parse.urljoin(base_url, urllib.parse.quote(path.lstrip('/'), safe='/%?=&'))
+
+
+def fetch_remote_photo(url, timeout):
+    request = urllib.request.Request(url, headers={'Accept': 'image/*'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read()
+            mime = response.headers.get_content_type()
+    except OSError as exc:
+        raise PhotoUnavailable(f"Failed to fetch photo: {exc}")
+    if not data:
+        raise PhotoUnavailable("Empty photo")
+    if not mime.startswith('image/'):
+        mime = _sniff_mime(data)
+    return mime, data
+
+
+class _Inflight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.photo = None
+        self.error = None
+
+
+class PhotoDiskCache:
+    """Cache foto URL di disk: content-addressed, TTL, LRU dengan batas ukuran."""
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None, timeout=None, fetcher=None):
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._timeout = timeout
+        self.fetcher = fetcher or fetch_remote_photo
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._total_bytes = None
+
+    @property
+    def cache_dir(self):
+        if self._cache_dir is not None:
+            return str(self._cache_dir)
+        return str(getattr(settings, 'SIS_PHOTO_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'sis-photos')))
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'SIS_PHOTO_CACHE_TTL', DEFAULT_PHOTO_CACHE_TTL)
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, 'SIS_PHOTO_CACHE_MAX_BYTES', DEFAULT_PHOTO_CACHE_MAX_BYTES)
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'SIS_PHOTO_FETCH_TIMEOUT', DEFAULT_PHOTO_FETCH_TIMEOUT)
+
+    # ---- layout ----
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.cache_dir, 'blobs', content_hash[:2], content_hash)
+
+    def _ref_path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'refs', f'{key}.json')
+
+    def _write_atomic(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _read_ref(self, url):
+        try:
+            with open(self._ref_path(url), 'r', encoding='utf-8') as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        path = self._blob_path(ref['hash'])
+        if not os.path.exists(path):
+            return None
+        return ref
+
+    def _photo_from_ref(self, ref):
+        path = self._blob_path(ref['hash'])
+        try:
+            os.utime(path)  # tandai baru dipakai (LRU)
+        except OSError:
+            return None
+        return Photo(content_hash=ref['hash'], mime=ref['mime'], path=path)
+
+    # ---- public API ----
+
+    def get(self, url):
+        ref = self._read_ref(url)
+        if ref and time.time() - ref['fetched_at'] < self.ttl:
+            photo = self._photo_from_ref(ref)
+            if photo:
+                return photo
+
+        with self._lock:
+            inflight = self._inflight.get(url)
+            leader = inflight is None
+            if leader:
+                inflight = self._inflight[url] = _Inflight()
+
+        if not leader:
+            inflight.event.wait(self.timeout + 1)
+            if inflight.photo is not None:
+                return inflight.photo
+            raise inflight.error or PhotoUnavailable("Photo fetch timed out")
+
+        try:
+            inflight.photo = self._refresh(url, stale=ref)
+            return inflight.photo
+        except PhotoUnavailable as exc:
+            inflight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+            inflight.event.set()
+
+    def _refresh(self, url, stale=None):
+        try:
+            mime, data = self.fetcher(url, self.timeout)
+        except PhotoUnavailable:
+            # SIS lambat / down: pakai foto lama jika masih ada
+            photo = self._photo_from_ref(stale) if stale else None
+            if photo:
+                logger.warning("Serving stale SIS photo for %s", url)
+                return photo
+            raise
+
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            self._write_atomic(path, data)
+            self._track(len(data))
+        ref = {'hash': content_hash, 'mime': mime, 'fetched_at': time.time()}
+        self._write_atomic(self._ref_path(url), json.dumps(ref).encode('utf-8'))
+        return Photo(content_hash=content_hash, mime=mime, path=path)
+
+    # ---- eviction ----
+
+    def _blobs(self):
+        root = os.path.join(self.cache_dir, 'blobs')
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.startswith('.tmp-'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _track(self, added):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._blobs())
+            else:
+                self._total_bytes += added
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self, target_bytes=None):
+        """Hapus blob yang paling lama tidak dipakai sampai di bawah batas (90%)."""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        with self._lock:
+            blobs = sorted(self._blobs(), key=lambda blob: blob[2])
+            total = sum(size for _, size, _ in blobs)
+            removed = 0
+            for path, size, _ in blobs:
+                if total <= target_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total_bytes = total
+        return removed
+
+
+photo_cache = PhotoDiskCache()
+
+
+def resolve_photo(photo_url, cache=None):
+    """Photo untuk nilai photo_url SIS (URL -> disk cache, inline -> decode)."""
+    value = (photo_url or '').strip()
+    if not value:
+        raise PhotoUnavailable("No photo")
+    if value.startswith(('http://', 'https://')):
+        return (cache or photo_cache).get(value)
+    if value.startswith('data:') or _decode_base64_photo(value) is not None:
+        return decode_inline_photo(value)
+    # Selain data URL / base64 gambar: path relatif di server SIS
+    return (cache or photo_cache).get(absolute_photo_url(value))
@@ -0,0 +1,84 @@
+"""
+Snapshot roster ringkas per SisCourseClass.
+
+Satu query (SisEnrollment + EXISTS biometrik) menghasilkan baris
+[nim, nama, referensi foto, biometric]; versi = SHA-256 isi roster.
+Snapshot di-cache dengan key berisi versi data kelas yang dihitung dari
+database (updated_at kelas, jumlah / id enrollment, updated_at mahasiswa
+terakhir) plus coverage_version, sehingga sync dari proses lain
+(sync_sis_data) langsung terlihat tanpa perlu cache bersama.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Count, ExpressionWrapper, Max, OuterRef, Q, Sum
+from django.urls import reverse
+
+from .coverage import biometric_annotations, classify_coverage, coverage_version
+from .models import SisCourseClass, SisEnrollment
+
+
+ROSTER_CACHE_TIMEOUT = 60 * 60 * 24
+ROSTER_FIELDS = ('nim', 'name', 'photo', 'biometric')
+
+
+def roster_version(class_id):
+    """
+    Versi data roster dari database (satu query agregat): berubah saat kelas
+    di-update (churn enrollment lewat sync ikut mengubah content_hash kelas),
+    enrollment ditambah / dihapus, atau data mahasiswanya di-update.
+    """
+    row = (
+        SisCourseClass.objects.filter(id=class_id)
+        .order_by()
+        .aggregate(
+            updated=Max('updated_at'),
+            total=Count('enrollments'),
+            id_sum=Sum('enrollments__id'),
+            latest_id=Max('enrollments__id'),
+            student_updated=Max('enrollments__student__updated_at'),
+        )
+    )
+    return hashlib.sha1(repr(sorted(row.items())).encode('utf-8')).hexdigest()[:16]
+
+
+def build_roster(class_id):
+    rows = (
+        SisEnrollment.objects
+        .filter(course_class_id=class_id)
+        .values('student_id', 'student__name')
+        .annotate(
+            has_photo=ExpressionWrapper(~Q(student__photo_url=''), output_field=BooleanField()),
+            **biometric_annotations(OuterRef('student_id')),
+        )
+        .order_by('student_id')
+    )
+
+    students = []
+    for row in rows:
+        nim = row['student_id']
+        _, _, coverage = classify_coverage(row)
+        students.append([
+            nim,
+            row['student__name'],
+            reverse('attendance:student-photo', args=[nim]) if row['has_photo'] else None,
+            coverage == 'complete',
+        ])
+
+    encoded = json.dumps(students, separators=(',', ':'), ensure_ascii=False)
+    return {
+        'class_id': class_id,
+        'version': hashlib.sha256(encoded.encode('utf-8')).hexdigest(),
+        'fields': list(ROSTER_FIELDS),
+        'students': students,
+    }
+
+
+def get_roster(class_id):
+    key = f'attendance:roster:{class_id}:{roster_version(class_id)}:{coverage_version()}'
+    roster = cache.get(key)
+    if roster is None:
+        roster = build_roster(class_id)
+        cache.set(key, roster, ROSTER_CACHE_TIMEOUT)
+    return roster
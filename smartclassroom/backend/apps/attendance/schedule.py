@@ -0,0 +1,107 @@
+"""
+Indeks jadwal kuliah SIS: "kelas apa yang berjalan sekarang / hari ini"
+untuk dosen atau ruangan tertentu.
+
+SisCourseClass.weekday diisi oleh sync_sis_data dari nama hari
+(DAY_NAME_TO_INDEX) dan diindeks bersama start_time dan room, sehingga
+pencarian cukup satu query terindeks + prefetch dosen.
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from .models import SisCourseClass, SisCourseClassLecturer
+
+
+DEFAULT_SIS_SCHEDULE_TIME_ZONE = 'Asia/Jakarta'
+
+
+def local_now():
+    """Waktu sekarang di zona waktu jadwal kampus (jadwal SIS dalam jam lokal)."""
+    zone = getattr(settings, 'SIS_SCHEDULE_TIME_ZONE', DEFAULT_SIS_SCHEDULE_TIME_ZONE)
+    return timezone.now().astimezone(ZoneInfo(zone))
+
+
+def _lecturer_filter(lecturer):
+    condition = Q(lecturers__lecturer_id=lecturer)
+    if lecturer.isdigit():
+        condition |= Q(lecturers__lecturer__id_staff=int(lecturer))
+    return condition
+
+
+def schedule_queryset(weekday, lecturer=None, room=None, at=None):
+    """
+    Kelas pada weekday tertentu, opsional difilter dosen (StaffId / IdStaff),
+    ruangan, dan jam `at` (hanya kelas yang sedang berlangsung).
+    """
+    classes = SisCourseClass.objects.filter(weekday=weekday)
+    if room:
+        classes = classes.filter(room=room)
+    if lecturer:
+        classes = classes.filter(_lecturer_filter(lecturer))
+    if at is not None:
+        classes = classes.filter(start_time__lte=at, end_time__gt=at)
+    return (
+        classes
+        .select_related('course')
+        .prefetch_related(Prefetch(
+            'lecturers',
+            queryset=SisCourseClassLecturer.objects.select_related('lecturer'),
+        ))
+        .order_by('start_time', 'room', 'id')
+        .distinct()
+    )
+
+
+def _serialize_class(course_class):
+    return {
+        'id': course_class.id,
+        'course_id': course_class.course_id,
+        'course_code': course_class.course.code,
+        'course_name': course_class.course.name,
+        'class_code': course_class.class_code,
+        'room': course_class.room,
+        'day': course_class.day,
+        'weekday': course_class.weekday,
+        'start_time': course_class.start_time.strftime('%H:%M') if course_class.start_time else None,
+        'end_time': course_class.end_time.strftime('%H:%M') if course_class.end_time else None,
+        'lecturers': [
+            {'id': link.lecturer.id, 'name': link.lecturer.name}
+            for link in course_class.lecturers.all()
+        ],
+    }
+
+
+def get_schedule(lecturer=None, room=None, when='today', moment=None):
+    """
+    when='today': semua kelas hari ini; when='now': kelas yang sedang berlangsung.
+    moment: datetime lokal acuan (default local_now()).
+    """
+    moment = moment or local_now()
+    at = moment.time().replace(microsecond=0) if when == 'now' else None
+    classes = schedule_queryset(moment.weekday(), lecturer=lecturer, room=room, at=at)
+    return {
+        'date': moment.date().isoformat(),
+        'weekday': moment.weekday(),
+        'time': at.strftime('%H:%M:%S') if at else None,
+        'when': when,
+        'lecturer': lecturer,
+        'room': room,
+        'classes': [_serialize_class(course_class) for course_class in classes],
+    }
+
+
+def parse_moment(date_value=None, time_value=None):
+    """Gabungkan ?date=YYYY-MM-DD dan ?time=HH:MM dengan waktu lokal sekarang."""
+    moment = local_now()
+    if date_value:
+        moment = datetime.combine(
+            datetime.strptime(date_value, '%Y-%m-%d').date(), moment.timetz()
+        )
+    if time_value:
+        parsed = datetime.strptime(time_value, '%H:%M').time()
+        moment = moment.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0)
+    return moment
@@ -2,7 +2,8 @@ from rest_framework import serializers
 from .models import (
     AttendanceSession, AttendanceRecord,
     SisCourse, SisLecturer, SisStudent, SisCourseClass, SisEnrollment,
-    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset
+    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset,
+    BiometricJob
 )
 
 
@@ -181,7 +182,18 @@ class StudentCourseAttendanceSerializer(serializers.Serializer):
 # Biometric Registration
 # ==========================================
 
-class BiometricRegistrationSerializer(serializers.ModelSerializer):
+class BiometricMediaSerializerMixin:
+    """Isi field media dari BiometricAsset (TextField dikosongkan saat save)"""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field in instance.MEDIA_FIELDS:
+            if field in data and not data[field]:
+                data[field] = instance.get_media_data_url(field)
+        return data
+
+
+class BiometricRegistrationSerializer(BiometricMediaSerializerMixin, serializers.ModelSerializer):
     """Serializer for BiometricRegistration model"""
 
     class Meta:
@@ -226,15 +238,14 @@ class BiometricRegistrationSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         instance = super().update(instance, validated_data)
-        instance.is_complete = all([
-            instance.face_front, instance.face_left, instance.face_right, instance.face_up,
-            instance.voice_recording_1, instance.voice_recording_2,
-        ])
+        instance.is_complete = all(
+            instance.has_media(field) for field in instance.MEDIA_FIELDS
+        )
         instance.save(update_fields=['is_complete'])
         return instance
 
 
-class BiometricFaceDatasetSerializer(serializers.ModelSerializer):
+class BiometricFaceDatasetSerializer(BiometricMediaSerializerMixin, serializers.ModelSerializer):
     """Serializer for BiometricFaceDataset model"""
 
     class Meta:
@@ -265,7 +276,7 @@ class BiometricFaceDatasetSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class BiometricVoiceDatasetSerializer(serializers.ModelSerializer):
+class BiometricVoiceDatasetSerializer(BiometricMediaSerializerMixin, serializers.ModelSerializer):
     """Serializer for BiometricVoiceDataset model"""
 
     class Meta:
@@ -296,3 +307,15 @@ class BiometricVoiceDatasetSerializer(serializers.ModelSerializer):
                 attrs['student'] = student
 
         return attrs
+
+
+class BiometricJobSerializer(serializers.ModelSerializer):
+    """Status job pemrosesan biometrik (tanpa payload)"""
+
+    class Meta:
+        model = BiometricJob
+        fields = [
+            'id', 'kind', 'action', 'target_id', 'status', 'attempts',
+            'result', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
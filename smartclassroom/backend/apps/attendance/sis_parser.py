@@ -0,0 +1,261 @@
+"""
+Pembaca file `response-datakelas*.json` dari SIS Trisakti.
+
+Modul ini sengaja tidak meng-import Django sehingga aman dijalankan di
+worker ProcessPoolExecutor (parse + normalisasi per program); penulisan ke
+database tetap dilakukan satu writer di sis_sync. Worker menulis entry
+ternormalisasi satu per satu ke file spool sehingga baik worker maupun
+writer hanya memegang satu entry (atau satu chunk) di memori.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+from datetime import datetime
+
+
+SIS_FILE_PATTERN = re.compile(r'^response-datakelas(?P<program>[A-Za-z0-9_-]+)\.json$')
+
+# Sisa buffer yang masih bisa menjadi lanjutan sebuah angka JSON
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+
+# Nama hari -> weekday (sama dengan date.weekday())
+DAY_NAME_TO_INDEX = {
+    "monday": 0,
+    "mon": 0,
+    "senin": 0,
+    "tuesday": 1,
+    "tue": 1,
+    "selasa": 1,
+    "wednesday": 2,
+    "wed": 2,
+    "rabu": 2,
+    "thursday": 3,
+    "thu": 3,
+    "kamis": 3,
+    "friday": 4,
+    "fri": 4,
+    "jumat": 4,
+    "jum'at": 4,
+    "saturday": 5,
+    "sat": 5,
+    "sabtu": 5,
+    "sunday": 6,
+    "sun": 6,
+    "minggu": 6,
+}
+
+
+def get_weekday_index(day_name: str):
+    """Nama hari (Indonesia / Inggris) -> weekday integer (Senin = 0)."""
+    if not day_name:
+        return None
+    return DAY_NAME_TO_INDEX.get(day_name.strip().lower())
+
+
+# ==========================================
+# Streaming reader
+# ==========================================
+
+def iter_object_items(fp, chunk_size=1 << 16):
+    """
+    Yield (key, value) dari object JSON top-level tanpa memuat seluruh file.
+    Setiap value di-decode utuh dengan json.JSONDecoder.raw_decode.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def peek():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return ''
+            fill()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # Angka di ujung buffer bisa saja masih terpotong ("1." / "1e+"),
+                # jadi value yang menyentuh ujung buffer di-decode ulang setelah fill()
+                if eof or not _NUMBER_TAIL.match(buffer, end):
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    if peek() != '{':
+        raise ValueError("Expected a JSON object at the top level")
+    pos += 1
+    if peek() == '}':
+        return
+
+    while True:
+        if peek() != '"':
+            raise ValueError(f"Expected an object key at offset {pos}")
+        key = decode()
+        if peek() != ':':
+            raise ValueError(f"Expected ':' after key {key!r}")
+        pos += 1
+        peek()
+        yield key, decode()
+
+        separator = peek()
+        if separator == ',':
+            pos += 1
+            continue
+        if separator == '}':
+            return
+        raise ValueError(f"Expected ',' or '}}' after key {key!r}")
+
+
+def iter_course_entries(path):
+    with open(path, 'r', encoding='utf-8-sig') as fp:
+        yield from iter_object_items(fp)
+
+
+def iter_chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==========================================
+# Normalisasi entry JSON
+# ==========================================
+
+def _parse_times(kelas):
+    start_time = None
+    end_time = None
+    try:
+        if kelas.get('mulai'):
+            start_time = datetime.strptime(kelas.get('mulai'), '%H:%M:%S').time()
+        if kelas.get('selesai'):
+            end_time = datetime.strptime(kelas.get('selesai'), '%H:%M:%S').time()
+    except ValueError:
+        pass
+    return start_time, end_time
+
+
+def normalize_course(course_key, course_data, program):
+    """Ubah satu entry `response-datakelas*.json` menjadi dict datar."""
+    kelas = course_data.get('kelas', {}) or {}
+    dosen = course_data.get('dosen', {}) or {}
+    students = course_data.get('Std', []) or []
+
+    course_id = str(kelas.get('IdCourse', course_key))
+    class_code = kelas.get('KodeKelas', '01')
+    start_time, end_time = _parse_times(kelas)
+
+    lecturers = []
+    for lecturer_key, lecturer_data in dosen.items():
+        # Handle case where lecturer_data is not a dict
+        if not isinstance(lecturer_data, dict):
+            continue
+        lecturers.append({
+            'id': str(lecturer_data.get('StaffId', lecturer_key)),
+            'id_staff': lecturer_data.get('IdStaff'),
+            'name': lecturer_data.get('StaffName', '') or '',
+            'photo_url': lecturer_data.get('photo', '') or '',
+        })
+
+    student_rows = []
+    for student_data in students:
+        nim = student_data.get('nim', '')
+        if not nim:
+            continue
+        student_rows.append({
+            'nim': nim,
+            'name': student_data.get('nama') or student_data.get('name') or student_data.get('NamaMhs') or '',
+            'photo_url': student_data.get('photo') or student_data.get('foto') or student_data.get('Photo') or '',
+        })
+
+    entry = {
+        'course': {
+            'id': course_id,
+            'code': kelas.get('KodeMk', '') or '',
+            'name': kelas.get('Matakuliah', '') or '',
+            'program': program,
+        },
+        'class': {
+            'id': f"{course_id}_{class_code}",
+            'course_id': course_id,
+            'class_code': class_code,
+            'room': kelas.get('KodeRuang', '') or '',
+            'day': kelas.get('hari', '') or '',
+            'weekday': get_weekday_index(kelas.get('hari', '') or ''),
+            'start_time': start_time,
+            'end_time': end_time,
+        },
+        'lecturers': lecturers,
+        'students': student_rows,
+        'program': program,
+    }
+    entry['class']['content_hash'] = content_fingerprint(entry)
+    return entry
+
+
+def content_fingerprint(entry):
+    """SHA-256 dari entry ternormalisasi (tanpa content_hash itu sendiri)."""
+    payload = dict(entry, **{
+        'class': {k: v for k, v in entry['class'].items() if k != 'content_hash'},
+    })
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def spool_program_entries(path, program, spool_path):
+    """
+    Worker process pool: parse + normalisasi satu file program, tulis tiap
+    entry (pickle berurutan) ke spool_path. Return jumlah entry.
+    """
+    count = 0
+    with open(spool_path, 'wb') as out:
+        for course_key, course_data in iter_course_entries(path):
+            pickle.dump(normalize_course(course_key, course_data, program), out, pickle.HIGHEST_PROTOCOL)
+            count += 1
+    return count
+
+
+def iter_spooled_entries(spool_path):
+    """Baca kembali entry hasil spool_program_entries satu per satu."""
+    with open(spool_path, 'rb') as fp:
+        while True:
+            try:
+                yield pickle.load(fp)
+            except EOFError:
+                return
+
+
+def discover_program_files(directory):
+    """Cari semua file `response-datakelas<PROGRAM>.json` di folder SIS."""
+    found = {}
+    for filename in os.listdir(directory):
+        match = SIS_FILE_PATTERN.match(filename)
+        if match:
+            found[match.group('program')] = os.path.join(directory, filename)
+    return found
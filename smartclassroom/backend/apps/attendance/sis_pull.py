@@ -0,0 +1,167 @@
+"""
+Pull file export SIS per program secara berkala (dipakai oleh command
+pull_sis_data).
+
+Setiap program di-fetch dengan conditional request (If-None-Match /
+If-Modified-Since). Respons 304 atau isi yang hash-nya sama dilewati;
+file yang berubah ditulis atomik ke folder SIS lalu diserahkan ke
+pipeline sync_sis_data. Error per program memicu exponential backoff.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = '.sis-pull-state.json'
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+
+class SisPullError(Exception):
+    """Export SIS gagal diambil."""
+
+
+class PullResult:
+    NOT_MODIFIED = 'not_modified'
+    UNCHANGED = 'unchanged'
+    CHANGED = 'changed'
+
+
+def export_filename(program):
+    return f'response-datakelas{program}.json'
+
+
+class PullState:
+    """Metadata per program (etag, last_modified, hash, backoff) di file JSON."""
+
+    def __init__(self, path):
+        self.path = path
+        self.programs = {}
+
+    @classmethod
+    def load(cls, directory):
+        state = cls(os.path.join(directory, STATE_FILENAME))
+        try:
+            with open(state.path, 'r', encoding='utf-8') as f:
+                state.programs = json.load(f).get('programs', {})
+        except (OSError, ValueError):
+            pass
+        return state
+
+    def get(self, program):
+        return self.programs.setdefault(program, {
+            'etag': None,
+            'last_modified': None,
+            'content_hash': None,
+            'synced_hash': None,
+            'failures': 0,
+            'next_attempt': 0.0,
+        })
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'programs': self.programs}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def backoff_delay(failures, base, maximum, jitter=0.1):
+    """Delay exponential: base * 2^(failures-1), dibatasi maximum, +/- jitter."""
+    delay = min(maximum, base * (2 ** max(failures - 1, 0)))
+    return delay * (1 + random.uniform(-jitter, jitter))
+
+
+def fetch_export(url, program_state, destination, timeout=60):
+    """
+    Conditional GET ke `url`; simpan ke `destination` jika isi berubah.
+    Return PullResult.*; program_state di-update (etag, last_modified, content_hash).
+    """
+    headers = {'Accept': 'application/json'}
+    if program_state.get('etag'):
+        headers['If-None-Match'] = program_state['etag']
+    if program_state.get('last_modified'):
+        headers['If-Modified-Since'] = program_state['last_modified']
+
+    request = urllib.request.Request(url, headers=headers)
+    directory = os.path.dirname(destination)
+    os.makedirs(directory, exist_ok=True)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            # Streaming ke file sementara: memori tetap kecil untuk export besar
+            digest = hashlib.sha256()
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    while True:
+                        chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                        f.write(chunk)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                content_hash = digest.hexdigest()
+
+                if content_hash == program_state.get('content_hash') and os.path.exists(destination):
+                    os.unlink(tmp_path)
+                    result = PullResult.UNCHANGED
+                else:
+                    os.replace(tmp_path, destination)
+                    result = PullResult.CHANGED
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return PullResult.NOT_MODIFIED
+        raise SisPullError(f"HTTP {exc.code} from {url}")
+    except OSError as exc:
+        raise SisPullError(f"Failed to fetch {url}: {exc}")
+
+    program_state.update(etag=etag, last_modified=last_modified, content_hash=content_hash)
+    return result
+
+
+def pull_due_programs(programs, url_template, directory, state, now=None, timeout=60,
+                      backoff_base=60, backoff_max=3600):
+    """
+    Fetch program yang sudah jatuh tempo. Return (results, to_sync):
+    results {program: PullResult / 'error: ...' / 'backoff'}, to_sync = program yang
+    isinya belum pernah berhasil di-sync (berubah sekarang atau sync sebelumnya gagal).
+    """
+    now = time.time() if now is None else now
+    results = {}
+    to_sync = []
+    for program in programs:
+        program_state = state.get(program)
+        if program_state['next_attempt'] > now:
+            results[program] = 'backoff'
+            continue
+
+        url = url_template.format(program=program)
+        destination = os.path.join(directory, export_filename(program))
+        try:
+            results[program] = fetch_export(url, program_state, destination, timeout=timeout)
+        except SisPullError as exc:
+            program_state['failures'] += 1
+            delay = backoff_delay(program_state['failures'], backoff_base, backoff_max)
+            program_state['next_attempt'] = now + delay
+            results[program] = f'error: {exc}'
+            logger.warning("SIS pull for %s failed (%s), retrying in %.0fs", program, exc, delay)
+            continue
+
+        program_state['failures'] = 0
+        program_state['next_attempt'] = 0.0
+        if program_state['content_hash'] and program_state['content_hash'] != program_state['synced_hash']:
+            to_sync.append(program)
+    return results, to_sync
@@ -0,0 +1,373 @@
+"""
+Pipeline sinkronisasi data SIS Trisakti (dipakai oleh command sync_sis_data).
+
+Tahapan:
+1. load  - ambil semua key + nilai yang sudah ada di database sekali
+2. diff  - bandingkan isi file dengan state di memori
+3. apply - tulis perubahan dengan bulk_create / bulk_update / delete per batch
+
+File dibaca secara streaming (lihat sis_parser) dan diproses per chunk,
+sehingga memori untuk isi file dibatasi oleh ukuran chunk, bukan ukuran
+file. State hasil load (key + nilai semua baris SIS) dan ringkasan
+perubahan tetap di memori selama run: sebanding dengan jumlah baris di
+database, bukan dengan ukuran file export.
+"""
+import time
+from collections import OrderedDict
+
+from django.utils import timezone
+
+from .models import (
+    SisCourse, SisLecturer, SisStudent,
+    SisCourseClass, SisCourseClassLecturer, SisEnrollment
+)
+
+
+COURSE_FIELDS = ('code', 'name', 'program')
+CLASS_FIELDS = (
+    'course_id', 'class_code', 'room', 'day', 'weekday', 'start_time', 'end_time', 'content_hash',
+)
+LECTURER_FIELDS = ('id_staff', 'name', 'photo_url')
+STUDENT_FIELDS = ('name', 'photo_url', 'program')
+
+# Entitas yang bisa muncul di banyak kelas: nilainya ditentukan entry terakhir
+SHARED_ENTITIES = ('courses', 'lecturers', 'students')
+
+ENTITY_MODELS = OrderedDict([
+    ('courses', (SisCourse, 'id', COURSE_FIELDS)),
+    ('classes', (SisCourseClass, 'id', CLASS_FIELDS)),
+    ('lecturers', (SisLecturer, 'id', LECTURER_FIELDS)),
+    ('students', (SisStudent, 'nim', STUDENT_FIELDS)),
+])
+
+
+class PhaseTimer:
+    """Catat durasi tiap fase sinkronisasi."""
+
+    def __init__(self):
+        self.timings = OrderedDict()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+
+class _Phase:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.monotonic() - self.started
+        self.timer.timings[self.name] = self.timer.timings.get(self.name, 0.0) + elapsed
+        return False
+
+
+# ==========================================
+# Load + diff
+# ==========================================
+
+class SisSyncState:
+    """
+    Snapshot key + nilai tabel SIS di memori, diperbarui selama diff.
+    Ukurannya sebanding dengan jumlah baris tabel SIS (dibaca sekali per run).
+    """
+
+    def __init__(self):
+        self.entities = {key: {} for key in ENTITY_MODELS}
+        # class_id -> {lecturer_id / nim: pk (None jika baru dibuat)}
+        self.class_lecturers = {}
+        self.enrollments = {}
+
+    @classmethod
+    def load(cls):
+        state = cls()
+        for key, (model, pk_field, fields) in ENTITY_MODELS.items():
+            rows = model.objects.values_list(pk_field, *fields).iterator()
+            state.entities[key] = {
+                row[0]: dict(zip(fields, row[1:])) for row in rows
+            }
+
+        links = SisCourseClassLecturer.objects.values_list('id', 'course_class_id', 'lecturer_id')
+        for pk, class_id, lecturer_id in links.iterator():
+            state.class_lecturers.setdefault(class_id, {})[lecturer_id] = pk
+
+        enrollments = SisEnrollment.objects.values_list('id', 'course_class_id', 'student_id')
+        for pk, class_id, nim in enrollments.iterator():
+            state.enrollments.setdefault(class_id, {})[nim] = pk
+        return state
+
+
+class SisChangeSet:
+    """
+    Kumpulan perubahan hasil diff.
+    creates/updates/*_creates/*_deletes adalah pekerjaan yang belum ditulis
+    (dikosongkan oleh flush() setelah tiap chunk di-apply); created/updated
+    dan counter lainnya adalah total untuk ringkasan.
+    """
+
+    def __init__(self):
+        self.creates = {key: OrderedDict() for key in ENTITY_MODELS}
+        self.updates = {key: OrderedDict() for key in ENTITY_MODELS}
+        self.seen = {key: set() for key in ENTITY_MODELS}
+        self.created = {key: set() for key in ENTITY_MODELS}
+        self.updated = {key: set() for key in ENTITY_MODELS}
+        self.link_creates = []
+        # deletes: (class_id, member, pk); pk None = baris yang dibuat di run ini
+        self.link_deletes = []
+        self.enrollment_creates = []
+        self.enrollment_deletes = []
+        self.links_created = 0
+        self.links_removed = 0
+        self.enrollments_created = 0
+        self.enrollments_removed = 0
+        # class_id -> {'added': [...], 'removed': [...]}
+        self.enrollment_churn = OrderedDict()
+        self.courses_processed = 0
+        self.courses_skipped = 0
+        # Nilai akhir course / dosen / mahasiswa (dipakai banyak kelas) dari
+        # semua entry run ini, termasuk yang dilewati; ditulis oleh resolve_shared()
+        self.shared = {key: OrderedDict() for key in SHARED_ENTITIES}
+
+    def unchanged(self, key):
+        return len(self.seen[key] - self.created[key] - self.updated[key])
+
+    def to_report(self):
+        """Change set yang belum ditulis sebagai dict siap JSON (dipakai --dry-run)."""
+        models = OrderedDict()
+        for key, (model, pk_field, fields) in ENTITY_MODELS.items():
+            models[model.__name__] = {
+                'create': list(self.creates[key]),
+                'update': {pk: sorted(changed) for pk, changed in self.updates[key].items()},
+                'delete': [],
+            }
+        member_sets = (
+            (SisCourseClassLecturer, 'lecturer', self.link_creates, self.link_deletes),
+            (SisEnrollment, 'student', self.enrollment_creates, self.enrollment_deletes),
+        )
+        for model, member_field, creates, deletes in member_sets:
+            models[model.__name__] = {
+                'create': [
+                    {'course_class': class_id, member_field: member}
+                    for class_id, member in creates
+                ],
+                'update': {},
+                'delete': [
+                    {'course_class': class_id, member_field: member}
+                    for class_id, member, _ in deletes
+                ],
+            }
+        return {
+            'courses_processed': self.courses_processed,
+            'courses_skipped': self.courses_skipped,
+            'models': models,
+            'enrollment_churn': self.enrollment_churn,
+        }
+
+    def flush(self):
+        """Tandai pekerjaan chunk saat ini sudah ditulis."""
+        self.links_created += len(self.link_creates)
+        self.links_removed += len(self.link_deletes)
+        self.enrollments_created += len(self.enrollment_creates)
+        self.enrollments_removed += len(self.enrollment_deletes)
+        for key in ENTITY_MODELS:
+            self.creates[key].clear()
+            self.updates[key].clear()
+        self.link_creates = []
+        self.link_deletes = []
+        self.enrollment_creates = []
+        self.enrollment_deletes = []
+
+
+def _upsert(state, changes, key, pk, values):
+    current = state.entities[key].get(pk)
+    changes.seen[key].add(pk)
+    if current is None:
+        state.entities[key][pk] = dict(values)
+        changes.creates[key][pk] = True
+        changes.created[key].add(pk)
+        return
+    changed = [field for field, value in values.items() if current.get(field) != value]
+    if not changed:
+        return
+    current.update((field, values[field]) for field in changed)
+    if pk in changes.creates[key]:
+        return
+    changes.updates[key].setdefault(pk, set()).update(changed)
+    if pk not in changes.created[key]:
+        changes.updated[key].add(pk)
+
+
+def _collect_shared(state, changes, key, pk, values):
+    """
+    Catat nilai terbaru entitas bersama (last writer wins). Baris baru langsung
+    dibuat agar link / enrollment chunk ini punya target FK; nilai akhirnya
+    ditulis resolve_shared() setelah semua entry.
+    """
+    changes.shared[key][pk] = values
+    if pk not in state.entities[key]:
+        _upsert(state, changes, key, pk, values)
+
+
+def _collect_student(state, changes, student, program):
+    nim = student['nim']
+    values = changes.shared['students'].get(nim)
+    if values is None and nim not in state.entities['students']:
+        values = {'name': student['name'], 'photo_url': student['photo_url'], 'program': program}
+    else:
+        # Nama/foto kosong di file tidak menimpa data yang sudah ada
+        values = dict(values or {}, program=program)
+        if student['name']:
+            values['name'] = student['name']
+        if student['photo_url']:
+            values['photo_url'] = student['photo_url']
+    _collect_shared(state, changes, 'students', nim, values)
+
+
+def resolve_shared(state, changes):
+    """
+    Tulis nilai akhir course / dosen / mahasiswa ke change set. Panggil sekali
+    setelah semua entry di-diff, lalu apply_changes() sekali lagi.
+    """
+    for key in SHARED_ENTITIES:
+        for pk, values in changes.shared[key].items():
+            _upsert(state, changes, key, pk, values)
+        changes.shared[key].clear()
+    return changes
+
+
+def _sync_members(current, desired, class_id, creates, deletes):
+    desired_set = set(desired)
+    added = [member for member in desired if member not in current]
+    removed = [member for member in current if member not in desired_set]
+    for member in removed:
+        pk = current[member]
+        if pk is None and (class_id, member) in creates:
+            creates.remove((class_id, member))
+        else:
+            deletes.append((class_id, member, pk))
+    creates.extend((class_id, member) for member in added)
+    return added, removed, {member: current.get(member) for member in desired}
+
+
+def diff_courses(entries, state, changes=None, force=False):
+    """
+    Bandingkan entry ternormalisasi dengan state; state ikut diperbarui.
+    Entry dengan content_hash sama seperti sync terakhir hanya melewati
+    tulisan kelas, link dosen dan enrollment (kecuali force). Course, dosen
+    dan mahasiswa bisa dipakai kelas lain yang berubah, jadi nilainya tetap
+    dikumpulkan dari semua entry dan ditulis oleh resolve_shared().
+    """
+    changes = changes or SisChangeSet()
+    for entry in entries:
+        course = entry['course']
+        course_class = entry['class']
+        class_id = course_class['id']
+
+        _collect_shared(state, changes, 'courses', course['id'], {f: course[f] for f in COURSE_FIELDS})
+        lecturer_ids = []
+        for lecturer in entry['lecturers']:
+            _collect_shared(state, changes, 'lecturers', lecturer['id'], {f: lecturer[f] for f in LECTURER_FIELDS})
+            if lecturer['id'] not in lecturer_ids:
+                lecturer_ids.append(lecturer['id'])
+        nims = []
+        for student in entry['students']:
+            _collect_student(state, changes, student, entry['program'])
+            if student['nim'] not in nims:
+                nims.append(student['nim'])
+
+        stored = state.entities['classes'].get(class_id)
+        if not force and stored and stored['content_hash'] == course_class['content_hash']:
+            changes.courses_skipped += 1
+            continue
+        changes.courses_processed += 1
+
+        _upsert(state, changes, 'classes', class_id, {f: course_class[f] for f in CLASS_FIELDS})
+
+        # Remove lecturers / enrollments no longer present in API for this class
+        _, _, state.class_lecturers[class_id] = _sync_members(
+            state.class_lecturers.get(class_id, {}), lecturer_ids, class_id,
+            changes.link_creates, changes.link_deletes,
+        )
+        added, removed, state.enrollments[class_id] = _sync_members(
+            state.enrollments.get(class_id, {}), nims, class_id,
+            changes.enrollment_creates, changes.enrollment_deletes,
+        )
+        if added or removed:
+            churn = changes.enrollment_churn.setdefault(class_id, {'added': [], 'removed': []})
+            churn['added'].extend(added)
+            churn['removed'].extend(removed)
+    return changes
+
+
+# ==========================================
+# Apply
+# ==========================================
+
+def _batches(items, batch_size):
+    items = list(items)
+    for offset in range(0, len(items), batch_size):
+        yield items[offset:offset + batch_size]
+
+
+def _delete_members(model, member_field, deletes, batch_size):
+    pks = [pk for _, _, pk in deletes if pk is not None]
+    for batch in _batches(pks, batch_size):
+        model.objects.filter(pk__in=batch).delete()
+    for class_id, member, pk in deletes:
+        if pk is None:
+            model.objects.filter(course_class_id=class_id, **{member_field: member}).delete()
+
+
+def apply_changes(changes, state, batch_size=500, timer=None):
+    """Tulis SisChangeSet ke database. Panggil di dalam transaction.atomic()."""
+    timer = timer or PhaseTimer()
+    now = timezone.now()
+
+    for key, (model, pk_field, fields) in ENTITY_MODELS.items():
+        with timer.phase(f'apply:{key}'):
+            values = state.entities[key]
+            created = [model(**{pk_field: pk}, **values[pk]) for pk in changes.creates[key]]
+            if created:
+                model.objects.bulk_create(
+                    created,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=[pk_field],
+                    update_fields=list(fields) + ['updated_at'],
+                )
+
+            updates = changes.updates[key]
+            if updates:
+                changed_fields = sorted(set().union(*updates.values()))
+                objs = [
+                    model(**{pk_field: pk}, **values[pk], updated_at=now)
+                    for pk in updates
+                ]
+                model.objects.bulk_update(objs, changed_fields + ['updated_at'], batch_size=batch_size)
+
+    with timer.phase('apply:deletes'):
+        _delete_members(SisCourseClassLecturer, 'lecturer_id', changes.link_deletes, batch_size)
+        _delete_members(SisEnrollment, 'student_id', changes.enrollment_deletes, batch_size)
+
+    with timer.phase('apply:links'):
+        SisCourseClassLecturer.objects.bulk_create(
+            [
+                SisCourseClassLecturer(course_class_id=class_id, lecturer_id=lecturer_id)
+                for class_id, lecturer_id in changes.link_creates
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        SisEnrollment.objects.bulk_create(
+            [
+                SisEnrollment(course_class_id=class_id, student_id=nim)
+                for class_id, nim in changes.enrollment_creates
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+    return timer
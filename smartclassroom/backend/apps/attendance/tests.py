@@ -0,0 +1,906 @@
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import re
+import time
+from datetime import time as clock, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .jobs import claim_jobs, enqueue_job, requeue_stale_jobs, run_job
+from .models import (
+    BiometricFaceDataset, BiometricJob, SisCourse, SisCourseClass, SisCourseClassLecturer, SisEnrollment,
+    SisLecturer, SisStudent
+)
+from .photos import PhotoDiskCache, PhotoUnavailable, resolve_photo
+from .sis_parser import iter_object_items
+from .sis_pull import PullResult, PullState, export_filename, fetch_export, pull_due_programs
+
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+JPEG_BYTES = b'\xff\xd8\xff\xe0' + b'\x01' * 64
+
+
+class SisStandIn:
+    """
+    Server HTTP lokal pengganti SIS. `routes` berisi path -> (status, headers, body)
+    atau callable(handler) -> (status, headers, body); setiap request dicatat.
+    """
+
+    def __init__(self, routes=None, delay=0):
+        self.routes = routes or {}
+        self.delay = delay
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests.append((self.path, dict(self.headers)))
+                if stand_in.delay:
+                    time.sleep(stand_in.delay)
+                route = stand_in.routes.get(self.path.split('?', 1)[0])
+                if route is None:
+                    status, headers, body = 404, {}, b''
+                elif callable(route):
+                    status, headers, body = route(self)
+                else:
+                    status, headers, body = route
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}/'
+
+    def hits(self, path):
+        return sum(1 for requested, _ in self.requests if requested.split('?', 1)[0] == path)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PhotoDiskCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+
+    def make_cache(self, **kwargs):
+        return PhotoDiskCache(cache_dir=self.cache_dir, timeout=2, **kwargs)
+
+    def test_fetches_once_then_serves_from_disk(self):
+        with SisStandIn({'/foto/1.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES)}) as sis:
+            cache = self.make_cache(ttl=60)
+            first = cache.get(sis.base_url + 'foto/1.png')
+            second = cache.get(sis.base_url + 'foto/1.png')
+        self.assertEqual(sis.hits('/foto/1.png'), 1)
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertEqual(second.read(), PNG_BYTES)
+        self.assertEqual(second.mime, 'image/png')
+
+    def test_identical_photos_share_one_blob(self):
+        routes = {
+            '/a.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES),
+            '/b.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES),
+        }
+        with SisStandIn(routes) as sis:
+            cache = self.make_cache(ttl=60)
+            first = cache.get(sis.base_url + 'a.png')
+            second = cache.get(sis.base_url + 'b.png')
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(len(list(cache._blobs())), 1)
+
+    def test_expired_ref_is_refetched_and_stale_photo_served_when_sis_is_down(self):
+        with SisStandIn({'/foto.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES)}) as sis:
+            url = sis.base_url + 'foto.png'
+            cache = self.make_cache(ttl=0)
+            cache.get(url)
+            sis.routes['/foto.png'] = (200, {'Content-Type': 'image/jpeg'}, JPEG_BYTES)
+            refreshed = cache.get(url)
+            self.assertEqual(sis.hits('/foto.png'), 2)
+            self.assertEqual(refreshed.read(), JPEG_BYTES)
+
+            sis.routes['/foto.png'] = (500, {}, b'')
+            stale = cache.get(url)
+        self.assertEqual(stale.read(), JPEG_BYTES)
+
+    def test_missing_photo_raises(self):
+        with SisStandIn() as sis:
+            cache = self.make_cache(ttl=60)
+            with self.assertRaises(PhotoUnavailable):
+                cache.get(sis.base_url + 'missing.png')
+
+    def test_concurrent_misses_are_coalesced(self):
+        with SisStandIn({'/slow.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES)}, delay=0.3) as sis:
+            cache = self.make_cache(ttl=60)
+            url = sis.base_url + 'slow.png'
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(cache.get(url))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sis.hits('/slow.png'), 1)
+        self.assertEqual(len({photo.content_hash for photo in results}), 1)
+        self.assertEqual(len(results), 5)
+
+    def test_eviction_keeps_total_size_under_limit(self):
+        routes = {
+            f'/{index}.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES + bytes([index]) * 100)
+            for index in range(5)
+        }
+        with SisStandIn(routes) as sis:
+            cache = self.make_cache(ttl=60, max_bytes=500)
+            for index in range(5):
+                cache.get(f'{sis.base_url}{index}.png')
+                time.sleep(0.01)
+        sizes = [size for _, size, _ in cache._blobs()]
+        self.assertLessEqual(sum(sizes), 500)
+        self.assertLess(len(sizes), 5)
+
+
+class ResolvePhotoTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.cache = PhotoDiskCache(cache_dir=self.cache_dir, ttl=60, timeout=2)
+
+    def test_inline_base64_and_data_url(self):
+        encoded = base64.b64encode(JPEG_BYTES).decode('ascii')
+        self.assertEqual(resolve_photo(encoded, cache=self.cache).read(), JPEG_BYTES)
+        photo = resolve_photo(f'data:image/png;base64,{base64.b64encode(PNG_BYTES).decode()}', cache=self.cache)
+        self.assertEqual(photo.mime, 'image/png')
+        self.assertEqual(photo.read(), PNG_BYTES)
+
+    def test_relative_path_is_fetched_from_sis_base_url(self):
+        routes = {'/documents/staff/2554/foto.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES)}
+        with SisStandIn(routes) as sis, override_settings(
+            SIS_PHOTO_BASE_URL=sis.base_url, SIS_PHOTO_DOCUMENT_ROOT='/var/www/html/sis/'
+        ):
+            from_document_root = resolve_photo('/var/www/html/sis/documents/staff/2554/foto.png', cache=self.cache)
+            relative = resolve_photo('documents/staff/2554/foto.png', cache=self.cache)
+        self.assertEqual(from_document_root.read(), PNG_BYTES)
+        self.assertEqual(relative.content_hash, from_document_root.content_hash)
+        self.assertEqual(sis.hits('/documents/staff/2554/foto.png'), 1)
+
+    def test_empty_value_raises(self):
+        with self.assertRaises(PhotoUnavailable):
+            resolve_photo('', cache=self.cache)
+
+
+class PhotoEndpointTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+
+    def test_student_photo_headers_and_conditional_request(self):
+        routes = {'/foto/123.png': (200, {'Content-Type': 'image/png'}, PNG_BYTES)}
+        with SisStandIn(routes) as sis, override_settings(SIS_PHOTO_CACHE_DIR=self.cache_dir):
+            SisStudent.objects.create(nim='123', name='Budi', photo_url=sis.base_url + 'foto/123.png')
+            url = reverse('attendance:student-photo', args=['123'])
+
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, PNG_BYTES)
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertIn('max-age=', response['Cache-Control'])
+            etag = response['ETag']
+
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(not_modified.status_code, 304)
+
+            content_hash = etag.strip('"')
+            immutable = self.client.get(f'{url}?v={content_hash}')
+            self.assertIn('immutable', immutable['Cache-Control'])
+        self.assertEqual(sis.hits('/foto/123.png'), 1)
+
+    def test_unknown_student_returns_404(self):
+        response = self.client.get(reverse('attendance:student-photo', args=['404']))
+        self.assertEqual(response.status_code, 404)
+
+
+class PeopleLookupTests(TestCase):
+    def setUp(self):
+        self.url = reverse('attendance:students-lookup')
+
+    def test_non_object_body_returns_400(self):
+        for body in ([], ['123'], 'abc', 42):
+            response = self.client.post(self.url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_non_list_ids_return_400(self):
+        response = self.client.post(self.url, {'nims': '123'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_found_and_missing(self):
+        SisStudent.objects.create(nim='123', name='Budi')
+        response = self.client.post(self.url, {'nims': ['123', '999']}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['students']['123'], {'name': 'Budi', 'photo': None})
+        self.assertEqual(response.data['missing']['nims'], ['999'])
+
+
+class ClassRosterTests(TestCase):
+    def setUp(self):
+        course = SisCourse.objects.create(id='C1', code='IF101', name='Algoritma')
+        self.course_class = SisCourseClass.objects.create(id='C1_A', course=course, class_code='A')
+        self.student = SisStudent.objects.create(nim='123', name='Budi')
+        SisEnrollment.objects.create(course_class=self.course_class, student=self.student)
+        self.url = reverse('attendance:class-roster', args=['C1_A'])
+
+    def test_cached_roster_follows_writes_from_other_processes(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.data['students'], [['123', 'Budi', None, False]])
+
+        # Tulisan ala sync_sis_data: tanpa signal / invalidasi cache di proses ini
+        SisStudent.objects.filter(nim='123').update(name='Budi S', updated_at=timezone.now())
+        renamed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(renamed.status_code, 200)
+        self.assertEqual(renamed.data['students'][0][1], 'Budi S')
+
+        SisStudent.objects.create(nim='124', name='Ani')
+        SisEnrollment.objects.bulk_create([SisEnrollment(course_class=self.course_class, student_id='124')])
+        enrolled = self.client.get(self.url)
+        self.assertEqual([row[0] for row in enrolled.data['students']], ['123', '124'])
+
+        SisEnrollment.objects.filter(student_id='124').delete()
+        dropped = self.client.get(self.url)
+        self.assertEqual(dropped['ETag'], renamed['ETag'])
+
+    def test_unknown_class_returns_404(self):
+        self.assertEqual(self.client.get(reverse('attendance:class-roster', args=['nope'])).status_code, 404)
+
+
+def sis_export(name='Budi'):
+    entry = {
+        'kelas': {
+            'IdCourse': 'IF1', 'KodeMk': 'IF101', 'Matakuliah': 'Algoritma', 'KodeKelas': 'A',
+            'KodeRuang': 'R1', 'hari': 'Senin', 'mulai': '08:00:00', 'selesai': '10:00:00',
+        },
+        'dosen': {'1': {'StaffId': 'D1', 'StaffName': 'Dosen IF', 'photo': ''}},
+        'Std': [{'nim': '123', 'nama': name, 'photo': ''}],
+    }
+    return json.dumps({'c1': entry}).encode('utf-8')
+
+
+def conditional_export(body, etag):
+    """Route stand-in SIS yang menghormati If-None-Match."""
+    def route(handler):
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'application/json', 'ETag': etag}, body
+    return route
+
+
+class SisPullTests(SimpleTestCase):
+    def setUp(self):
+        self.sis_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sis_dir, True)
+        self.destination = os.path.join(self.sis_dir, export_filename('IF'))
+
+    def test_changed_then_not_modified(self):
+        routes = {'/export/IF': conditional_export(sis_export(), '"v1"')}
+        with SisStandIn(routes) as sis:
+            program_state = PullState.load(self.sis_dir).get('IF')
+            url = sis.base_url + 'export/IF'
+            self.assertEqual(fetch_export(url, program_state, self.destination), PullResult.CHANGED)
+            self.assertEqual(fetch_export(url, program_state, self.destination), PullResult.NOT_MODIFIED)
+        self.assertNotIn('If-None-Match', sis.requests[0][1])
+        self.assertEqual(sis.requests[1][1]['If-None-Match'], '"v1"')
+        with open(self.destination, 'rb') as f:
+            self.assertEqual(f.read(), sis_export())
+
+    def test_same_content_without_304_is_skipped_by_hash(self):
+        with SisStandIn({'/export/IF': (200, {'ETag': '"v1"'}, sis_export())}) as sis:
+            program_state = PullState.load(self.sis_dir).get('IF')
+            url = sis.base_url + 'export/IF'
+            fetch_export(url, program_state, self.destination)
+            mtime = os.stat(self.destination).st_mtime_ns
+            sis.routes['/export/IF'] = (200, {'ETag': '"v2"'}, sis_export())
+            self.assertEqual(fetch_export(url, program_state, self.destination), PullResult.UNCHANGED)
+        self.assertEqual(os.stat(self.destination).st_mtime_ns, mtime)
+        self.assertEqual(program_state['etag'], '"v2"')
+
+    def test_errors_back_off_exponentially_then_reset(self):
+        with SisStandIn({'/export/IF': (500, {}, b'')}) as sis:
+            template = sis.base_url + 'export/{program}'
+            state = PullState.load(self.sis_dir)
+            results, to_sync = pull_due_programs(['IF'], template, self.sis_dir, state, now=1000,
+                                                 backoff_base=60, backoff_max=3600)
+            self.assertTrue(results['IF'].startswith('error:'))
+            self.assertEqual(to_sync, [])
+            first_retry = state.get('IF')['next_attempt']
+            self.assertAlmostEqual(first_retry, 1060, delta=6)
+
+            # Belum jatuh tempo: tidak ada request ke SIS
+            results, _ = pull_due_programs(['IF'], template, self.sis_dir, state, now=1030,
+                                           backoff_base=60, backoff_max=3600)
+            self.assertEqual(results['IF'], 'backoff')
+            self.assertEqual(sis.hits('/export/IF'), 1)
+
+            pull_due_programs(['IF'], template, self.sis_dir, state, now=first_retry,
+                              backoff_base=60, backoff_max=3600)
+            self.assertAlmostEqual(state.get('IF')['next_attempt'] - first_retry, 120, delta=12)
+
+            sis.routes['/export/IF'] = (200, {}, sis_export())
+            results, to_sync = pull_due_programs(['IF'], template, self.sis_dir, state, now=10_000,
+                                                 backoff_base=60, backoff_max=3600)
+        self.assertEqual(results['IF'], PullResult.CHANGED)
+        self.assertEqual(to_sync, ['IF'])
+        self.assertEqual(state.get('IF')['failures'], 0)
+        self.assertEqual(state.get('IF')['next_attempt'], 0.0)
+
+
+class PullSisDataCommandTests(TestCase):
+    def setUp(self):
+        self.sis_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sis_dir, True)
+
+    def pull(self, sis, programs=('IF',)):
+        out = io.StringIO()
+        call_command(
+            'pull_sis_data', once=True, program=list(programs), sis_dir=self.sis_dir,
+            url_template=sis.base_url + 'export/{program}', stdout=out,
+        )
+        return out.getvalue()
+
+    def test_syncs_changed_export_and_skips_304_and_unchanged_hash(self):
+        routes = {'/export/IF': conditional_export(sis_export(), '"v1"')}
+        with SisStandIn(routes) as sis:
+            output = self.pull(sis)
+            self.assertIn('Changed programs: IF; syncing IF', output)
+            self.assertEqual(SisStudent.objects.get(nim='123').name, 'Budi')
+
+            output = self.pull(sis)
+            self.assertIn('IF: not_modified', output)
+            self.assertIn('No changes', output)
+            self.assertEqual(sis.requests[-1][1]['If-None-Match'], '"v1"')
+
+            # SIS mengabaikan conditional request tapi isinya sama
+            sis.routes['/export/IF'] = (200, {'ETag': '"v2"'}, sis_export())
+            output = self.pull(sis)
+            self.assertIn('IF: unchanged', output)
+            self.assertNotIn('syncing', output)
+
+            sis.routes['/export/IF'] = conditional_export(sis_export(name='Budi S'), '"v3"')
+            output = self.pull(sis)
+            self.assertIn('Changed programs: IF; syncing IF', output)
+        self.assertEqual(SisStudent.objects.get(nim='123').name, 'Budi S')
+
+    def test_change_in_one_program_resyncs_all_programs(self):
+        def export(room):
+            return json.dumps({
+                'c1': sis_entry('IF1', 'A', room, [('111', 'Budi', 'if.jpg')], [('D1', 11, 'Dosen IF')]),
+            }).encode('utf-8')
+
+        si_export = json.dumps({
+            'c1': sis_entry('SI1', 'A', 'R2', [('111', 'Budi Santoso', '')], [('D1', 11, 'Dosen SI')]),
+        }).encode('utf-8')
+        routes = {
+            '/export/IF': conditional_export(export('R1'), '"if-1"'),
+            '/export/SI': conditional_export(si_export, '"si-1"'),
+        }
+        with SisStandIn(routes) as sis:
+            self.pull(sis, programs=['IF', 'SI'])
+            self.assertEqual(SisStudent.objects.get(nim='111').program, 'SI')
+
+            # Hanya export IF berubah; mahasiswa bersama tetap di-resolve dari semua program
+            sis.routes['/export/IF'] = conditional_export(export('R9'), '"if-2"')
+            output = self.pull(sis, programs=['IF', 'SI'])
+            self.assertIn('SI: not_modified', output)
+            self.assertIn('Changed programs: IF; syncing IF, SI', output)
+        self.assertEqual(SisCourseClass.objects.get(id='IF1_A').room, 'R9')
+        self.assertEqual(
+            SisStudent.objects.filter(nim='111').values_list('name', 'photo_url', 'program').get(),
+            ('Budi Santoso', 'if.jpg', 'SI'),
+        )
+        self.assertEqual(SisLecturer.objects.get(id='D1').name, 'Dosen SI')
+
+
+def face_payload(nim='123', **overrides):
+    payload = {
+        'student_nim': nim,
+        'student_name': 'Budi',
+        **{
+            f'face_{angle}': 'data:image/jpeg;base64,' + base64.b64encode(JPEG_BYTES + angle.encode()).decode()
+            for angle in ('front', 'left', 'right', 'up')
+        },
+    }
+    payload.update(overrides)
+    return payload
+
+
+class BiometricJobTests(TestCase):
+    def test_enqueue_job_stores_pending_create_and_update(self):
+        created = enqueue_job(BiometricJob.KIND_FACE_DATASET, face_payload())
+        self.assertEqual(created.status, BiometricJob.STATUS_PENDING)
+        self.assertEqual(created.action, 'create')
+        self.assertIsNone(created.target_id)
+
+        dataset = BiometricFaceDataset.objects.create(student_nim='123')
+        updated = enqueue_job(BiometricJob.KIND_FACE_DATASET, {'student_name': 'Ani'}, instance=dataset, partial=True)
+        self.assertEqual(updated.action, 'update')
+        self.assertEqual(updated.target_id, dataset.pk)
+        self.assertTrue(updated.partial)
+
+    def test_pending_job_is_claimed_once(self):
+        jobs = [enqueue_job(BiometricJob.KIND_FACE_DATASET, face_payload()) for _ in range(3)]
+        first = claim_jobs(2)
+        second = claim_jobs(5)
+        self.assertEqual(first, [jobs[0].id, jobs[1].id])
+        self.assertEqual(second, [jobs[2].id])
+        self.assertEqual(claim_jobs(5), [])
+        for job in BiometricJob.objects.all():
+            self.assertEqual(job.status, BiometricJob.STATUS_RUNNING)
+            self.assertEqual(job.attempts, 1)
+            self.assertIsNotNone(job.started_at)
+
+    def test_run_job_saves_dataset_and_clears_payload(self):
+        job = enqueue_job(BiometricJob.KIND_FACE_DATASET, face_payload())
+        claim_jobs(1)
+        self.assertEqual(run_job(job.id), BiometricJob.STATUS_COMPLETED)
+
+        job.refresh_from_db()
+        dataset = BiometricFaceDataset.objects.get()
+        self.assertEqual(job.result['id'], str(dataset.pk))
+        self.assertEqual(job.result['student_nim'], '123')
+        self.assertEqual(job.target_id, dataset.pk)
+        self.assertEqual(job.payload, {})
+        self.assertIsNone(job.error)
+        # Data URL dipindah ke BiometricAsset
+        self.assertEqual(dataset.face_front, '')
+        self.assertEqual(dataset.get_media('face_front'), ('image/jpeg', JPEG_BYTES + b'front'))
+
+    def test_run_job_records_validation_errors(self):
+        job = enqueue_job(BiometricJob.KIND_FACE_DATASET, face_payload(face_up=''))
+        self.assertEqual(run_job(job.id), BiometricJob.STATUS_FAILED)
+        job.refresh_from_db()
+        self.assertIn('face_up', job.error['missing_fields'])
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(BiometricFaceDataset.objects.exists())
+
+    def test_run_job_fails_when_update_target_is_gone(self):
+        dataset = BiometricFaceDataset.objects.create(student_nim='123')
+        job = enqueue_job(BiometricJob.KIND_FACE_DATASET, {'student_name': 'Ani'}, instance=dataset, partial=True)
+        dataset.delete()
+        self.assertEqual(run_job(job.id), BiometricJob.STATUS_FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.error, {'message': 'Target object no longer exists.'})
+
+    def test_stale_running_jobs_are_requeued_or_failed(self):
+        stale, exhausted, busy = [enqueue_job(BiometricJob.KIND_FACE_DATASET, face_payload()) for _ in range(3)]
+        long_ago = timezone.now() - timedelta(hours=1)
+        BiometricJob.objects.update(status=BiometricJob.STATUS_RUNNING, started_at=long_ago, attempts=1)
+        BiometricJob.objects.filter(pk=exhausted.pk).update(attempts=3)
+
+        self.assertEqual(requeue_stale_jobs(15, 3, exclude=[busy.id]), (1, 1))
+        statuses = dict(BiometricJob.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[stale.id], BiometricJob.STATUS_PENDING)
+        self.assertEqual(statuses[exhausted.id], BiometricJob.STATUS_FAILED)
+        self.assertEqual(statuses[busy.id], BiometricJob.STATUS_RUNNING)
+
+
+class BiometricJobViewTests(TestCase):
+    def setUp(self):
+        self.url = reverse('attendance:biometric-face-dataset-list')
+
+    def test_sync_processing_by_default(self):
+        response = self.client.post(self.url, face_payload(), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('status_url', response.json())
+        self.assertFalse(BiometricJob.objects.exists())
+
+    @override_settings(BIOMETRIC_ASYNC_PROCESSING=True)
+    def test_async_create_returns_202_and_status_url(self):
+        response = self.client.post(self.url, face_payload(), content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['status'], BiometricJob.STATUS_PENDING)
+        self.assertNotIn('payload', data)
+        status_url = data['status_url']
+        self.assertTrue(status_url.endswith(reverse('attendance:biometric-job-detail', args=[data['id']])))
+
+        self.assertEqual(self.client.get(status_url).json()['status'], BiometricJob.STATUS_PENDING)
+        claim_jobs(1)
+        run_job(data['id'])
+        finished = self.client.get(status_url).json()
+        self.assertEqual(finished['status'], BiometricJob.STATUS_COMPLETED)
+        self.assertEqual(finished['result']['student_nim'], '123')
+
+    @override_settings(BIOMETRIC_ASYNC_PROCESSING=True)
+    def test_async_update_targets_existing_dataset(self):
+        dataset = BiometricFaceDataset.objects.create(student_nim='123')
+        response = self.client.patch(
+            reverse('attendance:biometric-face-dataset-detail', args=[dataset.pk]),
+            {'student_name': 'Ani'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        job = BiometricJob.objects.get()
+        self.assertEqual((job.action, job.target_id, job.partial), ('update', dataset.pk, True))
+
+
+def sis_entry(course_id, class_code, room, students, lecturers=(), code=None, start='08:00:00', end='10:00:00'):
+    """Satu entry export SIS (format response-datakelas<PROGRAM>.json)."""
+    return {
+        'kelas': {
+            'IdCourse': course_id, 'KodeMk': code or course_id, 'Matakuliah': f'Mata kuliah {course_id}',
+            'KodeKelas': class_code, 'KodeRuang': room, 'hari': 'Senin', 'mulai': start, 'selesai': end,
+        },
+        'dosen': {
+            str(index): {'StaffId': staff_id, 'IdStaff': id_staff, 'StaffName': name, 'photo': ''}
+            for index, (staff_id, id_staff, name) in enumerate(lecturers)
+        },
+        'Std': [{'nim': nim, 'nama': name, 'photo': photo} for nim, name, photo in students],
+    }
+
+
+SIS_EXPORT_V1 = {
+    'k1': sis_entry('IF1', 'A', 'R1', [('101', 'Ani', 'a.jpg'), ('102', 'Budi', ''), ('103', '', '')],
+                    [('D1', 11, 'Dosen Satu'), ('D2', 12, 'Dosen Dua')]),
+    'k2': sis_entry('IF1', 'B', 'R2', [('101', 'Ani', 'a.jpg'), ('104', 'Cici', '')],
+                    [('D1', 11, 'Dosen Satu')], end='bad'),
+    'k3': sis_entry('IF2', 'A', 'R3', [('105', 'Dedi', 'd.jpg')]),
+}
+
+# Ruang berubah, dosen / mahasiswa keluar-masuk, nama kosong tidak menimpa nama lama
+SIS_EXPORT_V2 = {
+    'k1': sis_entry('IF1', 'A', 'R9', [('101', 'Ani', 'a.jpg'), ('102', 'Budi S', '')],
+                    [('D1', 11, 'Dosen Satu')]),
+    'k2': SIS_EXPORT_V1['k2'],
+    'k3': sis_entry('IF2', 'A', 'R3', [('105', 'Dedi', 'e.jpg'), ('106', 'Eka', '')],
+                    [('D3', 13, 'Dosen Tiga')]),
+    'k4': sis_entry('IF3', 'A', 'R4', [('101', '', '')], [('D1', 11, 'Dosen Satu')]),
+}
+
+
+# Isi tabel hasil command sync_sis_data lama (update_or_create per baris)
+# untuk SIS_EXPORT_V1 lalu SIS_EXPORT_V2
+LEGACY_TABLES_V1 = {
+    'courses': [('IF1', 'IF1', 'Mata kuliah IF1', 'IF'), ('IF2', 'IF2', 'Mata kuliah IF2', 'IF')],
+    'classes': [
+        ('IF1_A', 'IF1', 'A', 'R1', 'Senin', clock(8), clock(10)),
+        ('IF1_B', 'IF1', 'B', 'R2', 'Senin', clock(8), None),
+        ('IF2_A', 'IF2', 'A', 'R3', 'Senin', clock(8), clock(10)),
+    ],
+    'lecturers': [('D1', 11, 'Dosen Satu', ''), ('D2', 12, 'Dosen Dua', '')],
+    'students': [
+        ('101', 'Ani', 'a.jpg', 'IF'), ('102', 'Budi', '', 'IF'), ('103', '', '', 'IF'),
+        ('104', 'Cici', '', 'IF'), ('105', 'Dedi', 'd.jpg', 'IF'),
+    ],
+    'links': [('IF1_A', 'D1'), ('IF1_A', 'D2'), ('IF1_B', 'D1')],
+    'enrollments': [
+        ('IF1_A', '101'), ('IF1_A', '102'), ('IF1_A', '103'), ('IF1_B', '101'), ('IF1_B', '104'), ('IF2_A', '105'),
+    ],
+}
+LEGACY_TABLES_V2 = {
+    'courses': [
+        ('IF1', 'IF1', 'Mata kuliah IF1', 'IF'), ('IF2', 'IF2', 'Mata kuliah IF2', 'IF'),
+        ('IF3', 'IF3', 'Mata kuliah IF3', 'IF'),
+    ],
+    'classes': [
+        ('IF1_A', 'IF1', 'A', 'R9', 'Senin', clock(8), clock(10)),
+        ('IF1_B', 'IF1', 'B', 'R2', 'Senin', clock(8), None),
+        ('IF2_A', 'IF2', 'A', 'R3', 'Senin', clock(8), clock(10)),
+        ('IF3_A', 'IF3', 'A', 'R4', 'Senin', clock(8), clock(10)),
+    ],
+    'lecturers': [('D1', 11, 'Dosen Satu', ''), ('D2', 12, 'Dosen Dua', ''), ('D3', 13, 'Dosen Tiga', '')],
+    'students': [
+        ('101', 'Ani', 'a.jpg', 'IF'), ('102', 'Budi S', '', 'IF'), ('103', '', '', 'IF'),
+        ('104', 'Cici', '', 'IF'), ('105', 'Dedi', 'e.jpg', 'IF'), ('106', 'Eka', '', 'IF'),
+    ],
+    'links': [('IF1_A', 'D1'), ('IF1_B', 'D1'), ('IF2_A', 'D3'), ('IF3_A', 'D1')],
+    'enrollments': [
+        ('IF1_A', '101'), ('IF1_A', '102'), ('IF1_B', '101'), ('IF1_B', '104'),
+        ('IF2_A', '105'), ('IF2_A', '106'), ('IF3_A', '101'),
+    ],
+}
+
+_WRITE_SQL_RE = re.compile(r'^\s*(INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+
+class IterObjectItemsTests(SimpleTestCase):
+    def test_small_chunks_match_json_loads(self):
+        document = json.dumps({
+            'a': 1.5,
+            'b': -12,
+            'c': 3e+10,
+            'd': 2.5e-7,
+            'e': 1234567890,
+            'f': {'nested': [1.25, -0.5, 'x, }'], 'flag': True, 'none': None},
+            'g': sis_entry('IF1', 'A', 'R1', [('111', 'Budi', 'if.jpg')], [('D1', 11, 'Dosen')]),
+            'h': 7,
+        }, indent=1)
+        expected = list(json.loads(document).items())
+        for chunk_size in range(1, 17):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_object_items(io.StringIO(document), chunk_size=chunk_size)), expected)
+
+    def test_number_split_at_chunk_boundary(self):
+        self.assertEqual(list(iter_object_items(io.StringIO('{"a": 1.5}'), chunk_size=8)), [('a', 1.5)])
+        self.assertEqual(list(iter_object_items(io.StringIO('{"a": 1e+3,"b":2}'), chunk_size=7)), [('a', 1000.0), ('b', 2)])
+
+
+class SisSyncTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.sis_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sis_dir, True)
+
+    def write_export(self, program, export):
+        with open(os.path.join(self.sis_dir, export_filename(program)), 'w', encoding='utf-8') as f:
+            json.dump(export, f)
+
+    def sync(self, **options):
+        options.setdefault('program', ['IF'])
+        out = io.StringIO()
+        call_command('sync_sis_data', sis_dir=self.sis_dir, stdout=out, stderr=io.StringIO(), **options)
+        return out.getvalue()
+
+    def counts(self, output):
+        """{'Students': (created, updated, unchanged), 'Enrollments': (created, removed), ...}"""
+        counts = {}
+        for label, numbers in re.findall(r'^([\w -]+): (\d+ created.*)$', output, re.MULTILINE):
+            counts[label] = tuple(int(number) for number in re.findall(r'\d+', numbers))
+        return counts
+
+    def tables(self):
+        return {
+            'courses': sorted(SisCourse.objects.values_list('id', 'code', 'name', 'program')),
+            'classes': sorted(SisCourseClass.objects.values_list(
+                'id', 'course_id', 'class_code', 'room', 'day', 'start_time', 'end_time'
+            )),
+            'lecturers': sorted(SisLecturer.objects.values_list('id', 'id_staff', 'name', 'photo_url')),
+            'students': sorted(SisStudent.objects.values_list('nim', 'name', 'photo_url', 'program')),
+            'links': sorted(SisCourseClassLecturer.objects.values_list('course_class_id', 'lecturer_id')),
+            'enrollments': sorted(SisEnrollment.objects.values_list('course_class_id', 'student_id')),
+        }
+
+    def writes(self, **options):
+        with CaptureQueriesContext(connection) as queries:
+            self.sync(**options)
+        return [query['sql'] for query in queries.captured_queries if _WRITE_SQL_RE.match(query['sql'])]
+
+
+class SisSyncTests(SisSyncTestMixin, TestCase):
+    def test_initial_sync_matches_legacy_command(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        counts = self.counts(self.sync())
+        self.assertEqual(counts['Courses'], (2, 0, 0))
+        self.assertEqual(counts['Course Classes'], (3, 0, 0))
+        self.assertEqual(counts['Lecturers'], (2, 0, 0))
+        self.assertEqual(counts['Students'], (5, 0, 0))
+        self.assertEqual(counts['Class-Lecturer links'], (3, 0))
+        self.assertEqual(counts['Enrollments'], (6, 0))
+        self.assertEqual(self.tables(), LEGACY_TABLES_V1)
+
+    def test_changed_export_creates_updates_and_deletes(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        self.sync()
+        self.write_export('IF', SIS_EXPORT_V2)
+        counts = self.counts(self.sync())
+        self.assertEqual(counts['Courses'], (1, 0, 2))
+        self.assertEqual(counts['Course Classes'], (1, 2, 0))
+        self.assertEqual(counts['Lecturers'], (1, 0, 1))
+        self.assertEqual(counts['Students'], (1, 2, 2))
+        self.assertEqual(counts['Class-Lecturer links'], (2, 1))
+        self.assertEqual(counts['Enrollments'], (2, 1))
+        self.assertEqual(self.tables(), LEGACY_TABLES_V2)
+
+    def test_rerun_writes_nothing(self):
+        self.write_export('IF', SIS_EXPORT_V2)
+        self.assertTrue(self.writes())
+        before = self.tables()
+        self.assertEqual(self.writes(), [])
+        self.assertEqual(self.writes(force=True), [])
+        self.assertEqual(self.tables(), before)
+
+    def test_small_batches_and_chunks_give_the_same_tables(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        self.sync(batch_size=1, chunk_size=1)
+        self.write_export('IF', SIS_EXPORT_V2)
+        self.sync(batch_size=1, chunk_size=1)
+        self.assertEqual(self.tables(), LEGACY_TABLES_V2)
+
+
+class SisMultiProgramSyncTests(SisSyncTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # Mahasiswa 111 ada di dua program dengan data berbeda
+        self.write_export('IF', {
+            'c1': sis_entry('IF1', 'A', 'R1', [('111', 'Budi', 'if.jpg'), ('222', 'Ani', '')],
+                            [('D1', 11, 'Dosen IF')]),
+        })
+        self.write_export('SI', {
+            'c1': sis_entry('SI1', 'A', 'R2', [('111', 'Budi Santoso', ''), ('333', 'Cici', '')],
+                            [('D1', 11, 'Dosen SI')]),
+        })
+
+    def reset(self):
+        for model in (SisEnrollment, SisCourseClassLecturer, SisCourseClass, SisCourse, SisLecturer, SisStudent):
+            model.objects.all().delete()
+
+    def test_shared_student_resolves_the_same_for_any_worker_count_and_order(self):
+        variants = [
+            {'program': ['IF', 'SI'], 'workers': 1},
+            {'program': ['IF', 'SI'], 'workers': 2},
+            {'program': ['SI', 'IF'], 'workers': 1},
+            {'program': ['SI', 'IF'], 'workers': 2},
+            {'all': True, 'workers': 2},
+            {'program': ['IF', 'SI'], 'chunk_size': 1},
+        ]
+        results = []
+        for options in variants:
+            with self.subTest(**options):
+                self.reset()
+                self.sync(**options)
+                results.append(self.tables())
+                # Program terakhir (urut abjad) menang; nilai kosong tidak menimpa
+                self.assertEqual(
+                    SisStudent.objects.filter(nim='111').values_list('name', 'photo_url', 'program').get(),
+                    ('Budi Santoso', 'if.jpg', 'SI'),
+                )
+                self.assertEqual(SisLecturer.objects.get(id='D1').name, 'Dosen SI')
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+
+    def test_incremental_and_forced_runs_keep_the_winner(self):
+        self.sync(program=['IF', 'SI'])
+        expected = self.tables()
+        self.write_export('IF', {
+            'c1': sis_entry('IF1', 'A', 'R9', [('111', 'Budi', 'if.jpg'), ('222', 'Ani', '')],
+                            [('D1', 11, 'Dosen IF')]),
+        })
+        self.sync(program=['IF', 'SI'])
+        self.assertEqual(SisStudent.objects.get(nim='111').program, 'SI')
+        self.sync(program=['IF', 'SI'], force=True)
+        tables = self.tables()
+        self.assertEqual(tables['students'], expected['students'])
+        self.assertEqual(tables['lecturers'], expected['lecturers'])
+
+
+class SisFingerprintSkipTests(SisSyncTestMixin, TestCase):
+    def skipped(self, output):
+        return int(re.search(r'Courses skipped \(unchanged fingerprint\): (\d+)', output).group(1))
+
+    def test_unchanged_courses_are_skipped(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        self.assertEqual(self.skipped(self.sync()), 0)
+        self.assertEqual(self.skipped(self.sync()), 3)
+
+        changed = dict(SIS_EXPORT_V1, k3=sis_entry('IF2', 'A', 'R7', [('105', 'Dedi', 'd.jpg')]))
+        self.write_export('IF', changed)
+        output = self.sync()
+        self.assertEqual(self.skipped(output), 2)
+        self.assertEqual(self.counts(output)['Course Classes'], (0, 1, 0))
+        self.assertEqual(SisCourseClass.objects.get(id='IF2_A').room, 'R7')
+
+    def test_force_rediffs_skipped_courses(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        self.sync()
+        # Perubahan di luar sync tidak terlihat oleh fingerprint
+        SisCourseClass.objects.filter(id='IF1_A').update(room='X')
+        SisEnrollment.objects.filter(course_class_id='IF1_A', student_id='102').delete()
+
+        self.sync()
+        self.assertEqual(SisCourseClass.objects.get(id='IF1_A').room, 'X')
+
+        output = self.sync(force=True)
+        self.assertEqual(self.skipped(output), 0)
+        self.assertEqual(self.counts(output)['Enrollments'], (1, 0))
+        self.assertEqual(self.tables(), LEGACY_TABLES_V1)
+
+    def test_shared_people_in_skipped_courses_still_take_part_in_resolution(self):
+        # Mahasiswa 111 di dua kelas; entry terakhir (k2) menentukan nilai akhirnya
+        export = {
+            'k1': sis_entry('IF1', 'A', 'R1', [('111', 'Budi', 'a.jpg')], [('D1', 11, 'Dosen Lama')]),
+            'k2': sis_entry('IF2', 'A', 'R2', [('111', 'Budi Santoso', '')], [('D1', 11, 'Dosen Baru')]),
+        }
+        self.write_export('IF', export)
+        self.sync()
+        expected = self.tables()
+        self.assertEqual(SisStudent.objects.get(nim='111').name, 'Budi Santoso')
+
+        # Hanya k1 berubah; k2 dilewati tetapi nilainya tetap menang
+        export['k1'] = sis_entry('IF1', 'A', 'R9', [('111', 'Budi', 'a.jpg')], [('D1', 11, 'Dosen Lama')])
+        self.write_export('IF', export)
+        output = self.sync()
+        self.assertEqual(self.skipped(output), 1)
+        self.assertEqual(self.counts(output)['Students'], (0, 0, 1))
+        self.assertEqual(self.counts(output)['Lecturers'], (0, 0, 1))
+        tables = self.tables()
+        self.assertEqual(tables['students'], expected['students'])
+        self.assertEqual(tables['lecturers'], expected['lecturers'])
+
+
+class SisDryRunTests(SisSyncTestMixin, TestCase):
+    def dry_run(self):
+        with CaptureQueriesContext(connection) as queries:
+            output = self.sync(dry_run=True)
+        writes = [query['sql'] for query in queries.captured_queries if _WRITE_SQL_RE.match(query['sql'])]
+        return json.loads(output), writes
+
+    def test_report_shape_and_no_writes(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        self.sync()
+        self.write_export('IF', SIS_EXPORT_V2)
+        before = self.tables()
+
+        report, writes = self.dry_run()
+        self.assertEqual(writes, [])
+        self.assertEqual(self.tables(), before)
+
+        self.assertEqual(
+            set(report),
+            {'courses_processed', 'courses_skipped', 'models', 'enrollment_churn', 'dry_run', 'row_counts', 'timings'},
+        )
+        self.assertIs(report['dry_run'], True)
+        self.assertEqual((report['courses_processed'], report['courses_skipped']), (3, 1))
+        self.assertEqual(report['models'], {
+            'SisCourse': {'create': ['IF3'], 'update': {}, 'delete': []},
+            'SisCourseClass': {
+                'create': ['IF3_A'],
+                'update': {'IF1_A': ['content_hash', 'room'], 'IF2_A': ['content_hash']},
+                'delete': [],
+            },
+            'SisLecturer': {'create': ['D3'], 'update': {}, 'delete': []},
+            'SisStudent': {'create': ['106'], 'update': {'102': ['name'], '105': ['photo_url']}, 'delete': []},
+            'SisCourseClassLecturer': {
+                'create': [{'course_class': 'IF2_A', 'lecturer': 'D3'}, {'course_class': 'IF3_A', 'lecturer': 'D1'}],
+                'update': {},
+                'delete': [{'course_class': 'IF1_A', 'lecturer': 'D2'}],
+            },
+            'SisEnrollment': {
+                'create': [{'course_class': 'IF2_A', 'student': '106'}, {'course_class': 'IF3_A', 'student': '101'}],
+                'update': {},
+                'delete': [{'course_class': 'IF1_A', 'student': '103'}],
+            },
+        })
+        self.assertEqual(report['enrollment_churn'], {
+            'IF1_A': {'added': [], 'removed': ['103']},
+            'IF2_A': {'added': ['106'], 'removed': []},
+            'IF3_A': {'added': ['101'], 'removed': []},
+        })
+        self.assertEqual(report['row_counts']['SisEnrollment'], {
+            'rows_before': 6, 'create': 2, 'update': 0, 'delete': 1, 'rows_after': 7,
+        })
+        self.assertIn('parse', report['timings'])
+
+    def test_row_counts_match_the_real_run(self):
+        self.write_export('IF', SIS_EXPORT_V1)
+        self.sync()
+        self.write_export('IF', SIS_EXPORT_V2)
+        report, _ = self.dry_run()
+        self.sync()
+        actual = {
+            'SisCourse': SisCourse.objects.count(),
+            'SisCourseClass': SisCourseClass.objects.count(),
+            'SisLecturer': SisLecturer.objects.count(),
+            'SisStudent': SisStudent.objects.count(),
+            'SisCourseClassLecturer': SisCourseClassLecturer.objects.count(),
+            'SisEnrollment': SisEnrollment.objects.count(),
+        }
+        self.assertEqual({name: counts['rows_after'] for name, counts in report['row_counts'].items()}, actual)
@@ -6,12 +6,19 @@ from .views import (
     BiometricRegistrationViewSet,
     BiometricFaceDatasetViewSet,
     BiometricVoiceDatasetViewSet,
+    BiometricJobViewSet,
     student_attendance_history,
     student_attendance_summary,
     bulk_update_attendance,
     student_enrollments,
     student_course_attendance,
-    student_all_courses_attendance
+    student_all_courses_attendance,
+    biometric_coverage,
+    student_photo,
+    lecturer_photo,
+    sis_people_lookup,
+    class_roster,
+    class_schedule
 )
 
 app_name = 'attendance'
@@ -22,6 +29,7 @@ router.register(r'records', AttendanceRecordViewSet, basename='record')
 router.register(r'biometric-registrations', BiometricRegistrationViewSet, basename='biometric-registration')
 router.register(r'biometric-face-datasets', BiometricFaceDatasetViewSet, basename='biometric-face-dataset')
 router.register(r'biometric-voice-datasets', BiometricVoiceDatasetViewSet, basename='biometric-voice-dataset')
+router.register(r'biometric-jobs', BiometricJobViewSet, basename='biometric-job')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -32,6 +40,17 @@ urlpatterns = [
     path('student/<str:nim>/enrollments/', student_enrollments, name='student-enrollments'),
     path('student/<str:nim>/course/<str:course_id>/attendance/', student_course_attendance, name='student-course-attendance'),
     path('student/<str:nim>/all-courses/', student_all_courses_attendance, name='student-all-courses'),
+    # Jadwal kelas hari ini / sekarang per dosen atau ruangan
+    path('schedule/', class_schedule, name='class-schedule'),
+    # Roster snapshot per kelas SIS (ETag / 304)
+    path('classes/<str:class_id>/roster/', class_roster, name='class-roster'),
+    # Batch lookup nama + foto mahasiswa / dosen
+    path('students/lookup/', sis_people_lookup, name='students-lookup'),
+    # SIS photo proxy (disk cache backend)
+    path('photos/students/<str:nim>/', student_photo, name='student-photo'),
+    path('photos/lecturers/<str:lecturer_id>/', lecturer_photo, name='lecturer-photo'),
+    # Biometric coverage report per class / program
+    path('biometric-coverage/', biometric_coverage, name='biometric-coverage'),
     # Bulk operations
     path('sessions/<uuid:session_id>/bulk-update/', bulk_update_attendance, name='bulk-update'),
 ]
@@ -2,13 +2,18 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.urls import reverse
 from django.utils import timezone
 from datetime import date, timedelta
 from .models import (
     AttendanceSession, AttendanceRecord,
     SisCourse, SisLecturer, SisStudent, SisCourseClass, SisEnrollment,
-    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset
+    BiometricRegistration, BiometricFaceDataset, BiometricVoiceDataset,
+    BiometricJob
 )
 from .serializers import (
     AttendanceSessionSerializer,
@@ -20,8 +25,16 @@ from .serializers import (
     StudentCourseAttendanceSerializer,
     BiometricRegistrationSerializer,
     BiometricFaceDatasetSerializer,
-    BiometricVoiceDatasetSerializer
+    BiometricVoiceDatasetSerializer,
+    BiometricJobSerializer
 )
+from .gallery import gallery_cache, sync_session_gallery
+from .jobs import enqueue_job
+from .coverage import get_coverage
+from .photos import PhotoUnavailable, resolve_photo
+from .roster import get_roster
+from .schedule import get_schedule, parse_moment
+from .sis_parser import get_weekday_index
 
 
 # ==========================================
@@ -31,40 +44,10 @@ from .serializers import (
 SEMESTER_GANJIL_2025_START = date(2025, 9, 8)  # Minggu ke-2, 8 Sept 2025
 SEMESTER_MEETINGS_COUNT = 17
 
-_DAY_NAME_TO_INDEX = {
-    "monday": 0,
-    "mon": 0,
-    "senin": 0,
-    "tuesday": 1,
-    "tue": 1,
-    "selasa": 1,
-    "wednesday": 2,
-    "wed": 2,
-    "rabu": 2,
-    "thursday": 3,
-    "thu": 3,
-    "kamis": 3,
-    "friday": 4,
-    "fri": 4,
-    "jumat": 4,
-    "saturday": 5,
-    "sat": 5,
-    "sabtu": 5,
-    "sunday": 6,
-    "sun": 6,
-    "minggu": 6,
-}
-
-
-def _get_weekday_index(day_name: str):
-    if not day_name:
-        return None
-    return _DAY_NAME_TO_INDEX.get(day_name.strip().lower())
-
 
 def _build_semester_meeting_dates(day_name: str):
     """Generate 17 weekly meeting dates starting from Sep 8, 2025 (week 2)."""
-    target_idx = _get_weekday_index(day_name)
+    target_idx = get_weekday_index(day_name)
     if target_idx is None:
         first_date = SEMESTER_GANJIL_2025_START
     else:
@@ -127,6 +110,7 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         session = serializer.save()
+        sync_session_gallery(session)
         
         # Return full session data with records
         response_serializer = AttendanceSessionSerializer(session)
@@ -137,6 +121,7 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
         """Complete an attendance session"""
         session = self.get_object()
         session.complete_session()
+        sync_session_gallery(session)
         serializer = AttendanceSessionSerializer(session)
         return Response(serializer.data)
     
@@ -146,8 +131,34 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
         session = self.get_object()
         session.status = 'cancelled'
         session.save()
+        sync_session_gallery(session)
         serializer = AttendanceSessionSerializer(session)
         return Response(serializer.data)
+    
+    def perform_update(self, serializer):
+        session = serializer.save()
+        sync_session_gallery(session)
+    
+    def perform_destroy(self, instance):
+        gallery_cache.evict(instance.id)
+        instance.delete()
+    
+    @action(detail=True, methods=['get'])
+    def gallery(self, request, pk=None):
+        """Referensi wajah mahasiswa kelas ini (dari cache galeri sesi)"""
+        session = self.get_object()
+        if session.status != 'active':
+            return Response(
+                {'error': 'Session is not active'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        gallery = gallery_cache.get_or_warm(session)
+        return Response({
+            'session_id': str(session.id),
+            'total_students': len(gallery),
+            'students': gallery,
+        })
 
 
 class AttendanceRecordViewSet(viewsets.ModelViewSet):
@@ -203,16 +214,52 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class BiometricRegistrationViewSet(viewsets.ModelViewSet):
+class BiometricJobMixin:
+    """
+    Create/update biometrik diproses di background oleh worker
+    `process_biometric_jobs`. Response langsung 202 dengan job id;
+    status dipantau lewat /biometric-jobs/<id>/.
+    """
+    job_kind = None
+
+    def _enqueue(self, request, instance=None, partial=False):
+        if not isinstance(request.data, dict):
+            return Response(
+                {'error': 'Payload must be a JSON object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        payload = request.data.dict() if hasattr(request.data, 'dict') else dict(request.data)
+        job = enqueue_job(self.job_kind, payload, instance=instance, partial=partial)
+        data = BiometricJobSerializer(job).data
+        data['status_url'] = request.build_absolute_uri(
+            reverse('attendance:biometric-job-detail', args=[job.id])
+        )
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    def create(self, request, *args, **kwargs):
+        if not getattr(settings, 'BIOMETRIC_ASYNC_PROCESSING', False):
+            return super().create(request, *args, **kwargs)
+        return self._enqueue(request)
+
+    def update(self, request, *args, **kwargs):
+        if not getattr(settings, 'BIOMETRIC_ASYNC_PROCESSING', False):
+            return super().update(request, *args, **kwargs)
+        return self._enqueue(request, instance=self.get_object(), partial=kwargs.get('partial', False))
+
+
+class BiometricRegistrationViewSet(BiometricJobMixin, viewsets.ModelViewSet):
     """
     ViewSet untuk registrasi biometrik mahasiswa (wajah + suara)
     """
+    job_kind = BiometricJob.KIND_REGISTRATION
     queryset = BiometricRegistration.objects.all()
     serializer_class = BiometricRegistrationSerializer
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        queryset = BiometricRegistration.objects.all()
+        queryset = BiometricRegistration.objects.select_related(
+            *BiometricRegistration.media_asset_fields()
+        )
 
         student_id = self.request.query_params.get('student_id')
         if student_id:
@@ -225,16 +272,19 @@ class BiometricRegistrationViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class BiometricFaceDatasetViewSet(viewsets.ModelViewSet):
+class BiometricFaceDatasetViewSet(BiometricJobMixin, viewsets.ModelViewSet):
     """
     ViewSet untuk dataset wajah mahasiswa
     """
+    job_kind = BiometricJob.KIND_FACE_DATASET
     queryset = BiometricFaceDataset.objects.all()
     serializer_class = BiometricFaceDatasetSerializer
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        queryset = BiometricFaceDataset.objects.all()
+        queryset = BiometricFaceDataset.objects.select_related(
+            *BiometricFaceDataset.media_asset_fields()
+        )
 
         student_nim = self.request.query_params.get('student_nim')
         if student_nim:
@@ -243,16 +293,19 @@ class BiometricFaceDatasetViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class BiometricVoiceDatasetViewSet(viewsets.ModelViewSet):
+class BiometricVoiceDatasetViewSet(BiometricJobMixin, viewsets.ModelViewSet):
     """
     ViewSet untuk dataset suara mahasiswa
     """
+    job_kind = BiometricJob.KIND_VOICE_DATASET
     queryset = BiometricVoiceDataset.objects.all()
     serializer_class = BiometricVoiceDatasetSerializer
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        queryset = BiometricVoiceDataset.objects.all()
+        queryset = BiometricVoiceDataset.objects.select_related(
+            *BiometricVoiceDataset.media_asset_fields()
+        )
 
         student_nim = self.request.query_params.get('student_nim')
         if student_nim:
@@ -261,6 +314,42 @@ class BiometricVoiceDatasetViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+class BiometricJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status job pemrosesan biometrik (polling dari frontend)
+    """
+    queryset = BiometricJob.objects.all()
+    serializer_class = BiometricJobSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        queryset = BiometricJob.objects.defer('payload')
+
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+
+        return queryset
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def biometric_coverage(request):
+    """
+    Cakupan data biometrik mahasiswa per kelas (class_id) atau program studi.
+    Query params: class_id (SisCourseClass.id) dan/atau program (IF, SI, ...)
+    """
+    class_id = request.query_params.get('class_id')
+    program = request.query_params.get('program')
+    if not class_id and not program:
+        return Response(
+            {'error': 'class_id or program is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(get_coverage(class_id=class_id, program=program))
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def student_attendance_history(request, student_id):
@@ -550,3 +639,221 @@ def student_all_courses_attendance(request, nim):
         'nim': nim,
         'courses': courses_attendance
     })
+
+
+# ==========================================
+# SIS Photo Proxy
+# ==========================================
+
+DEFAULT_SIS_PHOTO_MAX_AGE = 60 * 60 * 24
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def _photo_response(request, photo_url):
+    try:
+        photo = resolve_photo(photo_url)
+    except PhotoUnavailable as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_404_NOT_FOUND)
+
+    # ?v=<hash> adalah URL content-addressed -> boleh di-cache selamanya
+    if request.query_params.get('v') == photo.content_hash:
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        max_age = getattr(settings, 'SIS_PHOTO_MAX_AGE', DEFAULT_SIS_PHOTO_MAX_AGE)
+        cache_control = f'public, max-age={max_age}'
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if photo.etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(photo.read(), content_type=photo.mime)
+    response['ETag'] = photo.etag
+    response['Cache-Control'] = cache_control
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def student_photo(request, nim):
+    """
+    Foto mahasiswa dari SisStudent.photo_url lewat cache disk backend
+    """
+    photo_url = SisStudent.objects.filter(nim=nim).values_list('photo_url', flat=True).first()
+    return _photo_response(request, photo_url)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def lecturer_photo(request, lecturer_id):
+    """
+    Foto dosen dari SisLecturer.photo_url lewat cache disk backend
+    """
+    photo_url = SisLecturer.objects.filter(id=lecturer_id).values_list('photo_url', flat=True).first()
+    return _photo_response(request, photo_url)
+
+
+# ==========================================
+# SIS Batch Lookup
+# ==========================================
+
+DEFAULT_SIS_LOOKUP_MAX_IDS = 5000
+SIS_LOOKUP_CHUNK_SIZE = 400
+
+
+def _lookup_ids(value):
+    if not isinstance(value, list):
+        return None
+    ids = []
+    seen = set()
+    for item in value:
+        if item is None:
+            continue
+        item = str(item).strip()
+        if item and item not in seen:
+            seen.add(item)
+            ids.append(item)
+    return ids
+
+
+def _lookup_chunks(ids):
+    for offset in range(0, len(ids), SIS_LOOKUP_CHUNK_SIZE):
+        yield ids[offset:offset + SIS_LOOKUP_CHUNK_SIZE]
+
+
+_HAS_PHOTO = ExpressionWrapper(~Q(photo_url=''), output_field=BooleanField())
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def sis_people_lookup(request):
+    """
+    Batch lookup nama + referensi foto mahasiswa (NIM) dan dosen (StaffId / IdStaff)
+    
+    Body: {"nims": [...], "staff_ids": [...]}
+    Kolom photo_url tidak dibaca; foto diambil lewat endpoint photo proxy.
+    """
+    if not isinstance(request.data, dict):
+        return Response(
+            {'error': 'Body must be a JSON object'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    nims = _lookup_ids(request.data.get('nims', []))
+    staff_ids = _lookup_ids(request.data.get('staff_ids', []))
+    if nims is None or staff_ids is None:
+        return Response(
+            {'error': 'nims and staff_ids must be lists'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    max_ids = getattr(settings, 'SIS_LOOKUP_MAX_IDS', DEFAULT_SIS_LOOKUP_MAX_IDS)
+    if len(nims) + len(staff_ids) > max_ids:
+        return Response(
+            {'error': f'At most {max_ids} ids per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    students = {}
+    for chunk in _lookup_chunks(nims):
+        rows = SisStudent.objects.filter(nim__in=chunk).annotate(
+            has_photo=_HAS_PHOTO
+        ).values_list('nim', 'name', 'has_photo')
+        for nim, name, has_photo in rows:
+            students[nim] = {
+                'name': name,
+                'photo': reverse('attendance:student-photo', args=[nim]) if has_photo else None,
+            }
+    
+    lecturers = {}
+    for chunk in _lookup_chunks(staff_ids):
+        # id_staff numerik; key non-numerik hanya dicocokkan ke StaffId
+        numeric = [int(staff_id) for staff_id in chunk if staff_id.isdigit()]
+        rows = SisLecturer.objects.filter(
+            Q(id__in=chunk) | Q(id_staff__in=numeric)
+        ).annotate(
+            has_photo=_HAS_PHOTO
+        ).values_list('id', 'id_staff', 'name', 'has_photo')
+        requested = set(chunk)
+        for lecturer_id, id_staff, name, has_photo in rows:
+            entry = {
+                'name': name,
+                'photo': reverse('attendance:lecturer-photo', args=[lecturer_id]) if has_photo else None,
+            }
+            # Kembalikan dengan key yang diminta (StaffId dan/atau IdStaff)
+            for key in (lecturer_id, id_staff):
+                if key is not None and str(key) in requested:
+                    lecturers[str(key)] = entry
+    
+    return Response({
+        'students': students,
+        'lecturers': lecturers,
+        'missing': {
+            'nims': [nim for nim in nims if nim not in students],
+            'staff_ids': [staff_id for staff_id in staff_ids if staff_id not in lecturers],
+        },
+    })
+
+
+# ==========================================
+# Class Roster Snapshot
+# ==========================================
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def class_roster(request, class_id):
+    """
+    Roster ringkas satu kelas SIS: [nim, name, photo, biometric] per mahasiswa
+    
+    Versi (ETag) = hash isi roster; If-None-Match yang cocok -> 304.
+    """
+    if not SisCourseClass.objects.filter(id=class_id).exists():
+        return Response({'error': 'Class not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    roster = get_roster(class_id)
+    etag = f'"{roster["version"]}"'
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = Response(roster)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+# ==========================================
+# Schedule Index (today / now)
+# ==========================================
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def class_schedule(request):
+    """
+    Kelas yang berjalan hari ini / sekarang untuk dosen atau ruangan
+    
+    Query params: lecturer (StaffId / IdStaff), room, when=today|now,
+    date=YYYY-MM-DD dan time=HH:MM (opsional, default waktu lokal sekarang)
+    """
+    when = request.query_params.get('when', 'today')
+    if when not in ('today', 'now'):
+        return Response(
+            {'error': "when must be 'today' or 'now'"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        moment = parse_moment(
+            request.query_params.get('date'),
+            request.query_params.get('time'),
+        )
+    except ValueError:
+        return Response(
+            {'error': 'Invalid date (YYYY-MM-DD) or time (HH:MM)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response(get_schedule(
+        lecturer=request.query_params.get('lecturer') or None,
+        room=request.query_params.get('room') or None,
+        when=when,
+        moment=moment,
+    ))
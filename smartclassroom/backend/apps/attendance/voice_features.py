@@ -0,0 +1,219 @@
+"""
+Ekstraksi fitur suara untuk verifikasi pembicara (voice attendance).
+
+Rekaman di-decode ke PCM mono 16 kHz lalu diringkas menjadi vektor
+berukuran tetap: mean + std log-mel spectrogram (2 * N_MELS dimensi).
+Fungsi ekstraksi tidak menyentuh database sehingga aman dijalankan
+di worker ProcessPoolExecutor; build_feature_tasks/save_feature_results
+dipanggil dari proses yang memegang koneksi database.
+"""
+import io
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+from .biometrics import VOICE_SLOTS
+
+
+FEATURE_VERSION = 1
+SAMPLE_RATE = 16000
+N_FFT = 512
+HOP_LENGTH = 160  # 10 ms
+WIN_LENGTH = 400  # 25 ms
+N_MELS = 40
+FEATURE_DIMENSIONS = N_MELS * 2
+
+
+class VoiceDecodeError(Exception):
+    """Rekaman tidak dapat di-decode menjadi PCM."""
+
+
+def _decode_wav(data):
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise VoiceDecodeError(f"Unsupported WAV sample width: {sample_width}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return _resample(samples, rate)
+
+
+def _decode_with_ffmpeg(data):
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise VoiceDecodeError("ffmpeg is required to decode compressed audio")
+    result = subprocess.run(
+        [
+            ffmpeg, '-nostdin', '-loglevel', 'error',
+            '-i', 'pipe:0',
+            '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE),
+            'pipe:1',
+        ],
+        input=data,
+        capture_output=True,
+        timeout=60,
+    )
+    if result.returncode != 0:
+        raise VoiceDecodeError(result.stderr.decode('utf-8', 'replace').strip() or "ffmpeg failed")
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def _resample(samples, rate):
+    if rate == SAMPLE_RATE or samples.size == 0:
+        return samples
+    duration = samples.size / float(rate)
+    target = np.arange(int(duration * SAMPLE_RATE)) / float(SAMPLE_RATE)
+    source = np.arange(samples.size) / float(rate)
+    return np.interp(target, source, samples).astype(np.float32)
+
+
+def decode_audio(data):
+    """Decode bytes audio (WAV via stdlib, format lain via ffmpeg)."""
+    if not data:
+        raise VoiceDecodeError("Empty recording")
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return _decode_wav(data)
+    return _decode_with_ffmpeg(data)
+
+
+_MEL_FILTERS = None
+
+
+def mel_filterbank():
+    global _MEL_FILTERS
+    if _MEL_FILTERS is None:
+        def hz_to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def mel_to_hz(mel):
+            return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+        mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(SAMPLE_RATE / 2.0), N_MELS + 2)
+        bins = np.floor((N_FFT + 1) * mel_to_hz(mel_points) / SAMPLE_RATE).astype(int)
+        filters = np.zeros((N_MELS, N_FFT // 2 + 1), dtype=np.float32)
+        for i in range(N_MELS):
+            left, center, right = bins[i], bins[i + 1], bins[i + 2]
+            if center > left:
+                filters[i, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                filters[i, center:right] = (right - np.arange(center, right)) / (right - center)
+        _MEL_FILTERS = filters
+    return _MEL_FILTERS
+
+
+def log_mel_spectrogram(samples):
+    if samples.size < WIN_LENGTH:
+        samples = np.pad(samples, (0, WIN_LENGTH - samples.size))
+    n_frames = 1 + (samples.size - WIN_LENGTH) // HOP_LENGTH
+    frames = np.lib.stride_tricks.sliding_window_view(samples, WIN_LENGTH)[::HOP_LENGTH][:n_frames]
+    frames = frames * np.hanning(WIN_LENGTH).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, n=N_FFT, axis=1)) ** 2
+    return np.log(power @ mel_filterbank().T + 1e-10)
+
+
+def extract_features(samples):
+    """Vektor float32 berukuran FEATURE_DIMENSIONS (mean + std log-mel)."""
+    spectrogram = log_mel_spectrogram(samples)
+    return np.concatenate([spectrogram.mean(axis=0), spectrogram.std(axis=0)]).astype('<f4')
+
+
+def process_recording(task):
+    """
+    Worker untuk process pool.
+    task: (dataset_id, slot, audio_bytes, content_hash)
+    """
+    dataset_id, slot, data, digest = task
+    result = {
+        'dataset_id': dataset_id,
+        'slot': slot,
+        'content_hash': digest,
+        'vector': b'',
+        'dimensions': 0,
+        'duration': None,
+        'error': '',
+    }
+    try:
+        samples = decode_audio(data)
+        vector = extract_features(samples)
+        result.update(
+            vector=vector.tobytes(),
+            dimensions=int(vector.size),
+            duration=round(samples.size / float(SAMPLE_RATE), 3),
+        )
+    except (VoiceDecodeError, wave.Error, EOFError, subprocess.SubprocessError) as exc:
+        result['error'] = str(exc) or exc.__class__.__name__
+    return result
+
+
+def build_feature_tasks(datasets, existing=None, force=False):
+    """
+    Susun task process_recording untuk dataset suara.
+    existing: {(dataset_id, slot): BiometricVoiceFeature} untuk skip hash yang sama.
+    Fitur yang sebelumnya gagal (error terisi) selalu diproses ulang.
+    Return (tasks, student_nims, skipped).
+    """
+    existing = existing or {}
+    tasks = []
+    student_nims = {}
+    skipped = 0
+    for dataset in datasets:
+        for slot in VOICE_SLOTS:
+            field = f'voice_recording_{slot}'
+            if not dataset.has_media(field):
+                continue
+            digest = dataset.get_media_hash(field)
+            feature = existing.get((dataset.id, slot))
+            if (
+                not force and feature
+                and feature.content_hash == digest
+                and feature.feature_version == FEATURE_VERSION
+                and not feature.error
+            ):
+                skipped += 1
+                continue
+            student_nims[dataset.id] = dataset.student_nim
+            _, data = dataset.get_media(field)
+            tasks.append((dataset.id, slot, data, digest))
+    return tasks, student_nims, skipped
+
+
+def save_feature_results(results, student_nims):
+    """Upsert hasil process_recording ke BiometricVoiceFeature."""
+    from .models import BiometricVoiceFeature
+
+    features = [
+        BiometricVoiceFeature(
+            dataset_id=result['dataset_id'],
+            recording_slot=result['slot'],
+            student_nim=student_nims[result['dataset_id']],
+            content_hash=result['content_hash'],
+            feature_version=FEATURE_VERSION,
+            dimensions=result['dimensions'],
+            vector=result['vector'],
+            duration=result['duration'],
+            error=result['error'],
+        )
+        for result in results
+    ]
+    BiometricVoiceFeature.objects.bulk_create(
+        features,
+        update_conflicts=True,
+        unique_fields=['dataset', 'recording_slot'],
+        update_fields=[
+            'student_nim', 'content_hash', 'feature_version',
+            'dimensions', 'vector', 'duration', 'error', 'updated_at',
+        ],
+    )
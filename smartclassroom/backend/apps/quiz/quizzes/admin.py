@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import QuizOption, QuizPackage, QuizQuestion
+from .models import QuizMedia, QuizOption, QuizPackage, QuizQuestion, QuizResponse, QuizSession
 
 
 class QuizOptionInline(admin.TabularInline):
@@ -21,3 +21,23 @@ class QuizPackageAdmin(admin.ModelAdmin):
     list_display = ("title", "owner", "visibility", "is_archived", "created_at")
     list_filter = ("visibility", "is_archived")
     search_fields = ("title", "topic", "owner__email")
+
+
+@admin.register(QuizMedia)
+class QuizMediaAdmin(admin.ModelAdmin):
+    list_display = ("original_name", "sha256", "width", "height", "uploaded_by", "created_at")
+    search_fields = ("original_name", "sha256")
+
+
+@admin.register(QuizSession)
+class QuizSessionAdmin(admin.ModelAdmin):
+    list_display = ("package", "code", "host", "class_id", "status", "current_index", "created_at")
+    list_filter = ("status",)
+    search_fields = ("code", "class_id", "package__title")
+
+
+@admin.register(QuizResponse)
+class QuizResponseAdmin(admin.ModelAdmin):
+    list_display = ("session", "question", "participant", "label", "is_correct", "source", "answered_at")
+    list_filter = ("source", "is_correct")
+    search_fields = ("participant", "device_code")
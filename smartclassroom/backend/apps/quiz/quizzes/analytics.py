@@ -0,0 +1,223 @@
+"""Skor dan analisis butir soal untuk sesi kuis yang sudah selesai.
+
+Semua jawaban diambil dengan satu query lalu disusun menjadi matriks
+(peserta x pertanyaan) NumPy; skor, tingkat kesukaran (p-value), daya
+beda point-biserial (item-rest), sebaran pilihan opsi (distractor) dan
+Cronbach's alpha dihitung secara vektor, tanpa loop per jawaban.
+
+Satu baris matriks = satu peserta dalam satu sesi, sehingga analisis
+lintas sesi (paket yang dipakai ulang beberapa semester) cukup
+menumpuk baris. Pertanyaan yang tidak ada di snapshot sesi tertentu
+ditandai "tidak diberikan" dan tidak ikut dihitung untuk baris itu.
+Baris matriks diambil dari QuizResponse, bukan dari roster kelas: peserta
+yang hadir tetapi tidak menjawab satu pertanyaan pun tidak muncul di
+analisis (tidak dihitung sebagai skor 0 untuk skor, p-value maupun alpha).
+Sesi selesai tidak berubah lagi, sehingga hasil di-cache per kumpulan sesi.
+"""
+import hashlib
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import QuizOption, QuizResponse, QuizSession
+
+ANALYSIS_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+NO_ANSWER = "-"
+
+
+def _round(value) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), 4)
+
+
+def _cache_key(session_ids: List[int], include_students: bool) -> str:
+    digest = hashlib.sha1(",".join(map(str, sorted(session_ids))).encode("ascii")).hexdigest()
+    return f"quiz:analysis:{digest}:{int(include_students)}"
+
+
+def build_matrices(sessions: List[QuizSession]) -> dict:
+    """
+    Return dict berisi:
+    rows (session_id, participant), question_ids, correct (float 0/1),
+    chosen (kode label, -1 = tidak menjawab), administered (bool), labels.
+    """
+    question_ids: List[int] = []
+    for session in sessions:
+        question_ids.extend(qid for qid in session.question_ids if qid not in question_ids)
+    question_index = {question_id: col for col, question_id in enumerate(question_ids)}
+
+    responses = list(
+        QuizResponse.objects.filter(session__in=sessions)
+        .values_list("session_id", "participant", "question_id", "label", "is_correct")
+    )
+    if responses:
+        session_col, participant_col, question_col, label_col, correct_col = map(np.asarray, zip(*responses))
+    else:
+        session_col = question_col = np.zeros(0, dtype=np.int64)
+        participant_col = label_col = np.zeros(0, dtype=str)
+        correct_col = np.zeros(0, dtype=bool)
+
+    # Baris = pasangan unik (sesi, peserta)
+    participants, participant_codes = np.unique(participant_col, return_inverse=True)
+    session_keys, session_codes = np.unique(session_col, return_inverse=True)
+    n_participants = max(len(participants), 1)
+    row_keys, row_codes = np.unique(session_codes * n_participants + participant_codes, return_inverse=True)
+    row_sessions = session_keys[row_keys // n_participants]
+    row_participants = participants[row_keys % n_participants]
+
+    # question_id -> kolom matriks
+    column_ids = np.asarray(question_ids, dtype=np.int64)
+    order = np.argsort(column_ids)
+    cols = order[np.searchsorted(column_ids[order], question_col)]
+    labels, label_codes = np.unique(label_col, return_inverse=True)
+
+    shape = (len(row_keys), len(question_ids))
+    correct = np.zeros(shape, dtype=np.float64)
+    chosen = np.full(shape, -1, dtype=np.int64)
+    correct[row_codes, cols] = correct_col.astype(np.float64)
+    chosen[row_codes, cols] = label_codes
+
+    administered = np.zeros(shape, dtype=bool)
+    for session in sessions:
+        session_cols = [question_index[qid] for qid in session.question_ids]
+        administered[np.ix_(row_sessions == session.id, session_cols)] = True
+
+    return {
+        "rows": list(zip(row_sessions.tolist(), row_participants.tolist())),
+        "question_ids": question_ids,
+        "correct": correct,
+        "chosen": chosen,
+        "administered": administered,
+        "labels": labels.tolist(),
+    }
+
+
+def item_statistics(correct: np.ndarray, chosen: np.ndarray, administered: np.ndarray, n_labels: int) -> dict:
+    """Statistik vektor untuk matriks peserta x pertanyaan."""
+    weights = administered.astype(np.float64)
+    correct = correct * weights
+    n_rows, n_items = correct.shape
+    given = weights.sum(axis=0)
+
+    scores = correct.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_values = correct.sum(axis=0) / given
+
+        # Point-biserial item-rest: korelasi skor butir dengan skor total tanpa butir itu
+        rest = (scores[:, None] - correct) * weights
+        item_mean = p_values
+        rest_mean = rest.sum(axis=0) / given
+        item_dev = (correct - item_mean) * weights
+        rest_dev = (rest - rest_mean) * weights
+        covariance = (item_dev * rest_dev).sum(axis=0)
+        discrimination = covariance / np.sqrt((item_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0))
+
+    # Cronbach's alpha: hanya butir yang diberikan ke semua baris
+    complete = administered.all(axis=0) if n_rows else np.zeros(n_items, dtype=bool)
+    alpha = None
+    k = int(complete.sum())
+    if k > 1 and n_rows > 1:
+        block = correct[:, complete]
+        total_variance = block.sum(axis=1).var(ddof=1)
+        if total_variance > 0:
+            alpha = k / (k - 1) * (1 - block.var(axis=0, ddof=1).sum() / total_variance)
+
+    # Sebaran pilihan: kolom terakhir = tidak menjawab
+    codes = np.where(chosen >= 0, chosen, n_labels)
+    counts = np.zeros((n_items, n_labels + 1), dtype=np.float64)
+    item_idx = np.broadcast_to(np.arange(n_items), chosen.shape)
+    np.add.at(counts, (item_idx[administered], codes[administered]), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = counts / given[:, None]
+
+    return {
+        "scores": scores,
+        "possible": weights.sum(axis=1),
+        "p_values": p_values,
+        "discrimination": discrimination,
+        "alpha": alpha,
+        "given": given,
+        "option_counts": counts,
+        "option_rates": rates,
+    }
+
+
+def _score_summary(scores: np.ndarray, possible: np.ndarray) -> dict:
+    if not len(scores):
+        return {"mean": None, "std": None, "min": None, "max": None, "median": None, "mean_percent": None}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percent = np.where(possible > 0, scores / possible * 100, np.nan)
+    return {
+        "mean": _round(scores.mean()),
+        "std": _round(scores.std()),
+        "min": _round(scores.min()),
+        "max": _round(scores.max()),
+        "median": _round(np.median(scores)),
+        "mean_percent": _round(np.nanmean(percent)) if np.isfinite(percent).any() else None,
+    }
+
+
+def analyze_sessions(sessions: List[QuizSession], include_students: bool = True) -> dict:
+    """Analisis lengkap (di-cache) untuk satu atau beberapa sesi yang sudah selesai."""
+    sessions = [session for session in sessions if session.status == QuizSession.STATUS_FINISHED]
+    session_ids = [session.id for session in sessions]
+    key = _cache_key(session_ids, include_students)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    data = build_matrices(sessions)
+    labels = data["labels"]
+    stats = item_statistics(data["correct"], data["chosen"], data["administered"], len(labels))
+
+    options_by_question: Dict[int, Dict[str, bool]] = {}
+    for question_id, label, is_correct in QuizOption.objects.filter(
+        question_id__in=data["question_ids"]
+    ).values_list("question_id", "label", "is_correct"):
+        options_by_question.setdefault(question_id, {})[label.upper()] = is_correct
+
+    items = []
+    for col, question_id in enumerate(data["question_ids"]):
+        question_options = options_by_question.get(question_id, {})
+        rates = {
+            label: _round(stats["option_rates"][col, code])
+            for code, label in enumerate(labels)
+            if label in question_options or stats["option_counts"][col, code]
+        }
+        for label in question_options:
+            rates.setdefault(label, 0.0 if stats["given"][col] else None)
+        rates[NO_ANSWER] = _round(stats["option_rates"][col, len(labels)])
+        items.append({
+            "question_id": question_id,
+            "administered": int(stats["given"][col]),
+            "p_value": _round(stats["p_values"][col]),
+            "discrimination": _round(stats["discrimination"][col]),
+            "correct_labels": sorted(label for label, is_correct in question_options.items() if is_correct),
+            "option_rates": dict(sorted(rates.items())),
+        })
+
+    report = {
+        "session_ids": session_ids,
+        "participants": len(data["rows"]),
+        "questions": len(data["question_ids"]),
+        "cronbach_alpha": _round(stats["alpha"]),
+        "score": _score_summary(stats["scores"], stats["possible"]),
+        "items": items,
+    }
+    if include_students:
+        report["students"] = [
+            {
+                "session_id": session_id,
+                "participant": participant,
+                "score": int(score),
+                "possible": int(possible),
+            }
+            for (session_id, participant), score, possible in zip(
+                data["rows"], stats["scores"].tolist(), stats["possible"].tolist()
+            )
+        ]
+
+    cache.set(key, report, ANALYSIS_CACHE_TIMEOUT)
+    return report
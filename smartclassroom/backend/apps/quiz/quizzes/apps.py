@@ -5,3 +5,6 @@ class QuizzesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.quiz.quizzes"
     label = "quiz_quizzes"
+
+    def ready(self):
+        from . import signals  # noqa: F401
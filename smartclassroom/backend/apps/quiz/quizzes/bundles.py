@@ -0,0 +1,306 @@
+"""Export / import paket kuis sebagai bundle zip.
+
+Isi bundle:
+- questions.jsonl: satu pertanyaan (beserta opsi) per baris
+- media/<n>-<nama file>: gambar soal yang tersimpan di storage lokal
+  (quiz_images/ lama atau varian QuizMedia)
+- manifest.json: metadata paket dan tabel media (sha256, ukuran)
+
+Export ditulis bertahap ke stream zip tanpa seek (data descriptor),
+sehingga response bisa di-stream chunk demi chunk tanpa menampung
+seluruh arsip di memori. Import membaca questions.jsonl baris per baris
+dan memvalidasi semua pertanyaan lebih dulu; media baru di-import hanya
+jika semua baris valid, di dalam transaksi yang sama dengan pertanyaan.
+QuizMedia dengan hash yang sama dipakai ulang, dan file varian yang baru
+ditulis dihapus lagi jika transaksi dibatalkan.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import zipfile
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .importer import ImportReport, ImportRow, QuestionImportError, import_questions
+from .media import MediaProcessingError, store_upload, variant_url_path
+from .models import QuizMedia, QuizPackage
+
+BUNDLE_FORMAT = "smartclassroom-quiz-package"
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+QUESTIONS_NAME = "questions.jsonl"
+STREAM_CHUNK_SIZE = 1 << 16
+MAX_MEDIA_BYTES = 5 * 1024 * 1024
+
+_QUIZ_MEDIA_PATH_RE = re.compile(r"/api/quiz/media/files/(?P<sha256>[0-9a-f]{64})/(?P<variant>\w+)/?$")
+
+
+class _ZipStream:
+    """File-like tanpa seek: zipfile menulis ke sini, generator mengambil chunk-nya."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def resolve_local_media(url: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Return (path storage, sha256 QuizMedia atau None) jika media_url menunjuk
+    file di storage sendiri; None untuk URL eksternal.
+    """
+    if not url:
+        return None
+    path = unquote(urlparse(url).path)
+    match = _QUIZ_MEDIA_PATH_RE.search(path)
+    if match:
+        variants = (
+            QuizMedia.objects.filter(sha256=match["sha256"]).values_list("variants", flat=True).first()
+        ) or {}
+        variant = variants.get(match["variant"]) or variants.get(QuizMedia.VARIANT_DISPLAY)
+        if variant:
+            return variant["path"], match["sha256"]
+        return None
+    media_url = settings.MEDIA_URL
+    if media_url and path.startswith(media_url):
+        storage_path = path[len(media_url):]
+        if storage_path and default_storage.exists(storage_path):
+            return storage_path, None
+    return None
+
+
+def _question_record(question, media_name: Optional[str]) -> dict:
+    record = {
+        "body_text": question.body_text,
+        "explanation": question.explanation,
+        "media_url": "" if media_name else question.media_url,
+        "question_type": question.question_type,
+        "difficulty_tag": question.difficulty_tag,
+        "order": question.order,
+        "is_active": question.is_active,
+        "options": [
+            {"label": option.label, "body_text": option.body_text, "is_correct": option.is_correct}
+            for option in question.options.all()
+        ],
+    }
+    if media_name:
+        record["media"] = media_name
+    return record
+
+
+def iter_package_bundle(package: QuizPackage) -> Iterator[bytes]:
+    """Generator chunk zip bundle untuk StreamingHttpResponse."""
+    stream = _ZipStream()
+    media: "OrderedDict[str, dict]" = OrderedDict()
+    resolved: Dict[str, Optional[Tuple[str, Optional[str]]]] = {}
+    question_count = 0
+
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(QUESTIONS_NAME, "w") as dest:
+            questions = package.questions.prefetch_related("options").order_by("order", "id")
+            for question in questions.iterator(chunk_size=200):
+                media_name = None
+                if question.media_url not in resolved:
+                    resolved[question.media_url] = resolve_local_media(question.media_url)
+                local = resolved[question.media_url]
+                if local:
+                    storage_path, sha256 = local
+                    if storage_path not in media:
+                        media[storage_path] = {
+                            "name": f"media/{len(media) + 1}-{os.path.basename(storage_path)}",
+                            "quiz_media_sha256": sha256,
+                            "source_url": question.media_url,
+                        }
+                    media_name = media[storage_path]["name"]
+                line = json.dumps(_question_record(question, media_name), ensure_ascii=False) + "\n"
+                dest.write(line.encode("utf-8"))
+                question_count += 1
+                chunk = stream.drain()
+                if chunk:
+                    yield chunk
+
+        # Gambar sudah terkompresi: simpan tanpa deflate
+        for storage_path, entry in media.items():
+            info = zipfile.ZipInfo(entry["name"], date_time=timezone.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            digest = hashlib.sha256()
+            size = 0
+            with default_storage.open(storage_path, "rb") as src, archive.open(info, "w") as dest:
+                while True:
+                    data = src.read(STREAM_CHUNK_SIZE)
+                    if not data:
+                        break
+                    digest.update(data)
+                    size += len(data)
+                    dest.write(data)
+                    chunk = stream.drain()
+                    if chunk:
+                        yield chunk
+            entry.update(sha256=digest.hexdigest(), size=size)
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "version": BUNDLE_VERSION,
+            "exported_at": timezone.now().isoformat(),
+            "package": {
+                "title": package.title,
+                "description": package.description,
+                "topic": package.topic,
+                "metadata": package.metadata,
+            },
+            "question_count": question_count,
+            "media": {entry.pop("name"): entry for entry in media.values()},
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+    yield stream.drain()
+
+
+def _read_manifest(archive: zipfile.ZipFile) -> dict:
+    try:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+    except KeyError:
+        raise QuestionImportError("Bundle tidak memiliki manifest.json.")
+    except ValueError:
+        raise QuestionImportError("manifest.json tidak valid.")
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        raise QuestionImportError("Format bundle tidak dikenal.")
+    return manifest
+
+
+class _MediaImporter:
+    """Import gambar dari bundle sekali per file; hash yang sudah ada dipakai ulang."""
+
+    def __init__(self, archive: zipfile.ZipFile, manifest_media: dict, user, build_url: Callable[[str], str]):
+        self.archive = archive
+        self.manifest_media = manifest_media
+        self.user = user
+        self.build_url = build_url
+        self.urls: Dict[str, str] = {}
+        self.stored_paths: List[str] = []
+        self.reused = 0
+        self.created = 0
+
+    def url_for(self, name: str) -> str:
+        if name not in self.urls:
+            self.urls[name] = self.build_url(variant_url_path(self._import(name)))
+        return self.urls[name]
+
+    def _import(self, name: str) -> str:
+        entry = self.manifest_media.get(name, {})
+        for sha256 in (entry.get("quiz_media_sha256"), entry.get("sha256")):
+            if sha256 and QuizMedia.objects.filter(sha256=sha256).exists():
+                self.reused += 1
+                return sha256
+
+        try:
+            info = self.archive.getinfo(name)
+        except KeyError:
+            raise QuestionImportError(f"File media {name} tidak ada di bundle.")
+        if info.file_size > MAX_MEDIA_BYTES:
+            raise QuestionImportError(f"File media {name} melebihi 5MB.")
+        with self.archive.open(info) as src:
+            data = src.read(MAX_MEDIA_BYTES + 1)
+        try:
+            media, created = store_upload(data, original_name=os.path.basename(name), user=self.user)
+        except MediaProcessingError as exc:
+            raise QuestionImportError(f"{name}: {exc}")
+        if created:
+            self.created += 1
+            self.stored_paths.extend(variant["path"] for variant in media.variants.values())
+        else:
+            self.reused += 1
+        return media.sha256
+
+    def discard(self):
+        """Hapus file varian media baru setelah transaksi import dibatalkan."""
+        for path in self.stored_paths:
+            default_storage.delete(path)
+        self.stored_paths.clear()
+        self.urls.clear()
+        self.created = 0
+        self.reused = 0
+
+
+def import_package_bundle(fileobj, owner, build_url: Callable[[str], str],
+                          title: Optional[str] = None) -> Tuple[Optional[QuizPackage], ImportReport, dict]:
+    """
+    Buat paket baru (private) dari bundle. Return (package, report, media_stats);
+    package None jika ada baris yang gagal validasi (tidak ada yang disimpan).
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise QuestionImportError("File bukan bundle zip yang valid.")
+
+    with archive:
+        manifest = _read_manifest(archive)
+        media = _MediaImporter(archive, manifest.get("media") or {}, owner, build_url)
+        rows = []
+        # nomor baris -> nama file media; media baru di-import setelah validasi
+        media_names: Dict[int, str] = {}
+        try:
+            with archive.open(QUESTIONS_NAME) as raw:
+                for number, line in enumerate(io.TextIOWrapper(raw, encoding="utf-8"), start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        rows.append(ImportRow(number=number, errors={"non_field_errors": ["JSON tidak valid."]}))
+                        continue
+                    media_name = data.pop("media", None) if isinstance(data, dict) else None
+                    if media_name:
+                        media_names[number] = media_name
+                        data["media_url"] = ""
+                    rows.append(ImportRow(number=number, data=data))
+        except KeyError:
+            raise QuestionImportError("Bundle tidak memiliki questions.jsonl.")
+
+        def attach_media(valid):
+            for row, data in valid:
+                if row.number in media_names:
+                    data["media_url"] = media.url_for(media_names[row.number])
+
+        info = manifest.get("package") or {}
+        try:
+            with transaction.atomic():
+                package = QuizPackage.objects.create(
+                    owner=owner,
+                    title=(title or info.get("title") or "Paket impor")[:255],
+                    description=info.get("description") or "",
+                    topic=(info.get("topic") or "")[:255],
+                    metadata=info.get("metadata") or {},
+                )
+                report = import_questions(package, rows, before_save=attach_media)
+                if report.errors:
+                    transaction.set_rollback(True)
+                    package = None
+        except BaseException:
+            media.discard()
+            raise
+        if package is None:
+            media.discard()
+    return package, report, {"created": media.created, "reused": media.reused}
@@ -0,0 +1,85 @@
+"""Duplikasi pertanyaan antar paket dan clone paket utuh.
+
+Semua penyalinan memakai bulk_create (pertanyaan, lalu opsi) sehingga
+jumlah query tetap, tidak bergantung jumlah pertanyaan. Pertanyaan baru
+langsung dimasukkan ke index search (dan payload device paket target
+di-invalidate) karena bulk_create tidak memicu post_save.
+"""
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Max
+
+from . import payloads, search
+from .models import QuizOption, QuizPackage, QuizQuestion
+
+QUESTION_COPY_FIELDS = (
+    "body_text",
+    "explanation",
+    "media_url",
+    "question_type",
+    "difficulty_tag",
+    "is_active",
+)
+
+
+def _duplicate(sources: List[QuizQuestion], package: QuizPackage, orders: List[int]) -> List[QuizQuestion]:
+    questions = [
+        QuizQuestion(
+            package=package,
+            order=order,
+            **{name: getattr(source, name) for name in QUESTION_COPY_FIELDS},
+        )
+        for source, order in zip(sources, orders)
+    ]
+    QuizQuestion.objects.bulk_create(questions)
+
+    options = [
+        QuizOption(
+            question=question,
+            label=option.label,
+            body_text=option.body_text,
+            is_correct=option.is_correct,
+        )
+        for source, question in zip(sources, questions)
+        for option in source.options.all()
+    ]
+    QuizOption.objects.bulk_create(options)
+
+    search.index_questions([question.pk for question in questions])
+    payloads.invalidate_packages([package.id])
+    return questions
+
+
+def copy_questions(sources: Iterable[QuizQuestion], target_package: QuizPackage) -> List[QuizQuestion]:
+    """
+    Salin pertanyaan (options sudah di-prefetch) ke akhir target_package,
+    mengikuti urutan `sources`.
+    """
+    sources = list(sources)
+    if not sources:
+        return []
+    with transaction.atomic():
+        max_order = target_package.questions.aggregate(Max("order"))["order__max"] or 0
+        orders = list(range(max_order + 1, max_order + 1 + len(sources)))
+        return _duplicate(sources, target_package, orders)
+
+
+def clone_package(package: QuizPackage, owner, title: Optional[str] = None) -> QuizPackage:
+    """Deep clone paket beserta seluruh pertanyaan dan opsinya (private, tidak diarsipkan)."""
+    sources = list(package.questions.prefetch_related("options").order_by("order", "id"))
+    with transaction.atomic():
+        clone = QuizPackage.objects.create(
+            owner=owner,
+            title=(title or f"{package.title} (Salinan)")[:255],
+            description=package.description,
+            topic=package.topic,
+            visibility=QuizPackage.VISIBILITY_PRIVATE,
+            metadata=package.metadata,
+        )
+        _duplicate(sources, clone, [source.order for source in sources])
+
+    # Hindari query count ulang di QuizPackageSerializer
+    clone.question_count = len(sources)
+    clone.active_question_count = sum(1 for source in sources if source.is_active)
+    return clone
@@ -0,0 +1,340 @@
+"""Import massal pertanyaan kuis (CSV / JSON / GIFT) ke satu paket.
+
+Setiap baris divalidasi dengan QuizQuestionSerializer (aturan yang sama
+dengan endpoint create), lalu semua baris valid disimpan dengan dua
+bulk_create (pertanyaan, lalu opsi) dalam satu transaksi. Hasilnya
+berupa laporan error per baris.
+"""
+import csv
+import io
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from . import payloads, search
+from .models import QuizOption, QuizPackage, QuizQuestion
+from .serializers import QuizQuestionSerializer, build_options
+
+FORMAT_CSV = "csv"
+FORMAT_JSON = "json"
+FORMAT_GIFT = "gift"
+FORMATS = (FORMAT_CSV, FORMAT_JSON, FORMAT_GIFT)
+DEFAULT_IMPORT_MAX_ROWS = 2000
+
+TRUE_VALUES = {"1", "true", "ya", "yes", "y", "benar", "t"}
+FALSE_VALUES = {"0", "false", "tidak", "no", "n", "salah", "f"}
+
+
+class QuestionImportError(Exception):
+    """File import tidak bisa dibaca sama sekali."""
+
+
+@dataclass
+class ImportRow:
+    number: int
+    data: Optional[dict] = None
+    errors: Dict[str, list] = field(default_factory=dict)
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    created: int = 0
+    question_ids: List[int] = field(default_factory=list)
+    errors: List[dict] = field(default_factory=list)
+    dry_run: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "created": self.created,
+            "failed": len(self.errors),
+            "dry_run": self.dry_run,
+            "question_ids": self.question_ids,
+            "errors": self.errors,
+        }
+
+
+def detect_format(filename: str) -> Optional[str]:
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension in {"gift", "txt"}:
+        return FORMAT_GIFT
+    return extension if extension in FORMATS else None
+
+
+def _parse_bool(value, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value or "").strip().lower()
+    if not text:
+        return default
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Nilai boolean tidak dikenal: {value}")
+
+
+_OPTION_COLUMN_RE = re.compile(r"^option_([a-z])$")
+
+
+def parse_csv(text: str) -> List[ImportRow]:
+    """
+    Kolom: body_text, question_type, difficulty_tag, explanation, media_url,
+    is_active, order, option_a .. option_d, correct (label opsi benar).
+    Soal truefalse tanpa opsi otomatis mendapat A=Benar, B=Salah.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "body_text" not in reader.fieldnames:
+        raise QuestionImportError("Header CSV wajib memiliki kolom body_text.")
+    option_columns = sorted(
+        (match.group(1).upper(), column)
+        for column in reader.fieldnames
+        if (match := _OPTION_COLUMN_RE.match(column.strip().lower()))
+    )
+
+    rows = []
+    for record in reader:
+        row = ImportRow(number=reader.line_num)
+        values = {key.strip().lower(): (value or "").strip() for key, value in record.items() if key}
+        question_type = values.get("question_type") or QuizQuestion.TYPE_SINGLE
+        correct = {label.strip().upper() for label in re.split(r"[,;\s]+", values.get("correct", "")) if label.strip()}
+
+        options = [
+            {"label": label, "body_text": record[column].strip()}
+            for label, column in option_columns
+            if (record.get(column) or "").strip()
+        ]
+        if not options and question_type == QuizQuestion.TYPE_TRUE_FALSE:
+            options = [{"label": "A", "body_text": "Benar"}, {"label": "B", "body_text": "Salah"}]
+            if correct & {"TRUE", "BENAR", "T"}:
+                correct = {"A"}
+            elif correct & {"FALSE", "SALAH", "F"}:
+                correct = {"B"}
+        for option in options:
+            option["is_correct"] = option["label"] in correct
+
+        try:
+            is_active = _parse_bool(values.get("is_active"), True)
+        except ValueError as exc:
+            row.errors["is_active"] = [str(exc)]
+            rows.append(row)
+            continue
+
+        row.data = {
+            "body_text": values.get("body_text", ""),
+            "explanation": values.get("explanation", ""),
+            "media_url": values.get("media_url", ""),
+            "question_type": question_type,
+            "difficulty_tag": values.get("difficulty_tag", ""),
+            "is_active": is_active,
+            "options": options,
+        }
+        if values.get("order"):
+            row.data["order"] = values["order"]
+        rows.append(row)
+    return rows
+
+
+def parse_json(text: str) -> List[ImportRow]:
+    """List objek dengan bentuk yang sama seperti payload QuizQuestionSerializer,
+    atau {"questions": [...]}."""
+    try:
+        payload = json.loads(text)
+    except ValueError as exc:
+        raise QuestionImportError(f"JSON tidak valid: {exc}")
+    return rows_from_objects(payload)
+
+
+def rows_from_objects(payload) -> List[ImportRow]:
+    if isinstance(payload, dict):
+        payload = payload.get("questions")
+    if not isinstance(payload, list):
+        raise QuestionImportError("JSON harus berupa list pertanyaan atau {\"questions\": [...]}.")
+    rows = []
+    for number, item in enumerate(payload, start=1):
+        if not isinstance(item, dict):
+            rows.append(ImportRow(number=number, errors={"non_field_errors": ["Baris harus berupa objek."]}))
+            continue
+        data = dict(item)
+        data.pop("id", None)
+        data.pop("package", None)
+        rows.append(ImportRow(number=number, data=data))
+    return rows
+
+
+_GIFT_ESCAPE_RE = re.compile(r"\\([~=#{}:\\])")
+_GIFT_ANSWER_RE = re.compile(r"(?<!\\)([~=])")
+_GIFT_WEIGHT_RE = re.compile(r"^%(-?\d+(?:\.\d+)?)%")
+
+
+def _gift_unescape(text: str) -> str:
+    return _GIFT_ESCAPE_RE.sub(r"\1", text).strip()
+
+
+def _split_unescaped(text: str, marker: str) -> List[str]:
+    return re.split(rf"(?<!\\){re.escape(marker)}", text)
+
+
+def _gift_blocks(text: str):
+    """Yield (nomor baris awal, teks blok); blok dipisah baris kosong."""
+    block, start = [], None
+    for number, line in enumerate(text.splitlines(), start=1):
+        stripped = line.strip()
+        if stripped.startswith("//") or stripped.startswith("$CATEGORY"):
+            continue
+        if not stripped:
+            if block:
+                yield start, "\n".join(block)
+                block = []
+            continue
+        if not block:
+            start = number
+        block.append(line)
+    if block:
+        yield start, "\n".join(block)
+
+
+def _parse_gift_block(block: str) -> dict:
+    block = re.sub(r"^::.*?(?<!\\)::", "", block.strip(), flags=re.S)
+    open_at = re.search(r"(?<!\\)\{", block)
+    close_at = re.search(r"(?<!\\)\}", block[open_at.end():]) if open_at else None
+    if not open_at or not close_at:
+        raise ValueError("Blok jawaban {...} tidak ditemukan.")
+
+    answers = block[open_at.end():open_at.end() + close_at.start()].strip()
+    body = (block[:open_at.start()] + " " + block[open_at.end() + close_at.end():]).strip()
+    body = _gift_unescape(re.sub(r"^\[\w+\]", "", body))
+
+    # Feedback umum "####..." dipakai sebagai penjelasan
+    explanation = ""
+    general = _split_unescaped(answers, "####")
+    if len(general) > 1:
+        answers, explanation = general[0].strip(), _gift_unescape(general[1])
+
+    if answers.startswith("#"):
+        raise ValueError("Soal numerik GIFT belum didukung.")
+
+    if answers.upper() in {"T", "TRUE", "F", "FALSE"} or re.match(r"^(T|TRUE|F|FALSE)\s*#", answers.upper()):
+        is_true = _split_unescaped(answers, "#")[0].strip().upper() in {"T", "TRUE"}
+        return {
+            "body_text": body,
+            "explanation": explanation,
+            "question_type": QuizQuestion.TYPE_TRUE_FALSE,
+            "options": [
+                {"label": "A", "body_text": "Benar", "is_correct": is_true},
+                {"label": "B", "body_text": "Salah", "is_correct": not is_true},
+            ],
+        }
+
+    parts = _GIFT_ANSWER_RE.split(answers)
+    options = []
+    # parts: ["", "=", "jawaban", "~", "jawaban", ...]
+    for marker, raw in zip(parts[1::2], parts[2::2]):
+        text = _split_unescaped(raw, "#")[0].strip()
+        weight = _GIFT_WEIGHT_RE.match(text)
+        if weight:
+            text = text[weight.end():]
+        is_correct = marker == "=" or bool(weight and float(weight.group(1)) > 0)
+        options.append({"body_text": _gift_unescape(text), "is_correct": is_correct})
+    if not options:
+        raise ValueError("Soal tanpa opsi jawaban.")
+    correct_count = sum(1 for option in options if option["is_correct"])
+    return {
+        "body_text": body,
+        "explanation": explanation,
+        "question_type": QuizQuestion.TYPE_MULTIPLE if correct_count > 1 else QuizQuestion.TYPE_SINGLE,
+        "options": options,
+    }
+
+
+def parse_gift(text: str) -> List[ImportRow]:
+    """Subset format GIFT (Moodle): pilihan ganda (=/~) dan benar/salah ({T}/{F})."""
+    rows = []
+    for number, block in _gift_blocks(text):
+        try:
+            rows.append(ImportRow(number=number, data=_parse_gift_block(block)))
+        except ValueError as exc:
+            rows.append(ImportRow(number=number, errors={"non_field_errors": [str(exc)]}))
+    return rows
+
+
+PARSERS = {
+    FORMAT_CSV: parse_csv,
+    FORMAT_JSON: parse_json,
+    FORMAT_GIFT: parse_gift,
+}
+
+
+def parse_file(content, fmt: str) -> List[ImportRow]:
+    if fmt not in PARSERS:
+        raise QuestionImportError(f"Format tidak didukung. Gunakan {', '.join(FORMATS)}.")
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise QuestionImportError("File harus ber-encoding UTF-8.")
+    return PARSERS[fmt](content)
+
+
+def import_questions(package: QuizPackage, rows: List[ImportRow], dry_run: bool = False,
+                     allow_partial: bool = False,
+                     before_save: Optional[Callable[[List[Tuple[ImportRow, dict]]], None]] = None) -> ImportReport:
+    """
+    Validasi semua baris lalu simpan yang valid.
+    Tanpa allow_partial, satu baris error membatalkan seluruh import.
+    `before_save(valid)` dipanggil di dalam transaksi setelah validasi lolos,
+    sebelum pertanyaan ditulis (mis. import media bundle hanya jika semua baris valid).
+    """
+    max_rows = getattr(settings, "QUIZ_IMPORT_MAX_ROWS", DEFAULT_IMPORT_MAX_ROWS)
+    if len(rows) > max_rows:
+        raise QuestionImportError(f"Maksimal {max_rows} pertanyaan per import.")
+
+    report = ImportReport(total=len(rows), dry_run=dry_run)
+    valid = []
+    for row in rows:
+        if row.data is not None and not row.errors:
+            serializer = QuizQuestionSerializer(data=row.data)
+            if serializer.is_valid():
+                valid.append((row, serializer.validated_data))
+                continue
+            row.errors = serializer.errors
+        report.errors.append({"row": row.number, "errors": row.errors})
+
+    if dry_run or not valid or (report.errors and not allow_partial):
+        return report
+
+    with transaction.atomic():
+        if before_save is not None:
+            before_save(valid)
+        # Nomor otomatis dimulai setelah order terbesar (paket maupun order eksplisit di file)
+        explicit_orders = [data["order"] for _, data in valid if data.get("order") is not None]
+        next_order = max([package.questions.aggregate(Max("order"))["order__max"] or 0, *explicit_orders]) + 1
+        questions, options_data = [], []
+        for _, data in valid:
+            data = dict(data)
+            options_data.append(data.pop("options", []))
+            if data.get("order") is None:
+                data["order"] = next_order
+                next_order += 1
+            questions.append(QuizQuestion(package=package, **data))
+
+        QuizQuestion.objects.bulk_create(questions)
+        options = []
+        for question, question_options in zip(questions, options_data):
+            options.extend(build_options(question, question_options))
+        QuizOption.objects.bulk_create(options)
+
+        # bulk_create tidak memicu post_save, index search diisi langsung
+        report.question_ids = [question.pk for question in questions]
+        search.index_questions(report.question_ids)
+        payloads.invalidate_packages([package.id])
+
+    report.created = len(questions)
+    return report
@@ -0,0 +1,342 @@
+"""Engine kuis live: aktivasi paket, navigasi pertanyaan dan penerimaan jawaban.
+
+Kunci jawaban (label -> opsi, benar/salah) untuk semua pertanyaan sesi
+dibangun sekali dari QuizOption saat aktivasi, disimpan di
+QuizSession.answer_key dan di-cache di memori (LRU per sesi), sehingga
+menilai satu batch jawaban cukup 1 query sesi + 1 query cek duplikat +
+1 bulk insert (dipecah hanya oleh batas parameter backend), berapa pun
+jumlah jawabannya. Kunci adalah snapshot saat sesi dimulai:
+setelah eviction LRU, restart, atau di worker lain kunci dibaca ulang dari
+snapshot tersebut, jadi edit opsi selama sesi berjalan tidak mengubah
+penilaian.
+"""
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import payloads
+from .models import QuizOption, QuizPackage, QuizResponse, QuizSession
+
+DEFAULT_LIVE_CACHE_SIZE = 16
+DEFAULT_ANSWER_GRACE_SECONDS = 2
+DEFAULT_MAX_ANSWERS_PER_REQUEST = 1000
+SESSION_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+SESSION_CODE_LENGTH = 6
+
+
+class LiveSessionError(Exception):
+    """Aksi tidak valid untuk status sesi saat ini."""
+
+
+@dataclass
+class AnswerKey:
+    # {question_id: {label: (option_id, is_correct)}}
+    questions: Dict[int, Dict[str, Tuple[int, bool]]] = field(default_factory=dict)
+
+    def lookup(self, question_id: int, label: str) -> Optional[Tuple[int, bool]]:
+        return self.questions.get(question_id, {}).get(label)
+
+    def to_json(self) -> dict:
+        return {
+            str(question_id): {label: [option_id, is_correct] for label, (option_id, is_correct) in options.items()}
+            for question_id, options in self.questions.items()
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "AnswerKey":
+        return cls({
+            int(question_id): {label: (option_id, is_correct) for label, (option_id, is_correct) in options.items()}
+            for question_id, options in data.items()
+        })
+
+
+def build_answer_key(question_ids: List[int]) -> AnswerKey:
+    key = AnswerKey({question_id: {} for question_id in question_ids})
+    rows = QuizOption.objects.filter(question_id__in=question_ids).values_list(
+        "question_id", "label", "id", "is_correct"
+    )
+    for question_id, label, option_id, is_correct in rows:
+        key.questions[question_id][label.upper()] = (option_id, is_correct)
+    return key
+
+
+class AnswerKeyCache:
+    """LRU cache kunci jawaban per sesi (key: session id)."""
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        if self.max_sessions is not None:
+            return self.max_sessions
+        return getattr(settings, "QUIZ_LIVE_CACHE_SIZE", DEFAULT_LIVE_CACHE_SIZE)
+
+    def get(self, session_id):
+        with self._lock:
+            key = self._entries.get(session_id)
+            if key is not None:
+                self._entries.move_to_end(session_id)
+            return key
+
+    def put(self, session_id, key: AnswerKey):
+        with self._lock:
+            self._entries[session_id] = key
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > max(self.capacity, 1):
+                self._entries.popitem(last=False)
+
+    def evict(self, session_id):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_build(self, session: QuizSession) -> AnswerKey:
+        key = self.get(session.id)
+        if key is None:
+            # Sesi lama (sebelum snapshot disimpan) dibangun ulang dari QuizOption
+            if session.answer_key:
+                key = AnswerKey.from_json(session.answer_key)
+            else:
+                key = build_answer_key(session.question_ids)
+            self.put(session.id, key)
+        return key
+
+
+answer_key_cache = AnswerKeyCache()
+
+
+def _new_code() -> str:
+    while True:
+        code = "".join(secrets.choice(SESSION_CODE_ALPHABET) for _ in range(SESSION_CODE_LENGTH))
+        if not QuizSession.objects.filter(code=code).exists():
+            return code
+
+
+def activate(package: QuizPackage, host, class_id: str = "", question_duration: Optional[int] = None) -> QuizSession:
+    """Mulai sesi live untuk paket; pertanyaan aktif di-snapshot sesuai urutan."""
+    question_ids = list(
+        package.questions.filter(is_active=True).order_by("order", "id").values_list("id", flat=True)
+    )
+    if not question_ids:
+        raise LiveSessionError("Paket tidak memiliki pertanyaan aktif.")
+    key = build_answer_key(question_ids)
+    session = QuizSession.objects.create(
+        package=package,
+        host=host,
+        class_id=class_id or "",
+        code=_new_code(),
+        question_ids=question_ids,
+        answer_key=key.to_json(),
+        **({"question_duration": question_duration} if question_duration else {}),
+    )
+    answer_key_cache.put(session.id, key)
+    # Kompilasi payload device di awal agar membuka pertanyaan cukup baca cache
+    payloads.get_package_payloads(package.id, package.updated_at)
+    return session
+
+
+def _require_active(session: QuizSession):
+    if session.status != QuizSession.STATUS_ACTIVE:
+        raise LiveSessionError("Sesi kuis sudah selesai.")
+
+
+def advance(session: QuizSession, index: Optional[int] = None, duration: Optional[int] = None) -> QuizSession:
+    """
+    Buka pertanyaan berikutnya (atau `index` tertentu) dan mulai window waktunya.
+    Melewati pertanyaan terakhir menyelesaikan sesi.
+    """
+    _require_active(session)
+    index = session.current_index + 1 if index is None else index
+    if index < 0:
+        raise LiveSessionError("Index pertanyaan tidak valid.")
+    if index >= len(session.question_ids):
+        return finish(session)
+
+    now = timezone.now()
+    duration = duration or session.question_duration
+    session.current_index = index
+    session.current_question_id = session.question_ids[index]
+    session.question_opened_at = now
+    session.question_deadline = now + timedelta(seconds=duration)
+    session.save(update_fields=[
+        "current_index", "current_question", "question_opened_at", "question_deadline", "updated_at",
+    ])
+    return session
+
+
+def close_question(session: QuizSession) -> QuizSession:
+    """Tutup window pertanyaan saat ini lebih awal."""
+    _require_active(session)
+    now = timezone.now()
+    if session.question_deadline and session.question_deadline > now:
+        session.question_deadline = now
+        session.save(update_fields=["question_deadline", "updated_at"])
+    return session
+
+
+def finish(session: QuizSession) -> QuizSession:
+    if session.status != QuizSession.STATUS_FINISHED:
+        now = timezone.now()
+        session.status = QuizSession.STATUS_FINISHED
+        session.ended_at = now
+        if session.question_deadline and session.question_deadline > now:
+            session.question_deadline = now
+        session.save(update_fields=["status", "ended_at", "question_deadline", "updated_at"])
+    answer_key_cache.evict(session.id)
+    return session
+
+
+@dataclass
+class SubmitReport:
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: List[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {"accepted": self.accepted, "duplicates": self.duplicates, "rejected": self.rejected}
+
+
+def _answered_at(value, now: datetime, trusted: bool) -> datetime:
+    # Timestamp dari klien hanya dipakai untuk forwarder terpercaya (host / bridge device)
+    if not trusted or not value:
+        return now
+    parsed = parse_datetime(str(value)) if not isinstance(value, datetime) else value
+    if parsed is None:
+        raise ValueError("answered_at tidak valid.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return min(parsed, now)
+
+
+def submit_answers(session: QuizSession, answers: List[dict], trusted: bool = False,
+                   now: Optional[datetime] = None) -> SubmitReport:
+    """
+    Terima batch jawaban [{participant, label, question_id?, source?, device_code?, answered_at?}].
+    Hanya pertanyaan yang sedang dibuka dan masih dalam window waktu yang diterima.
+    Kiriman ulang jawaban yang sama (atau jawaban kedua) dihitung sebagai duplikat.
+    """
+    now = now or timezone.now()
+    max_answers = getattr(settings, "QUIZ_LIVE_MAX_ANSWERS_PER_REQUEST", DEFAULT_MAX_ANSWERS_PER_REQUEST)
+    if len(answers) > max_answers:
+        raise LiveSessionError(f"Maksimal {max_answers} jawaban per request.")
+    _require_active(session)
+    if session.current_question_id is None:
+        raise LiveSessionError("Belum ada pertanyaan yang dibuka.")
+
+    grace = timedelta(seconds=getattr(settings, "QUIZ_LIVE_ANSWER_GRACE_SECONDS", DEFAULT_ANSWER_GRACE_SECONDS))
+    key = answer_key_cache.get_or_build(session)
+    report = SubmitReport()
+    pending: "OrderedDict[str, QuizResponse]" = OrderedDict()
+
+    for position, answer in enumerate(answers):
+        def reject(message):
+            report.rejected.append({
+                "index": position,
+                "participant": answer.get("participant") if isinstance(answer, dict) else None,
+                "error": message,
+            })
+
+        if not isinstance(answer, dict):
+            reject("Jawaban harus berupa objek.")
+            continue
+        participant = str(answer.get("participant") or "").strip()
+        label = str(answer.get("label") or "").strip().upper()
+        question_id = answer.get("question_id") or session.current_question_id
+        if not participant or not label:
+            reject("participant dan label wajib diisi.")
+            continue
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            reject("question_id tidak valid.")
+            continue
+        try:
+            answered_at = _answered_at(answer.get("answered_at"), now, trusted)
+        except ValueError as exc:
+            reject(str(exc))
+            continue
+        if question_id != session.current_question_id:
+            reject("Pertanyaan tidak sedang dibuka.")
+            continue
+        if not (session.question_opened_at <= answered_at <= session.question_deadline + grace):
+            reject("Waktu menjawab sudah habis.")
+            continue
+        match = key.lookup(question_id, label)
+        if match is None:
+            reject("Opsi jawaban tidak dikenal.")
+            continue
+        if participant in pending:
+            report.duplicates += 1
+            continue
+
+        option_id, is_correct = match
+        source = answer.get("source") if answer.get("source") in dict(QuizResponse.SOURCE_CHOICES) else QuizResponse.SOURCE_WEB
+        pending[participant] = QuizResponse(
+            session=session,
+            question_id=question_id,
+            participant=participant[:50],
+            option_id=option_id,
+            label=label,
+            is_correct=is_correct,
+            source=source,
+            device_code=str(answer.get("device_code") or "")[:10],
+            answered_at=answered_at,
+            response_ms=int((answered_at - session.question_opened_at).total_seconds() * 1000),
+        )
+
+    if pending:
+        existing = set(
+            QuizResponse.objects.filter(
+                session=session,
+                question_id=session.current_question_id,
+                participant__in=list(pending),
+            ).values_list("participant", flat=True)
+        )
+        fresh = [response for participant, response in pending.items() if participant not in existing]
+        report.duplicates += len(existing)
+        # ignore_conflicts: aman terhadap kiriman paralel dari bridge device dan web
+        QuizResponse.objects.bulk_create(fresh, ignore_conflicts=True)
+        report.accepted = len(fresh)
+    return report
+
+
+def question_results(session: QuizSession, question_id: Optional[int] = None) -> dict:
+    """Distribusi jawaban per label untuk satu pertanyaan (default: yang sedang dibuka)."""
+    question_id = question_id or session.current_question_id
+    if question_id in session.question_ids:
+        key = answer_key_cache.get_or_build(session)
+    else:
+        key = build_answer_key([question_id] if question_id else [])
+    options = key.questions.get(question_id, {})
+
+    distribution = {label: 0 for label in sorted(options)}
+    correct = 0
+    rows = (
+        QuizResponse.objects.filter(session=session, question_id=question_id)
+        .values("label")
+        .annotate(count=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+    )
+    for row in rows:
+        distribution[row["label"]] = row["count"]
+        correct += row["correct"]
+    return {
+        "question_id": question_id,
+        "total": sum(distribution.values()),
+        "correct": correct,
+        "distribution": distribution,
+        "correct_labels": sorted(label for label, (_, is_correct) in options.items() if is_correct),
+    }
@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quiz.quizzes.importer import FORMATS, QuestionImportError, detect_format, import_questions, parse_file
+from apps.quiz.quizzes.models import QuizPackage
+
+
+class Command(BaseCommand):
+    help = "Bulk import questions (CSV/JSON/GIFT) into a quiz package"
+
+    def add_arguments(self, parser):
+        parser.add_argument("package_id", type=int, help="Target QuizPackage id")
+        parser.add_argument("path", type=str, help="File to import")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="File format (default: inferred from the file extension)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate every row without saving",
+        )
+        parser.add_argument(
+            "--partial",
+            action="store_true",
+            help="Import the valid rows even if some rows fail validation",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            package = QuizPackage.objects.get(pk=options["package_id"])
+        except QuizPackage.DoesNotExist:
+            raise CommandError(f"Quiz package {options['package_id']} not found")
+
+        fmt = options["format"] or detect_format(options["path"])
+        try:
+            with open(options["path"], "rb") as f:
+                rows = parse_file(f.read(), fmt)
+            report = import_questions(
+                package, rows, dry_run=options["dry_run"], allow_partial=options["partial"]
+            )
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        except QuestionImportError as exc:
+            raise CommandError(str(exc))
+
+        for error in report.errors:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+
+        summary = f"{report.total} rows, {report.created} created, {len(report.errors)} failed"
+        if report.dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run: {summary}"))
+        elif report.errors and not report.created:
+            raise CommandError(f"Nothing imported: {summary}")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Imported into '{package.title}': {summary}"))
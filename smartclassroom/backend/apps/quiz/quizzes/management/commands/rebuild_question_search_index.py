@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.quiz.quizzes.search import backend_vendor, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the question bank full-text index from QuizQuestion/QuizPackage"
+
+    def handle(self, *args, **options):
+        vendor = backend_vendor()
+        if vendor is None:
+            self.stdout.write(self.style.WARNING("Database has no full-text backend; search uses LIKE."))
+            return
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} questions ({vendor})."))
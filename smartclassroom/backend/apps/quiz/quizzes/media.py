@@ -0,0 +1,160 @@
+"""Pipeline gambar soal kuis.
+
+Upload di-hash (SHA-256 file asli); upload yang sama persis memakai
+QuizMedia yang sudah ada. Gambar baru di-decode dengan Pillow, diputar
+sesuai orientasi EXIF, lalu di-encode ulang tanpa metadata (EXIF, GPS,
+ICC) menjadi dua varian berukuran terbatas:
+
+- display: untuk editor dan layar proyektor
+- small: untuk device polling / tampilan live di perangkat peserta
+
+File varian disimpan di storage dengan path berdasarkan hash sehingga
+isinya tidak pernah berubah dan bisa di-cache selamanya. GIF animasi
+hanya diambil frame pertamanya.
+"""
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import QuizMedia
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+DEFAULT_VARIANT_SIZES = {
+    QuizMedia.VARIANT_DISPLAY: 1600,
+    QuizMedia.VARIANT_SMALL: 480,
+}
+DEFAULT_MAX_PIXELS = 40_000_000
+JPEG_QUALITY = 85
+MEDIA_ROOT_DIR = "quiz_media"
+
+
+class MediaProcessingError(Exception):
+    """File upload bukan gambar yang bisa diproses."""
+
+
+@dataclass
+class EncodedVariant:
+    content: bytes
+    content_type: str
+    extension: str
+    width: int
+    height: int
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def variant_sizes() -> Dict[str, int]:
+    return getattr(settings, "QUIZ_MEDIA_VARIANT_SIZES", DEFAULT_VARIANT_SIZES)
+
+
+def _open_image(data: bytes) -> Image.Image:
+    max_pixels = getattr(settings, "QUIZ_MEDIA_MAX_PIXELS", DEFAULT_MAX_PIXELS)
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.format not in ALLOWED_FORMATS:
+            raise MediaProcessingError("Tipe file tidak didukung. Gunakan JPEG, PNG, GIF, atau WebP.")
+        # Cek dimensi sebelum decode penuh (decompression bomb)
+        if image.width * image.height > max_pixels:
+            raise MediaProcessingError("Resolusi gambar terlalu besar.")
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise MediaProcessingError("File bukan gambar yang valid.")
+    # Orientasi EXIF diterapkan ke piksel karena EXIF-nya akan dibuang
+    return ImageOps.exif_transpose(image)
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    if image.mode in {"RGBA", "LA"}:
+        return image.getextrema()[-1][0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+
+def _encode(image: Image.Image, max_side: int, keep_alpha: bool) -> EncodedVariant:
+    variant = image.copy()
+    variant.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    # Encode ulang tanpa exif/icc_profile -> metadata ikut terbuang
+    if keep_alpha:
+        variant.convert("RGBA").save(buffer, format="PNG", optimize=True)
+        content_type, extension = "image/png", "png"
+    else:
+        variant.convert("RGB").save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        content_type, extension = "image/jpeg", "jpg"
+    return EncodedVariant(buffer.getvalue(), content_type, extension, variant.width, variant.height)
+
+
+def process_image(data: bytes) -> Tuple[Tuple[int, int], Dict[str, EncodedVariant]]:
+    """Return ((width, height) asli setelah orientasi, {nama varian: EncodedVariant})."""
+    image = _open_image(data)
+    keep_alpha = _has_alpha(image)
+    variants = {
+        name: _encode(image, max_side, keep_alpha)
+        for name, max_side in variant_sizes().items()
+    }
+    return image.size, variants
+
+
+def variant_path(sha256: str, name: str, extension: str) -> str:
+    return f"{MEDIA_ROOT_DIR}/{sha256[:2]}/{sha256}/{name}.{extension}"
+
+
+def store_upload(data: bytes, original_name: str = "", user=None) -> Tuple[QuizMedia, bool]:
+    """
+    Simpan upload sebagai QuizMedia. Return (media, created);
+    created=False jika file yang sama persis sudah pernah di-upload.
+    """
+    sha256 = content_hash(data)
+    existing = QuizMedia.objects.filter(sha256=sha256).first()
+    if existing:
+        return existing, False
+
+    (width, height), encoded = process_image(data)
+    variants = {}
+    for name, variant in encoded.items():
+        path = variant_path(sha256, name, variant.extension)
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(variant.content))
+        variants[name] = {
+            "path": path,
+            "content_type": variant.content_type,
+            "width": variant.width,
+            "height": variant.height,
+            "size": len(variant.content),
+        }
+
+    try:
+        with transaction.atomic():
+            media = QuizMedia.objects.create(
+                uploaded_by=user,
+                sha256=sha256,
+                original_name=(original_name or "")[:255],
+                original_size=len(data),
+                width=width,
+                height=height,
+                variants=variants,
+            )
+    except IntegrityError:
+        # Upload paralel dengan isi yang sama: pakai record yang menang
+        return QuizMedia.objects.get(sha256=sha256), False
+    return media, True
+
+
+def variant_url_path(sha256: str, name: str = QuizMedia.VARIANT_DISPLAY) -> str:
+    return reverse("quiz-media-file", args=[sha256, name])
+
+
+def get_variant(sha256: str, name: str) -> Optional[dict]:
+    variants = QuizMedia.objects.filter(sha256=sha256).values_list("variants", flat=True).first()
+    if not variants:
+        return None
+    return variants.get(name)
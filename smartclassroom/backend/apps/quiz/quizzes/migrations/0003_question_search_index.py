@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+SQLITE_TABLE = "quiz_question_fts"
+POSTGRES_TABLE = "quiz_question_search"
+
+
+def create_search_index(apps, schema_editor):
+    """Buat tabel full-text index lalu isi dari pertanyaan yang sudah ada."""
+    vendor = schema_editor.connection.vendor
+    QuizQuestion = apps.get_model("quiz_quizzes", "QuizQuestion")
+    QuizPackage = apps.get_model("quiz_quizzes", "QuizPackage")
+    question_table = QuizQuestion._meta.db_table
+    package_table = QuizPackage._meta.db_table
+
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            "body_text, explanation, title, topic, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, body_text, explanation, title, topic) "
+            f"SELECT q.id, q.body_text, q.explanation, p.title, p.topic "
+            f"FROM {question_table} q JOIN {package_table} p ON p.id = q.package_id"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+            "question_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_gin "
+            f"ON {POSTGRES_TABLE} USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {POSTGRES_TABLE} (question_id, document) "
+            "SELECT q.id, "
+            "setweight(to_tsvector('simple', coalesce(q.body_text, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(p.title, '') || ' ' || coalesce(p.topic, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(q.explanation, '')), 'C') "
+            f"FROM {question_table} q JOIN {package_table} p ON p.id = q.package_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("quiz_quizzes", "0002_remove_quizquestion_unique_together"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_quizzes', '0004_quizmedia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_id', models.CharField(blank=True, help_text='SisCourseClass id (IdCourse_KodeKelas)', max_length=100)),
+                ('code', models.CharField(max_length=8, unique=True)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('finished', 'Finished')], default='active', max_length=20)),
+                ('question_ids', models.JSONField(default=list)),
+                ('current_index', models.IntegerField(default=-1)),
+                ('question_duration', models.PositiveIntegerField(default=30, help_text='Detik per pertanyaan')),
+                ('question_opened_at', models.DateTimeField(blank=True, null=True)),
+                ('question_deadline', models.DateTimeField(blank=True, null=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('current_question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quiz_quizzes.quizquestion')),
+                ('host', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_sessions', to=settings.AUTH_USER_MODEL)),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='quiz_quizzes.quizpackage')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant', models.CharField(help_text='NIM mahasiswa', max_length=50)),
+                ('label', models.CharField(max_length=5)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('source', models.CharField(choices=[('web', 'Web'), ('device', 'Polling Device')], default='web', max_length=10)),
+                ('device_code', models.CharField(blank=True, max_length=10)),
+                ('answered_at', models.DateTimeField()),
+                ('response_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('option', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='responses', to='quiz_quizzes.quizoption')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='quiz_quizzes.quizquestion')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='quiz_quizzes.quizsession')),
+            ],
+            options={
+                'ordering': ['answered_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['host', 'status'], name='quiz_session_host_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizresponse',
+            constraint=models.UniqueConstraint(fields=('session', 'question', 'participant'), name='unique_response_per_participant'),
+        ),
+    ]
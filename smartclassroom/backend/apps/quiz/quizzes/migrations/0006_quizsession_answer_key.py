@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_quizzes', '0005_quizsession_quizresponse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='answer_key',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -93,3 +93,125 @@ class QuizOption(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"{self.question_id} - {self.label}"
+
+
+class QuizMedia(TimeStampedModel):
+    """Gambar soal yang sudah diproses, dialamatkan dengan SHA-256 file aslinya."""
+
+    VARIANT_DISPLAY = "display"
+    VARIANT_SMALL = "small"
+
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="quiz_media",
+    )
+    sha256 = models.CharField(max_length=64, unique=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    original_size = models.PositiveIntegerField(default=0)
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    # {"display": {"path", "content_type", "width", "height", "size"}, "small": {...}}
+    variants = models.JSONField(default=dict)
+
+    def __str__(self) -> str:
+        return self.original_name or self.sha256
+
+
+class QuizSession(TimeStampedModel):
+    """Satu kali penayangan live sebuah paket kuis di kelas."""
+
+    STATUS_ACTIVE = "active"
+    STATUS_FINISHED = "finished"
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, "Active"),
+        (STATUS_FINISHED, "Finished"),
+    ]
+
+    package = models.ForeignKey(
+        QuizPackage,
+        on_delete=models.CASCADE,
+        related_name="sessions",
+    )
+    host = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="quiz_sessions",
+    )
+    class_id = models.CharField(max_length=100, blank=True, help_text="SisCourseClass id (IdCourse_KodeKelas)")
+    code = models.CharField(max_length=8, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    # Snapshot urutan pertanyaan aktif saat sesi dimulai
+    question_ids = models.JSONField(default=list)
+    # Snapshot kunci jawaban {question_id: {label: [option_id, is_correct]}} saat sesi dimulai
+    answer_key = models.JSONField(default=dict, blank=True)
+    current_index = models.IntegerField(default=-1)
+    current_question = models.ForeignKey(
+        QuizQuestion,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    question_duration = models.PositiveIntegerField(default=30, help_text="Detik per pertanyaan")
+    question_opened_at = models.DateTimeField(null=True, blank=True)
+    question_deadline = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["host", "status"], name="quiz_session_host_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.package.title} ({self.code})"
+
+
+class QuizResponse(models.Model):
+    SOURCE_WEB = "web"
+    SOURCE_DEVICE = "device"
+    SOURCE_CHOICES = [
+        (SOURCE_WEB, "Web"),
+        (SOURCE_DEVICE, "Polling Device"),
+    ]
+
+    session = models.ForeignKey(
+        QuizSession,
+        on_delete=models.CASCADE,
+        related_name="responses",
+    )
+    question = models.ForeignKey(
+        QuizQuestion,
+        on_delete=models.CASCADE,
+        related_name="responses",
+    )
+    participant = models.CharField(max_length=50, help_text="NIM mahasiswa")
+    option = models.ForeignKey(
+        QuizOption,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="responses",
+    )
+    label = models.CharField(max_length=5)
+    is_correct = models.BooleanField(default=False)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=SOURCE_WEB)
+    device_code = models.CharField(max_length=10, blank=True)
+    answered_at = models.DateTimeField()
+    response_ms = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["answered_at", "id"]
+        constraints = [
+            # Jawaban pertama yang menang; kiriman ulang diabaikan (idempotent)
+            models.UniqueConstraint(
+                fields=["session", "question", "participant"],
+                name="unique_response_per_participant",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.session_id} - Q{self.question_id} - {self.participant}: {self.label}"
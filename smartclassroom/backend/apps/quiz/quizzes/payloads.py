@@ -0,0 +1,133 @@
+"""Payload ringkas pertanyaan untuk device polling (ESP32 clicker).
+
+Device hanya butuh ID pertanyaan, jumlah opsi dan label opsinya; teks
+soal tampil di proyektor. Semua pertanyaan aktif satu paket dikompilasi
+sekali menjadi dua bentuk wire format lalu disimpan di cache:
+
+- JSON ringkas: {"v":1,"q":<id>,"o":<order>,"t":"s|m|b|n","n":<jumlah opsi>,"l":"ABCD"}
+- biner fixed 13 byte (little-endian, lihat RECORD_FORMAT):
+  versi u8, tipe u8, question_id u32, order u16, jumlah opsi u8,
+  label 4 byte ASCII (huruf pertama tiap label, sisa diisi NUL)
+
+Key cache berisi updated_at paket, yang dinaikkan setiap kali pertanyaan
+atau opsinya berubah (signals.py, plus jalur bulk yang tidak memicu
+signal) di dalam transaksi penulisnya. Versi ini dibaca dari database,
+jadi perubahan dari proses lain (import lewat CLI, worker lain) langsung
+terlihat tanpa perlu cache bersama. Membuka pertanyaan berikutnya di sesi
+live cukup satu query versi (atau nol jika paket sudah dimuat) plus baca
+cache, tanpa serializer.
+"""
+import hashlib
+import json
+import struct
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import QuizPackage, QuizQuestion
+
+PAYLOAD_VERSION = 1
+PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+MAX_DEVICE_OPTIONS = 4
+# versi, tipe, question_id, order, jumlah opsi, label
+RECORD_FORMAT = "<BBIHB4s"
+# versi, reserved, package_id, jumlah pertanyaan
+HEADER_FORMAT = "<BBIH"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+TYPE_CODES = {
+    QuizQuestion.TYPE_SINGLE: ("s", 1),
+    QuizQuestion.TYPE_MULTIPLE: ("m", 2),
+    QuizQuestion.TYPE_TRUE_FALSE: ("b", 3),
+    QuizQuestion.TYPE_NUMERIC: ("n", 4),
+}
+
+
+def _cache_key(package_id: int, updated_at: Optional[datetime]) -> str:
+    version = updated_at.isoformat() if updated_at else ""
+    return f"quiz:payloads:{package_id}:{version}"
+
+
+def compile_question(question: QuizQuestion, labels: List[str]) -> dict:
+    """Return {"json": str, "binary": bytes} untuk satu pertanyaan."""
+    labels = labels[:MAX_DEVICE_OPTIONS]
+    type_char, type_code = TYPE_CODES.get(question.question_type, ("s", 1))
+    data = {
+        "v": PAYLOAD_VERSION,
+        "q": question.id,
+        "o": question.order,
+        "t": type_char,
+        "n": len(labels),
+        "l": "".join(labels) if all(len(label) == 1 for label in labels) else labels,
+    }
+    short_labels = "".join(label[:1] for label in labels).encode("ascii", "replace")
+    binary = struct.pack(
+        RECORD_FORMAT,
+        PAYLOAD_VERSION,
+        type_code,
+        question.id,
+        min(max(question.order, 0), 0xFFFF),
+        len(labels),
+        short_labels,
+    )
+    return {"json": json.dumps(data, separators=(",", ":")), "binary": binary}
+
+
+def compile_package(package_id: int) -> dict:
+    """
+    Kompilasi semua pertanyaan aktif paket (2 query: pertanyaan + opsi).
+    Return dict: version, package_id, revision, order, questions {id: payload}, binary.
+    """
+    questions = list(
+        QuizQuestion.objects.filter(package_id=package_id, is_active=True)
+        .only("id", "order", "question_type")
+        .prefetch_related("options")
+        .order_by("order", "id")
+    )
+    compiled = {
+        question.id: compile_question(question, [option.label.upper() for option in question.options.all()])
+        for question in questions
+    }
+    order = [question.id for question in questions]
+    binary = struct.pack(HEADER_FORMAT, PAYLOAD_VERSION, 0, package_id, len(order)) + b"".join(
+        compiled[question_id]["binary"] for question_id in order
+    )
+    return {
+        "version": PAYLOAD_VERSION,
+        "package_id": package_id,
+        "revision": hashlib.sha1(binary).hexdigest()[:16],
+        "order": order,
+        "questions": compiled,
+        "binary": binary,
+    }
+
+
+def get_package_payloads(package_id: int, updated_at: Optional[datetime] = None) -> dict:
+    """
+    Payload terkompilasi paket. `updated_at` paket boleh diberikan jika
+    instance-nya baru dimuat; jika tidak, versinya dibaca dari database.
+    """
+    if updated_at is None:
+        updated_at = QuizPackage.objects.filter(id=package_id).values_list("updated_at", flat=True).first()
+    key = _cache_key(package_id, updated_at)
+    compiled = cache.get(key)
+    if compiled is None or compiled.get("version") != PAYLOAD_VERSION:
+        compiled = compile_package(package_id)
+        cache.set(key, compiled, PAYLOAD_CACHE_TIMEOUT)
+    return compiled
+
+
+def get_question_payload(package_id: int, question_id: int,
+                         updated_at: Optional[datetime] = None) -> Optional[dict]:
+    """Payload satu pertanyaan; None jika pertanyaan sudah tidak aktif / dihapus."""
+    return get_package_payloads(package_id, updated_at)["questions"].get(question_id)
+
+
+def invalidate_packages(package_ids: Iterable[int]):
+    """Naikkan versi (updated_at) paket yang pertanyaan / opsinya berubah."""
+    ids = {package_id for package_id in package_ids if package_id}
+    if ids:
+        # Ikut transaksi penulis: versi baru terlihat bersamaan dengan datanya
+        QuizPackage.objects.filter(id__in=ids).update(updated_at=timezone.now())
@@ -0,0 +1,161 @@
+"""Full-text index untuk question bank.
+
+Index disimpan di tabel terpisah yang dikelola dengan SQL mentah:
+SQLite memakai virtual table FTS5, PostgreSQL memakai kolom tsvector
+dengan index GIN. Database lain jatuh ke pencarian icontains biasa.
+Tabel dibuat oleh migrasi 0003, di-update lewat signal (lihat
+signals.py) dan bisa dibangun ulang dengan
+`manage.py rebuild_question_search_index`.
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from .models import QuizPackage, QuizQuestion
+
+SQLITE_TABLE = "quiz_question_fts"
+POSTGRES_TABLE = "quiz_question_search"
+DEFAULT_SEARCH_MAX_RESULTS = 1000
+INDEX_BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def backend_vendor(conn=None) -> Optional[str]:
+    vendor = (conn or connection).vendor
+    return vendor if vendor in {"sqlite", "postgresql"} else None
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall((query or "").lower())
+
+
+def _batches(ids: List[int]):
+    for offset in range(0, len(ids), INDEX_BATCH_SIZE):
+        yield ids[offset:offset + INDEX_BATCH_SIZE]
+
+
+def _placeholders(values: List[int]) -> str:
+    return ", ".join(["%s"] * len(values))
+
+
+def index_questions(question_ids: Iterable[int]) -> None:
+    """Tulis ulang entri index untuk pertanyaan yang diberikan."""
+    vendor = backend_vendor()
+    ids = list(question_ids)
+    if vendor is None or not ids:
+        return
+    question_table = QuizQuestion._meta.db_table
+    package_table = QuizPackage._meta.db_table
+
+    with connection.cursor() as cursor:
+        for batch in _batches(ids):
+            params = _placeholders(batch)
+            if vendor == "sqlite":
+                cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({params})", batch)
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_TABLE} (rowid, body_text, explanation, title, topic) "
+                    f"SELECT q.id, q.body_text, q.explanation, p.title, p.topic "
+                    f"FROM {question_table} q JOIN {package_table} p ON p.id = q.package_id "
+                    f"WHERE q.id IN ({params})",
+                    batch,
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {POSTGRES_TABLE} (question_id, document) "
+                    "SELECT q.id, "
+                    "setweight(to_tsvector('simple', coalesce(q.body_text, '')), 'A') || "
+                    "setweight(to_tsvector('simple', coalesce(p.title, '') || ' ' || coalesce(p.topic, '')), 'B') || "
+                    "setweight(to_tsvector('simple', coalesce(q.explanation, '')), 'C') "
+                    f"FROM {question_table} q JOIN {package_table} p ON p.id = q.package_id "
+                    f"WHERE q.id IN ({params}) "
+                    "ON CONFLICT (question_id) DO UPDATE SET document = EXCLUDED.document",
+                    batch,
+                )
+
+
+def remove_questions(question_ids: Iterable[int]) -> None:
+    vendor = backend_vendor()
+    ids = list(question_ids)
+    if vendor is None or not ids:
+        return
+    with connection.cursor() as cursor:
+        for batch in _batches(ids):
+            if vendor == "sqlite":
+                cursor.execute(
+                    f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({_placeholders(batch)})", batch
+                )
+            else:
+                cursor.execute(
+                    f"DELETE FROM {POSTGRES_TABLE} WHERE question_id IN ({_placeholders(batch)})",
+                    batch,
+                )
+
+
+def rebuild_index() -> int:
+    """Kosongkan lalu isi ulang seluruh index. Return jumlah pertanyaan."""
+    vendor = backend_vendor()
+    if vendor is None:
+        return 0
+    with connection.cursor() as cursor:
+        table = SQLITE_TABLE if vendor == "sqlite" else POSTGRES_TABLE
+        cursor.execute(f"DELETE FROM {table}")
+    ids = list(QuizQuestion.objects.order_by("id").values_list("id", flat=True))
+    index_questions(ids)
+    return len(ids)
+
+
+def search_question_ids(
+    query: str, visible_to: Optional[int] = None, limit: Optional[int] = None
+) -> Optional[Dict[int, float]]:
+    """Return {question_id: rank} (rank kecil = lebih relevan).
+
+    Setiap kata dicocokkan sebagai prefix dan semua kata wajib ada.
+    `visible_to` (user id): hanya pertanyaan dari paket milik user tersebut
+    atau paket shared; filter ini ikut di query index sehingga LIMIT
+    berlaku setelah filter akses, bukan sebelum.
+    Return None jika database tidak punya full-text index.
+    """
+    vendor = backend_vendor()
+    if vendor is None:
+        return None
+    tokens = tokenize(query)
+    if not tokens:
+        return {}
+    limit = limit or getattr(settings, "QUIZ_SEARCH_MAX_RESULTS", DEFAULT_SEARCH_MAX_RESULTS)
+
+    question_table = QuizQuestion._meta.db_table
+    package_table = QuizPackage._meta.db_table
+    visibility_sql = ""
+    visibility_params: List[object] = []
+    if visible_to is not None:
+        visibility_sql = "AND (p.owner_id = %s OR p.visibility = %s) "
+        visibility_params = [visible_to, QuizPackage.VISIBILITY_SHARED]
+
+    with connection.cursor() as cursor:
+        if vendor == "sqlite":
+            match = " ".join(f'"{token}"*' for token in tokens)
+            cursor.execute(
+                f"SELECT {SQLITE_TABLE}.rowid, bm25({SQLITE_TABLE}, 10.0, 2.0, 5.0, 5.0) AS rank "
+                f"FROM {SQLITE_TABLE} "
+                f"JOIN {question_table} q ON q.id = {SQLITE_TABLE}.rowid "
+                f"JOIN {package_table} p ON p.id = q.package_id "
+                f"WHERE {SQLITE_TABLE} MATCH %s {visibility_sql}"
+                "ORDER BY rank LIMIT %s",
+                [match, *visibility_params, limit],
+            )
+        else:
+            tsquery = " & ".join(f"{token}:*" for token in tokens)
+            cursor.execute(
+                "SELECT s.question_id, -ts_rank_cd(s.document, query) AS rank "
+                f"FROM {POSTGRES_TABLE} s "
+                f"JOIN {question_table} q ON q.id = s.question_id "
+                f"JOIN {package_table} p ON p.id = q.package_id, "
+                "to_tsquery('simple', %s) query "
+                f"WHERE s.document @@ query {visibility_sql}"
+                "ORDER BY rank LIMIT %s",
+                [tsquery, *visibility_params, limit],
+            )
+        return {question_id: rank for question_id, rank in cursor.fetchall()}
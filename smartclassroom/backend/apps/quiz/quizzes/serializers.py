@@ -1,8 +1,24 @@
 from typing import List
 
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import QuizOption, QuizPackage, QuizQuestion
+from . import payloads
+from .models import QuizOption, QuizPackage, QuizQuestion, QuizSession
+
+
+def build_options(question: QuizQuestion, options_data: List[dict]) -> List[QuizOption]:
+    """Instance QuizOption (belum disimpan); label default A, B, C, ... sesuai urutan."""
+    return [
+        QuizOption(
+            question=question,
+            label=(option.get("label") or chr(65 + idx)).upper(),
+            body_text=option["body_text"],
+            is_correct=option.get("is_correct", False),
+        )
+        for idx, option in enumerate(options_data)
+    ]
 
 
 class QuizOptionSerializer(serializers.ModelSerializer):
@@ -52,6 +68,10 @@ class QuizQuestionSerializer(serializers.ModelSerializer):
         # Pilihan Ganda (single/multiple) dan True/False: hanya 1 benar untuk polling device
         if correct_count != 1:
             raise serializers.ValidationError("Hanya boleh ada satu jawaban yang benar.")
+
+        labels = [(option.get("label") or chr(65 + idx)).upper() for idx, option in enumerate(value)]
+        if len(set(labels)) != len(labels):
+            raise serializers.ValidationError("Label opsi tidak boleh duplikat.")
         
         return value
 
@@ -64,32 +84,50 @@ class QuizQuestionSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         options_data = validated_data.pop("options", None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        if options_data is not None:
-            instance.options.all().delete()
-            self._upsert_options(instance, options_data)
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            if options_data is not None:
+                self._sync_options(instance, options_data)
         return instance
 
     def _upsert_options(self, question: QuizQuestion, options_data: List[dict]):
-        to_create = []
-        for idx, option in enumerate(options_data):
-            label = option.get("label") or chr(65 + idx)
-            to_create.append(
-                QuizOption(
-                    question=question,
-                    label=label.upper(),
-                    body_text=option["body_text"],
-                    is_correct=option.get("is_correct", False),
-                )
-            )
-        QuizOption.objects.bulk_create(to_create)
+        QuizOption.objects.bulk_create(build_options(question, options_data))
+        payloads.invalidate_packages([question.package_id])
+
+    def _sync_options(self, question: QuizQuestion, options_data: List[dict]):
+        """Rekonsiliasi opsi berdasarkan label: hanya baris yang berubah yang ditulis."""
+        existing = {option.label: option for option in question.options.all()}
+        to_create, to_update = [], []
+        for option in build_options(question, options_data):
+            current = existing.pop(option.label, None)
+            if current is None:
+                to_create.append(option)
+            elif (current.body_text, current.is_correct) != (option.body_text, option.is_correct):
+                current.body_text = option.body_text
+                current.is_correct = option.is_correct
+                to_update.append(current)
+
+        if existing:
+            QuizOption.objects.filter(id__in=[option.id for option in existing.values()]).delete()
+        if to_update:
+            now = timezone.now()
+            for option in to_update:
+                option.updated_at = now
+            QuizOption.objects.bulk_update(to_update, ["body_text", "is_correct", "updated_at"])
+        if to_create:
+            QuizOption.objects.bulk_create(to_create)
+            # bulk_create tidak memicu signal; label baru mengubah payload device
+            payloads.invalidate_packages([question.package_id])
+        # Cache prefetch lama sudah tidak valid untuk response
+        getattr(question, "_prefetched_objects_cache", {}).pop("options", None)
 
 
 class QuizPackageSerializer(serializers.ModelSerializer):
     owner = serializers.CharField(source="owner.username", read_only=True)
     question_count = serializers.SerializerMethodField()
+    active_question_count = serializers.SerializerMethodField()
 
     class Meta:
         model = QuizPackage
@@ -103,10 +141,52 @@ class QuizPackageSerializer(serializers.ModelSerializer):
             "is_archived",
             "owner",
             "question_count",
+            "active_question_count",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["owner", "created_at", "updated_at", "question_count"]
+        read_only_fields = [
+            "owner", "created_at", "updated_at", "question_count", "active_question_count"
+        ]
 
     def get_question_count(self, obj: QuizPackage) -> int:
-        return obj.questions.count()
+        # Dianotasi oleh QuizPackageViewSet.get_queryset; fallback untuk instance baru
+        count = getattr(obj, "question_count", None)
+        if count is None:
+            return obj.questions.count()
+        return count
+
+    def get_active_question_count(self, obj: QuizPackage) -> int:
+        count = getattr(obj, "active_question_count", None)
+        if count is None:
+            return obj.questions.filter(is_active=True).count()
+        return count
+
+
+class QuizSessionSerializer(serializers.ModelSerializer):
+    package_title = serializers.CharField(source="package.title", read_only=True)
+    host = serializers.CharField(source="host.username", read_only=True)
+
+    class Meta:
+        model = QuizSession
+        fields = [
+            "id",
+            "package",
+            "package_title",
+            "host",
+            "class_id",
+            "code",
+            "status",
+            "question_ids",
+            "current_index",
+            "current_question",
+            "question_duration",
+            "question_opened_at",
+            "question_deadline",
+            "created_at",
+            "ended_at",
+        ]
+        read_only_fields = [
+            "host", "code", "status", "question_ids", "current_index", "current_question",
+            "question_opened_at", "question_deadline", "created_at", "ended_at",
+        ]
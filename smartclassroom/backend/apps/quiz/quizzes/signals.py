@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import payloads, search
+from .models import QuizOption, QuizPackage, QuizQuestion
+
+
+@receiver(post_save, sender=QuizQuestion)
+def index_question(sender, instance: QuizQuestion, raw: bool = False, **kwargs):
+    if not raw:
+        search.index_questions([instance.pk])
+        payloads.invalidate_packages([instance.package_id])
+
+
+@receiver(post_delete, sender=QuizQuestion)
+def unindex_question(sender, instance: QuizQuestion, **kwargs):
+    search.remove_questions([instance.pk])
+    payloads.invalidate_packages([instance.package_id])
+
+
+@receiver(post_save, sender=QuizPackage)
+def reindex_package_questions(sender, instance: QuizPackage, created: bool = False, raw: bool = False, **kwargs):
+    # Judul/topik paket ikut diindeks di setiap pertanyaannya
+    if not raw and not created:
+        search.index_questions(instance.questions.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=QuizOption)
+@receiver(post_delete, sender=QuizOption)
+def invalidate_option_payloads(sender, instance: QuizOption, raw: bool = False, **kwargs):
+    # Label / jumlah opsi ikut dikompilasi ke payload device polling
+    if not raw:
+        payloads.invalidate_packages(
+            QuizQuestion.objects.filter(id=instance.question_id).values_list("package_id", flat=True)
+        )
@@ -0,0 +1,709 @@
+import io
+import json
+import math
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import numpy as np
+from PIL import Image
+from rest_framework.test import APIClient
+
+from . import analytics, live, payloads
+from .bundles import BUNDLE_FORMAT, BUNDLE_VERSION
+from .importer import import_questions, parse_csv, parse_gift, parse_json
+from .media import store_upload
+from .models import QuizMedia, QuizOption, QuizPackage, QuizQuestion, QuizResponse, QuizSession
+from .search import search_question_ids
+
+
+def make_package(owner, title="Paket", visibility=QuizPackage.VISIBILITY_PRIVATE, questions=3):
+    package = QuizPackage.objects.create(owner=owner, title=title, topic="Jaringan", visibility=visibility)
+    for index in range(questions):
+        question = QuizQuestion.objects.create(
+            package=package,
+            body_text=f"Soal {title} nomor {index + 1}",
+            order=index + 1,
+            is_active=index % 2 == 0,
+        )
+        QuizOption.objects.bulk_create([
+            QuizOption(question=question, label=label, body_text=f"Opsi {label}", is_correct=label == "A")
+            for label in "ABCD"
+        ])
+    return package
+
+
+class QuizPackageQueryCountTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        other = User.objects.create(username="dosen2", email="dosen2@example.com", role="lecturer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+        self.package = make_package(self.lecturer, title="Milik sendiri")
+        make_package(other, title="Dibagikan", visibility=QuizPackage.VISIBILITY_SHARED)
+        make_package(other, title="Privat orang lain")
+
+    def test_list_query_count_does_not_grow_with_packages(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("quiz-package-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+
+        for index in range(5):
+            make_package(self.lecturer, title=f"Tambahan {index}")
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("quiz-package-list"))
+        self.assertEqual(len(response.data), 7)
+
+    def test_list_includes_annotated_counts(self):
+        response = self.client.get(reverse("quiz-package-list"))
+        own = next(item for item in response.data if item["id"] == self.package.id)
+        self.assertEqual(own["owner"], "dosen")
+        self.assertEqual(own["question_count"], 3)
+        self.assertEqual(own["active_question_count"], 2)
+
+    def test_retrieve_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("quiz-package-detail", args=[self.package.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["question_count"], 3)
+        self.assertEqual(response.data["active_question_count"], 2)
+
+
+class QuestionBankSearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.other = User.objects.create(username="dosen2", email="dosen2@example.com", role="lecturer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+
+    def search(self, query):
+        response = self.client.get(reverse("question-bank-list"), {"search": query})
+        self.assertEqual(response.status_code, 200)
+        return [item["id"] for item in response.data]
+
+    @override_settings(QUIZ_SEARCH_MAX_RESULTS=2)
+    def test_limit_applies_after_visibility_filter(self):
+        # Paket privat orang lain punya hasil yang lebih relevan dan melebihi limit
+        hidden = make_package(self.other, title="Jaringan jaringan", questions=4)
+        own = make_package(self.lecturer, title="Milik sendiri", questions=1)
+        shared = make_package(self.other, title="Dibagikan", visibility=QuizPackage.VISIBILITY_SHARED, questions=1)
+
+        found = self.search("soal")
+        self.assertCountEqual(
+            found,
+            list(QuizQuestion.objects.filter(package__in=[own, shared]).values_list("id", flat=True)),
+        )
+        self.assertFalse(set(found) & set(hidden.questions.values_list("id", flat=True)))
+
+    def test_results_are_ordered_by_relevance(self):
+        package = make_package(self.lecturer, questions=0)
+        weak = QuizQuestion.objects.create(package=package, body_text="Pengantar", explanation="routing", order=1)
+        strong = QuizQuestion.objects.create(package=package, body_text="Routing statis dan routing dinamis", order=2)
+        self.assertEqual(self.search("routing"), [strong.id, weak.id])
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_bundle(records, media):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("manifest.json", json.dumps({
+            "format": BUNDLE_FORMAT,
+            "version": BUNDLE_VERSION,
+            "package": {"title": "Bundle", "topic": "Jaringan"},
+            "media": {name: {} for name in media},
+        }))
+        archive.writestr("questions.jsonl", "".join(json.dumps(record) + "\n" for record in records))
+        for name, data in media.items():
+            archive.writestr(name, data)
+    return SimpleUploadedFile("paket.zip", buffer.getvalue(), content_type="application/zip")
+
+
+def question_record(body_text, media=None):
+    record = {
+        "body_text": body_text,
+        "question_type": QuizQuestion.TYPE_SINGLE,
+        "options": [
+            {"label": "A", "body_text": "Benar", "is_correct": True},
+            {"label": "B", "body_text": "Salah", "is_correct": False},
+        ],
+    }
+    if media:
+        record["media"] = media
+    return record
+
+
+class BundleImportTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+        self.url = reverse("quiz-package-import-bundle")
+
+    def stored_files(self):
+        return [files for _, _, files in os.walk(self.media_root) if files]
+
+    def test_valid_bundle_imports_media(self):
+        bundle = make_bundle(
+            [question_record("Soal bergambar", media="media/1-a.png"), question_record("Soal biasa")],
+            {"media/1-a.png": png_bytes("red")},
+        )
+        response = self.client.post(self.url, {"file": bundle}, format="multipart")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["import"]["media"], {"created": 1, "reused": 0})
+        question = QuizQuestion.objects.get(body_text="Soal bergambar")
+        self.assertIn(QuizMedia.objects.get().sha256, question.media_url)
+        self.assertTrue(self.stored_files())
+
+    def test_invalid_row_leaves_no_media_behind(self):
+        bundle = make_bundle(
+            [question_record("Soal bergambar", media="media/1-a.png"), question_record("")],
+            {"media/1-a.png": png_bytes("red")},
+        )
+        response = self.client.post(self.url, {"file": bundle}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertFalse(QuizPackage.objects.exists())
+        self.assertFalse(QuizMedia.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_media_failure_rolls_back_and_removes_stored_files(self):
+        bundle = make_bundle(
+            [
+                question_record("Soal pertama", media="media/1-a.png"),
+                question_record("Soal kedua", media="media/2-b.png"),
+            ],
+            {"media/1-a.png": png_bytes("red"), "media/2-b.png": b"bukan gambar"},
+        )
+        response = self.client.post(self.url, {"file": bundle}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuizPackage.objects.exists())
+        self.assertFalse(QuizMedia.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+
+class DevicePayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+        self.package = make_package(self.lecturer, questions=2)
+        self.url = reverse("quiz-package-device-payloads", args=[self.package.id])
+
+    def question_ids(self):
+        return [question["q"] for question in self.client.get(self.url).json()["questions"]]
+
+    def test_cli_import_is_visible_without_shared_cache(self):
+        before = self.question_ids()
+        self.assertEqual(len(before), 1)
+
+        # Import CLI berjalan di proses lain; versi paket dibaca dari database
+        path = os.path.join(tempfile.mkdtemp(), "soal.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path), True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([question_record("Soal dari CLI")], f)
+        call_command("import_quiz_questions", self.package.id, path, stdout=io.StringIO())
+
+        imported = QuizQuestion.objects.get(body_text="Soal dari CLI")
+        self.assertEqual(self.question_ids(), before + [imported.id])
+
+    def test_cached_payload_is_reused_until_the_package_changes(self):
+        payloads.get_package_payloads(self.package.id)
+        with self.assertNumQueries(1):
+            payloads.get_package_payloads(self.package.id)
+
+        question = self.package.questions.filter(is_active=True).get()
+        QuizOption.objects.filter(question=question, label="D").delete()
+        compiled = payloads.get_package_payloads(self.package.id)
+        self.assertEqual(json.loads(compiled["questions"][question.id]["json"])["l"], "ABC")
+
+
+@override_settings(QUIZ_LIVE_ANSWER_GRACE_SECONDS=2)
+class LiveSessionTests(TestCase):
+    def setUp(self):
+        live.answer_key_cache.clear()
+        self.addCleanup(live.answer_key_cache.clear)
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.package = make_package(self.lecturer, questions=3)
+        self.session = live.activate(self.package, self.lecturer, question_duration=30)
+        live.advance(self.session)
+        self.opened_at = self.session.question_opened_at
+
+    def submit(self, answers, **kwargs):
+        kwargs.setdefault("now", self.opened_at + timedelta(seconds=5))
+        return live.submit_answers(self.session, answers, **kwargs)
+
+    def test_activate_snapshots_active_questions_in_order(self):
+        active = list(self.package.questions.filter(is_active=True).order_by("order").values_list("id", flat=True))
+        self.assertEqual(self.session.question_ids, active)
+        self.assertEqual(self.session.current_question_id, active[0])
+
+        inactive = make_package(self.lecturer, title="Kosong", questions=0)
+        with self.assertRaises(live.LiveSessionError):
+            live.activate(inactive, self.lecturer)
+
+    def test_advance_past_last_question_finishes_session(self):
+        live.advance(self.session)
+        self.assertEqual(self.session.current_index, 1)
+        live.advance(self.session)
+        self.assertEqual(self.session.status, QuizSession.STATUS_FINISHED)
+        with self.assertRaises(live.LiveSessionError):
+            self.submit([{"participant": "111", "label": "A"}])
+
+    def test_time_window_and_grace_period(self):
+        deadline = self.session.question_deadline
+        report = live.submit_answers(self.session, [{"participant": "111", "label": "A"}],
+                                     now=deadline + timedelta(seconds=1))
+        self.assertEqual(report.accepted, 1)
+        report = live.submit_answers(self.session, [{"participant": "222", "label": "A"}],
+                                     now=deadline + timedelta(seconds=3))
+        self.assertEqual(report.accepted, 0)
+        self.assertEqual(report.rejected[0]["error"], "Waktu menjawab sudah habis.")
+        report = live.submit_answers(self.session, [{"participant": "333", "label": "A"}],
+                                     now=self.opened_at - timedelta(seconds=1))
+        self.assertEqual(report.rejected[0]["error"], "Waktu menjawab sudah habis.")
+
+    def test_duplicates_within_and_across_batches(self):
+        report = self.submit([
+            {"participant": "111", "label": "A"},
+            {"participant": "111", "label": "B"},
+            {"participant": "222", "label": "b"},
+        ])
+        self.assertEqual((report.accepted, report.duplicates), (2, 1))
+
+        report = self.submit([{"participant": "222", "label": "A"}, {"participant": "333", "label": "C"}])
+        self.assertEqual((report.accepted, report.duplicates), (1, 1))
+        self.assertEqual(
+            dict(QuizResponse.objects.values_list("participant", "label")),
+            {"111": "A", "222": "B", "333": "C"},
+        )
+        self.assertEqual(set(QuizResponse.objects.filter(is_correct=True).values_list("participant", flat=True)), {"111"})
+
+    def test_unknown_label_is_rejected(self):
+        report = self.submit([{"participant": "111", "label": "E"}, {"participant": "222", "label": "A"}])
+        self.assertEqual(report.accepted, 1)
+        self.assertEqual(report.rejected, [{"index": 0, "participant": "111", "error": "Opsi jawaban tidak dikenal."}])
+
+    def test_answered_at_is_only_used_for_trusted_sources(self):
+        now = self.opened_at + timedelta(seconds=20)
+        claimed = (self.opened_at + timedelta(seconds=1)).isoformat()
+        self.submit([{"participant": "111", "label": "A", "answered_at": claimed}], now=now)
+        self.submit([{"participant": "222", "label": "A", "answered_at": claimed}], now=now, trusted=True)
+        responses = {response.participant: response for response in QuizResponse.objects.all()}
+        self.assertEqual(responses["111"].answered_at, now)
+        self.assertEqual(responses["111"].response_ms, 20000)
+        self.assertEqual(responses["222"].response_ms, 1000)
+
+    def test_batch_query_count_does_not_grow_with_answers(self):
+        answers = [{"participant": f"1{index:04d}", "label": "ABCD"[index % 4]} for index in range(150)]
+        # 1 cek duplikat + INSERT sebanyak batch yang diizinkan backend (SQLite: batas 999 parameter)
+        fields = [f for f in QuizResponse._meta.concrete_fields if not f.primary_key]
+        batch_size = connection.ops.bulk_batch_size(fields, answers) or len(answers)
+        with self.assertNumQueries(1 + math.ceil(len(answers) / batch_size)):
+            report = self.submit(answers)
+        self.assertEqual(report.accepted, 150)
+
+    def test_key_is_rebuilt_from_session_snapshot(self):
+        question = self.package.questions.get(id=self.session.current_question_id)
+        question.options.update(is_correct=False)
+        question.options.filter(label="B").update(is_correct=True)
+        question.options.filter(label="D").delete()
+
+        # Worker lain / restart: cache kosong, sesi dibaca ulang dari database
+        live.answer_key_cache.clear()
+        session = QuizSession.objects.get(id=self.session.id)
+        report = live.submit_answers(session, [
+            {"participant": "111", "label": "A"},
+            {"participant": "222", "label": "B"},
+        ], now=self.opened_at + timedelta(seconds=5))
+        self.assertEqual(report.accepted, 2)
+        self.assertEqual(
+            dict(QuizResponse.objects.values_list("participant", "is_correct")),
+            {"111": True, "222": False},
+        )
+
+
+class ItemStatisticsTests(TestCase):
+    # 4 peserta x 3 butir, skor total 3/2/1/0
+    CORRECT = np.array([
+        [1, 1, 1],
+        [1, 1, 0],
+        [1, 0, 0],
+        [0, 0, 0],
+    ], dtype=np.float64)
+
+    def statistics(self, correct, administered=None):
+        administered = np.ones(correct.shape, dtype=bool) if administered is None else administered
+        chosen = np.where(correct > 0, 0, 1)
+        return analytics.item_statistics(correct, chosen, administered, 2)
+
+    def test_matches_hand_computed_values(self):
+        stats = self.statistics(self.CORRECT)
+        np.testing.assert_allclose(stats["p_values"], [0.75, 0.5, 0.25])
+        # Item-rest: butir 1 -> rest [2,1,0,0], butir 2 -> rest [2,1,1,0], butir 3 -> rest [2,2,1,0]
+        np.testing.assert_allclose(stats["discrimination"], [3 / math.sqrt(33), 1 / math.sqrt(2), 3 / math.sqrt(33)])
+        # Varians butir (ddof=1) 1/4 + 1/3 + 1/4, varians total 5/3 -> 3/2 * (1 - 1/2)
+        self.assertAlmostEqual(stats["alpha"], 0.75)
+        np.testing.assert_array_equal(stats["scores"], [3, 2, 1, 0])
+        np.testing.assert_array_equal(stats["option_counts"], [[3, 1, 0], [2, 2, 0], [1, 3, 0]])
+
+    def test_items_not_administered_are_left_out(self):
+        administered = np.ones(self.CORRECT.shape, dtype=bool)
+        administered[2:, 2] = False
+        stats = self.statistics(self.CORRECT, administered)
+        self.assertAlmostEqual(stats["p_values"][2], 0.5)
+        np.testing.assert_array_equal(stats["given"], [4, 4, 2])
+        np.testing.assert_array_equal(stats["possible"], [3, 3, 2, 2])
+        # Alpha hanya dari butir 1 dan 2: varians butir 1/4 + 1/3, varians total 11/12 -> 2 * (1 - 7/11)
+        self.assertAlmostEqual(stats["alpha"], 8 / 11)
+
+
+class SessionAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.package = make_package(self.lecturer, questions=3)
+        self.q1, self.q2, self.q3 = self.package.questions.order_by("order").values_list("id", flat=True)
+
+    def finished_session(self, code, question_ids, answers):
+        session = QuizSession.objects.create(
+            package=self.package, host=self.lecturer, code=code, question_ids=question_ids,
+            status=QuizSession.STATUS_FINISHED,
+        )
+        now = timezone.now()
+        QuizResponse.objects.bulk_create([
+            QuizResponse(session=session, question_id=question_id, participant=participant, label=label,
+                         is_correct=label == "A", answered_at=now)
+            for participant, question_id, label in answers
+        ])
+        return session
+
+    def test_question_missing_from_one_session(self):
+        first = self.finished_session("AAAAAA", [self.q1, self.q2, self.q3], [
+            ("111", self.q1, "A"), ("111", self.q2, "A"), ("111", self.q3, "B"),
+            ("222", self.q1, "B"), ("222", self.q3, "A"),
+        ])
+        second = self.finished_session("BBBBBB", [self.q1, self.q3], [
+            ("111", self.q1, "A"), ("111", self.q3, "A"),
+            ("333", self.q1, "C"),
+        ])
+
+        data = analytics.build_matrices([first, second])
+        self.assertEqual(data["question_ids"], [self.q1, self.q2, self.q3])
+        self.assertEqual(data["rows"], [(first.id, "111"), (first.id, "222"), (second.id, "111"), (second.id, "333")])
+        np.testing.assert_array_equal(data["administered"][:, 1], [True, True, False, False])
+        np.testing.assert_array_equal(data["correct"], [[1, 1, 0], [0, 0, 1], [1, 0, 1], [0, 0, 0]])
+        self.assertEqual(data["chosen"][1, 1], -1)
+
+        report = analytics.analyze_sessions([first, second])
+        items = {item["question_id"]: item for item in report["items"]}
+        self.assertEqual((items[self.q2]["administered"], items[self.q2]["p_value"]), (2, 0.5))
+        self.assertEqual(items[self.q2]["option_rates"]["-"], 0.5)
+        self.assertEqual((items[self.q1]["administered"], items[self.q1]["p_value"]), (4, 0.5))
+        self.assertEqual(
+            [(student["participant"], student["score"], student["possible"]) for student in report["students"]],
+            [("111", 2, 3), ("222", 1, 3), ("111", 2, 2), ("333", 0, 2)],
+        )
+
+    def test_session_without_responses(self):
+        session = self.finished_session("CCCCCC", [self.q1, self.q2], [])
+        data = analytics.build_matrices([session])
+        self.assertEqual(data["correct"].shape, (0, 2))
+        self.assertEqual(data["rows"], [])
+
+        report = analytics.analyze_sessions([session])
+        self.assertEqual((report["participants"], report["questions"], report["cronbach_alpha"]), (0, 2, None))
+        self.assertIsNone(report["score"]["mean"])
+        self.assertEqual(report["students"], [])
+        for item in report["items"]:
+            self.assertEqual((item["administered"], item["p_value"], item["discrimination"]), (0, None, None))
+            self.assertEqual(item["option_rates"], {"A": None, "B": None, "C": None, "D": None, "-": None})
+
+
+GIFT_FIXTURE = r"""// komentar diabaikan
+$CATEGORY: jaringan
+
+::Q1:: Port default HTTP\: berapa? {=80 ~443#bukan ~%50%8080 ####HTTP memakai port 80}
+
+Nilai \{x\} dengan a \= b adalah {=a\=b ~a\~b ~c\#d}
+
+Protokol TCP connection-oriented. {T}
+
+UDP menjamin urutan paket. {FALSE#UDP tidak menjamin urutan}
+
+Berapa 2+2? {#4}
+"""
+
+
+class QuestionImportParserTests(TestCase):
+    def test_gift_parses_escapes_weights_and_true_false_shorthand(self):
+        rows = parse_gift(GIFT_FIXTURE)
+        self.assertEqual([row.number for row in rows], [4, 6, 8, 10, 12])
+        first, escaped, true_row, false_row, numeric = rows
+
+        self.assertEqual(first.data["body_text"], "Port default HTTP: berapa?")
+        self.assertEqual(first.data["explanation"], "HTTP memakai port 80")
+        self.assertEqual(first.data["question_type"], QuizQuestion.TYPE_MULTIPLE)
+        self.assertEqual(
+            [(option["body_text"], option["is_correct"]) for option in first.data["options"]],
+            [("80", True), ("443", False), ("8080", True)],
+        )
+
+        self.assertEqual(escaped.data["body_text"], "Nilai {x} dengan a = b adalah")
+        self.assertEqual(escaped.data["question_type"], QuizQuestion.TYPE_SINGLE)
+        self.assertEqual([option["body_text"] for option in escaped.data["options"]], ["a=b", "a~b", "c#d"])
+
+        for row, is_true in ((true_row, True), (false_row, False)):
+            self.assertEqual(row.data["question_type"], QuizQuestion.TYPE_TRUE_FALSE)
+            self.assertEqual(
+                [(option["label"], option["is_correct"]) for option in row.data["options"]],
+                [("A", is_true), ("B", not is_true)],
+            )
+
+        self.assertIsNone(numeric.data)
+        self.assertEqual(numeric.errors, {"non_field_errors": ["Soal numerik GIFT belum didukung."]})
+
+    def test_csv_options_correct_labels_and_true_false(self):
+        rows = parse_csv(
+            "body_text,question_type,option_a,option_b,option_c,correct,is_active,order\n"
+            "Soal 1,single,X,Y,Z,b,ya,5\n"
+            "Soal 2,truefalse,,,,salah,,\n"
+            "Soal 3,single,X,Y,,A,mungkin,\n"
+        )
+        self.assertEqual([row.number for row in rows], [2, 3, 4])
+        self.assertEqual(
+            [(option["label"], option["is_correct"]) for option in rows[0].data["options"]],
+            [("A", False), ("B", True), ("C", False)],
+        )
+        self.assertEqual(rows[0].data["order"], "5")
+        self.assertEqual(
+            [(option["label"], option["body_text"], option["is_correct"]) for option in rows[1].data["options"]],
+            [("A", "Benar", False), ("B", "Salah", True)],
+        )
+        self.assertNotIn("order", rows[1].data)
+        self.assertEqual(rows[2].errors, {"is_active": ["Nilai boolean tidak dikenal: mungkin"]})
+
+    def test_json_accepts_wrapped_list_and_drops_ids(self):
+        rows = parse_json('{"questions": [{"id": 9, "package": 2, "body_text": "x"}, 3]}')
+        self.assertEqual(rows[0].data, {"body_text": "x"})
+        self.assertEqual(rows[1].errors, {"non_field_errors": ["Baris harus berupa objek."]})
+
+
+class QuestionImportOrderTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.package = make_package(self.lecturer, questions=2)
+
+    def test_auto_numbered_rows_follow_explicit_orders(self):
+        rows = parse_json(json.dumps([
+            question_record("Otomatis 1"),
+            dict(question_record("Eksplisit"), order=3),
+            question_record("Otomatis 2"),
+        ]))
+        report = import_questions(self.package, rows)
+        self.assertEqual(report.created, 3)
+        orders = dict(QuizQuestion.objects.filter(id__in=report.question_ids).values_list("body_text", "order"))
+        self.assertEqual(orders, {"Otomatis 1": 4, "Eksplisit": 3, "Otomatis 2": 5})
+        all_orders = list(self.package.questions.values_list("order", flat=True))
+        self.assertEqual(len(all_orders), len(set(all_orders)))
+        self.assertEqual(QuizOption.objects.filter(question_id__in=report.question_ids).count(), 6)
+
+
+class QuestionCopyTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+        self.source = make_package(self.lecturer, title="Asli", questions=3)
+        self.target = make_package(self.lecturer, title="Tujuan", questions=1)
+
+    def options_of(self, question_ids):
+        return [
+            list(QuizOption.objects.filter(question_id=question_id).order_by("label")
+                 .values_list("label", "body_text", "is_correct"))
+            for question_id in question_ids
+        ]
+
+    def test_clone_copies_questions_options_and_search_index(self):
+        response = self.client.post(reverse("quiz-package-clone", args=[self.source.id]), {}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["title"], "Asli (Salinan)")
+        self.assertEqual(response.data["question_count"], 3)
+
+        clone = QuizPackage.objects.get(id=response.data["id"])
+        sources = list(self.source.questions.order_by("order").values_list("id", "body_text", "order", "is_active"))
+        copies = list(clone.questions.order_by("order").values_list("id", "body_text", "order", "is_active"))
+        self.assertEqual([row[1:] for row in copies], [row[1:] for row in sources])
+        self.assertEqual(self.options_of(row[0] for row in copies), self.options_of(row[0] for row in sources))
+        self.assertLessEqual({row[0] for row in copies}, set(search_question_ids("Salinan")))
+
+    def test_copy_to_package_appends_with_options_and_search_index(self):
+        source_ids = list(self.source.questions.order_by("-order").values_list("id", flat=True))
+        response = self.client.post(
+            reverse("question-bank-copy-many-to-package"),
+            {"question_ids": source_ids, "target_package_id": self.target.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        new_ids = [question["id"] for question in response.data]
+        self.assertEqual(
+            list(QuizQuestion.objects.filter(id__in=new_ids).order_by("order").values_list("id", "order")),
+            list(zip(new_ids, [2, 3, 4])),
+        )
+        self.assertEqual(self.options_of(new_ids), self.options_of(source_ids))
+        self.assertEqual(set(search_question_ids("Tujuan")), set(self.target.questions.values_list("id", flat=True)))
+
+        single = self.client.post(
+            reverse("question-bank-copy-to-package", args=[source_ids[0]]),
+            {"target_package_id": self.target.id},
+            format="json",
+        )
+        self.assertEqual(single.status_code, 201)
+        self.assertEqual(single.data["order"], 5)
+        self.assertEqual(self.options_of([single.data["id"]]), self.options_of(source_ids[:1]))
+
+
+class QuestionOptionSyncTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.lecturer)
+        self.package = make_package(self.lecturer, questions=3)
+        self.question = self.package.questions.order_by("order").first()
+
+    def option_ids(self):
+        return dict(self.question.options.values_list("label", "id"))
+
+    def test_unchanged_labels_keep_their_option_ids(self):
+        before = self.option_ids()
+        response = self.client.patch(
+            reverse("quiz-question-detail", args=[self.question.id]),
+            {"options": [
+                {"label": "A", "body_text": "Opsi A", "is_correct": True},
+                {"label": "B", "body_text": "Opsi B diubah", "is_correct": False},
+                {"label": "C", "body_text": "Opsi C", "is_correct": False},
+                {"label": "E", "body_text": "Opsi E", "is_correct": False},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([option["label"] for option in response.data["options"]], ["A", "B", "C", "E"])
+
+        after = self.option_ids()
+        self.assertEqual({label: after[label] for label in "ABC"}, {label: before[label] for label in "ABC"})
+        self.assertNotIn("D", after)
+        self.assertNotIn(after["E"], before.values())
+        self.assertEqual(QuizOption.objects.get(id=before["B"]).body_text, "Opsi B diubah")
+
+    def test_reorder_rewrites_all_orders(self):
+        ids = list(self.package.questions.order_by("order").values_list("id", flat=True))
+        url = reverse("quiz-package-reorder-questions", args=[self.package.id])
+
+        response = self.client.post(url, {"question_ids": ids[::-1]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.package.questions.order_by("order").values_list("id", flat=True)), ids[::-1])
+        self.assertEqual(sorted(self.package.questions.values_list("order", flat=True)), [1, 2, 3])
+
+        for question_ids in (ids[:2], ids[:2] + ids[:1], ids + [0]):
+            response = self.client.post(url, {"question_ids": question_ids}, format="json")
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(self.package.questions.order_by("order").values_list("id", flat=True)), ids[::-1])
+
+
+def jpeg_with_exif(size=(40, 20)):
+    image = Image.new("RGB", size, "red")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: putar 90 derajat
+    exif[0x010F] = "Kamera Dosen"  # Make
+    exif[0x8825] = {2: (6.0, 10.0, 0.0)}  # GPSInfo: GPSLatitude
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+class MediaUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        User = get_user_model()
+        self.lecturer = User.objects.create(username="dosen", email="dosen@example.com", role="lecturer")
+
+    def stored_files(self):
+        return sorted(os.path.join(root, name) for root, _, files in os.walk(self.media_root) for name in files)
+
+    def test_identical_bytes_are_stored_once(self):
+        data = jpeg_with_exif()
+        media, created = store_upload(data, original_name="foto.jpg", user=self.lecturer)
+        self.assertTrue(created)
+        files = self.stored_files()
+        self.assertEqual(len(files), len(media.variants))
+
+        again, created = store_upload(data, original_name="lagi.jpg", user=self.lecturer)
+        self.assertFalse(created)
+        self.assertEqual(again.id, media.id)
+        self.assertEqual(QuizMedia.objects.count(), 1)
+        self.assertEqual(self.stored_files(), files)
+
+        _, created = store_upload(png_bytes("blue"), user=self.lecturer)
+        self.assertTrue(created)
+        self.assertEqual(QuizMedia.objects.count(), 2)
+
+    def test_exif_is_stripped_after_applying_orientation(self):
+        data = jpeg_with_exif()
+        with Image.open(io.BytesIO(data)) as original:
+            self.assertTrue(original.getexif())
+
+        media, _ = store_upload(data, user=self.lecturer)
+        self.assertEqual((media.width, media.height), (20, 40))
+        for info in media.variants.values():
+            with Image.open(os.path.join(self.media_root, info["path"])) as variant:
+                self.assertEqual(variant.format, "JPEG")
+                self.assertEqual(variant.size, (20, 40))
+                self.assertFalse(variant.getexif())
+                self.assertNotIn("exif", variant.info)
+                self.assertNotIn("icc_profile", variant.info)
+
+    def test_upload_endpoint_reports_deduplication(self):
+        client = APIClient()
+        client.force_authenticate(self.lecturer)
+        url = reverse("quiz-media-upload-image")
+        data = png_bytes("green")
+
+        first = client.post(url, {"file": SimpleUploadedFile("a.png", data, content_type="image/png")})
+        second = client.post(url, {"file": SimpleUploadedFile("b.png", data, content_type="image/png")})
+        self.assertEqual((first.status_code, first.data["deduplicated"]), (201, False))
+        self.assertEqual((second.status_code, second.data["deduplicated"]), (200, True))
+        self.assertEqual(second.data["url"], first.data["url"])
@@ -1,11 +1,26 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from .views import QuizPackageViewSet, QuizQuestionViewSet, QuestionBankViewSet, QuizMediaUploadViewSet
+from .views import (
+    QuizPackageViewSet,
+    QuizQuestionViewSet,
+    QuestionBankViewSet,
+    QuizMediaUploadViewSet,
+    QuizSessionViewSet,
+    quiz_media_file,
+)
 
 router = DefaultRouter()
 router.register(r"packages", QuizPackageViewSet, basename="quiz-package")
 router.register(r"questions", QuizQuestionViewSet, basename="quiz-question")
 router.register(r"question-bank", QuestionBankViewSet, basename="question-bank")
 router.register(r"media", QuizMediaUploadViewSet, basename="quiz-media")
+router.register(r"sessions", QuizSessionViewSet, basename="quiz-session")
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "media/files/<str:sha256>/<str:variant>/",
+        quiz_media_file,
+        name="quiz-media-file",
+    ),
+]
@@ -1,21 +1,63 @@
-from django.db.models import Q, Max
+from django.db.models import Case, Count, IntegerField, Q, When
+from django.db.models.functions import Now
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
 from django.core.files.storage import default_storage
-from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import action
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 
 from apps.common.permissions import IsLecturer, IsOwnerOrShared
-from .models import QuizPackage, QuizQuestion, QuizOption
-from .serializers import QuizPackageSerializer, QuizQuestionSerializer
+from . import live, payloads
+from .analytics import analyze_sessions
+from .bundles import import_package_bundle, iter_package_bundle
+from .copying import clone_package, copy_questions
+from .importer import QuestionImportError, detect_format, import_questions, parse_file, rows_from_objects
+from .media import MediaProcessingError, get_variant, store_upload, variant_url_path
+from .models import QuizMedia, QuizPackage, QuizQuestion, QuizResponse, QuizSession
+from .search import search_question_ids
+from .serializers import QuizPackageSerializer, QuizQuestionSerializer, QuizSessionSerializer
+
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
 
 
 def _is_instructor(user) -> bool:
     return getattr(user, "role", None) in {"admin", "superadmin", "lecturer"}
 
 
+def _is_truthy(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in {"1", "true", "yes"}
+
+
+def _etag_matches(request, etag: str) -> bool:
+    return etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]
+
+
+def _device_payload_response(request, compiled: dict, body_json: str, body_binary: bytes, suffix: str = ""):
+    """
+    Response payload device polling apa adanya dari cache (tanpa serializer).
+    `?encoding=binary` untuk layout biner fixed, default JSON ringkas.
+    """
+    binary = request.query_params.get("encoding") == "binary"
+    etag = f'"{compiled["revision"]}{suffix}-{"bin" if binary else "json"}"'
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    elif binary:
+        response = HttpResponse(body_binary, content_type="application/octet-stream")
+    else:
+        response = HttpResponse(body_json, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
 class QuizPackageViewSet(viewsets.ModelViewSet):
     serializer_class = QuizPackageSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -25,7 +67,10 @@ class QuizPackageViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        base_qs = QuizPackage.objects.all()
+        base_qs = QuizPackage.objects.select_related("owner").annotate(
+            question_count=Count("questions"),
+            active_question_count=Count("questions", filter=Q(questions__is_active=True)),
+        )
         if not user.is_authenticated:
             return base_qs.none()
 
@@ -39,12 +84,178 @@ class QuizPackageViewSet(viewsets.ModelViewSet):
         serializer.save(owner=self.request.user)
 
     def get_permissions(self):
-        if self.action in {"create", "update", "partial_update", "destroy"}:
+        if self.action in {
+            "create", "update", "partial_update", "destroy",
+            "clone", "import_questions", "reorder_questions", "analysis",
+            "export_bundle", "import_bundle", "device_payloads",
+        }:
             return [IsLecturer()]
         if self.action in {"retrieve"}:
             return [permissions.IsAuthenticated(), IsOwnerOrShared()]
         return super().get_permissions()
 
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """
+        Deep clone paket (milik sendiri atau shared) beserta semua pertanyaan dan opsinya.
+        Body (opsional): {"title": str}
+        """
+        package = self.get_object()
+        clone = clone_package(package, request.user, title=request.data.get("title"))
+        serializer = self.get_serializer(clone)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["get"], url_path="export")
+    def export_bundle(self, request, pk=None):
+        """Download paket (pertanyaan, opsi, gambar) sebagai bundle zip yang di-stream."""
+        package = self.get_object()
+        filename = slugify(package.title) or f"package-{package.id}"
+        response = StreamingHttpResponse(iter_package_bundle(package), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="{filename}.zip"'
+        return response
+
+    @action(detail=True, methods=["get"], url_path="payloads")
+    def device_payloads(self, request, pk=None):
+        """
+        Payload ringkas semua pertanyaan aktif untuk device polling (lihat payloads.py).
+        Query (opsional): ?encoding=binary -> header + record biner fixed.
+        """
+        package = self.get_object()
+        compiled = payloads.get_package_payloads(package.id, package.updated_at)
+        body_json = '{"v":%d,"package_id":%d,"revision":"%s","record_size":%d,"questions":[%s]}' % (
+            compiled["version"],
+            compiled["package_id"],
+            compiled["revision"],
+            payloads.RECORD_SIZE,
+            ",".join(compiled["questions"][question_id]["json"] for question_id in compiled["order"]),
+        )
+        return _device_payload_response(request, compiled, body_json, compiled["binary"])
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import-bundle",
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_bundle(self, request):
+        """
+        Buat paket baru dari bundle zip hasil export.
+        Multipart: file (.zip), title (opsional).
+        """
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "File tidak ditemukan"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            package, report, media_stats = import_package_bundle(
+                upload, request.user, request.build_absolute_uri, title=request.data.get("title")
+            )
+        except QuestionImportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if package is None:
+            return Response(report.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+        package.question_count = report.created
+        data = self.get_serializer(package).data
+        data["import"] = {**report.as_dict(), "media": media_stats}
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["get"])
+    def analysis(self, request, pk=None):
+        """
+        Analisis butir soal gabungan semua sesi selesai dari paket ini.
+        Query (opsional): since / until (YYYY-MM-DD), students=true untuk daftar skor per peserta.
+        """
+        package = self.get_object()
+        if package.owner_id != request.user.id:
+            raise ValidationError("Anda tidak memiliki akses ke paket ini.")
+
+        sessions = package.sessions.filter(status=QuizSession.STATUS_FINISHED)
+        for param, lookup in (("since", "created_at__date__gte"), ("until", "created_at__date__lte")):
+            value = request.query_params.get(param)
+            if value:
+                parsed = parse_date(value) if len(value) == 10 else None
+                if parsed is None:
+                    raise ValidationError({param: "Format tanggal harus YYYY-MM-DD."})
+                sessions = sessions.filter(**{lookup: parsed})
+        report = analyze_sessions(
+            list(sessions.order_by("created_at")),
+            include_students=_is_truthy(request.query_params.get("students")),
+        )
+        return Response(report)
+
+    @action(detail=True, methods=["post"], url_path="reorder")
+    def reorder_questions(self, request, pk=None):
+        """
+        Tulis ulang urutan seluruh pertanyaan paket dalam satu UPDATE.
+        Body: {"question_ids": [int, ...]} berisi semua pertanyaan paket sesuai urutan baru.
+        """
+        package = self.get_object()
+        if package.owner_id != request.user.id:
+            raise ValidationError("Anda tidak memiliki akses ke paket ini.")
+
+        question_ids = request.data.get("question_ids")
+        if not isinstance(question_ids, list):
+            raise ValidationError({"question_ids": "Wajib berupa list ID pertanyaan."})
+        try:
+            question_ids = [int(question_id) for question_id in question_ids]
+        except (TypeError, ValueError):
+            raise ValidationError({"question_ids": "ID pertanyaan harus berupa angka."})
+        if len(set(question_ids)) != len(question_ids):
+            raise ValidationError({"question_ids": "ID pertanyaan tidak boleh duplikat."})
+        if set(question_ids) != set(package.questions.values_list("id", flat=True)):
+            raise ValidationError({"question_ids": "Urutan harus memuat semua pertanyaan paket ini."})
+
+        if question_ids:
+            package.questions.update(
+                order=Case(
+                    *[When(id=question_id, then=position) for position, question_id in enumerate(question_ids, start=1)],
+                    output_field=IntegerField(),
+                ),
+                updated_at=Now(),
+            )
+            payloads.invalidate_packages([package.id])
+        return Response({"question_ids": question_ids})
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[JSONParser, MultiPartParser, FormParser],
+    )
+    def import_questions(self, request, pk=None):
+        """
+        Import massal pertanyaan ke paket ini.
+        Multipart: file (.csv/.json/.gift), format (opsional), dry_run, partial.
+        JSON: {"questions": [...], "dry_run": bool, "partial": bool}.
+        """
+        package = self.get_object()
+        if package.owner_id != request.user.id:
+            raise ValidationError("Anda tidak memiliki akses ke paket ini.")
+
+        upload = request.FILES.get("file")
+        try:
+            if upload:
+                fmt = request.data.get("format") or detect_format(upload.name)
+                rows = parse_file(upload.read(), fmt)
+            else:
+                rows = rows_from_objects(request.data.get("questions"))
+            report = import_questions(
+                package,
+                rows,
+                dry_run=_is_truthy(request.data.get("dry_run")),
+                allow_partial=_is_truthy(request.data.get("partial")),
+            )
+        except QuestionImportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if report.created:
+            response_status = status.HTTP_201_CREATED
+        elif report.errors:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report.as_dict(), status=response_status)
+
 
 class QuizQuestionViewSet(viewsets.ModelViewSet):
     serializer_class = QuizQuestionSerializer
@@ -94,12 +305,12 @@ class QuizQuestionViewSet(viewsets.ModelViewSet):
 class QuestionBankViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet untuk Question Bank: list/search semua pertanyaan milik user.
+    `?search=` memakai full-text index (lihat search.py), diurutkan berdasarkan relevansi.
     Endpoint custom `copy_to_package` untuk reuse pertanyaan ke paket lain.
     """
     serializer_class = QuizQuestionSerializer
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ["question_type", "difficulty_tag"]
-    search_fields = ["body_text", "explanation", "package__topic", "package__title"]
     ordering_fields = ["created_at", "order"]
 
     def get_queryset(self):
@@ -107,9 +318,34 @@ class QuestionBankViewSet(viewsets.ReadOnlyModelViewSet):
         if not _is_instructor(user):
             return QuizQuestion.objects.none()
         # Tampilkan semua pertanyaan dari paket milik user + paket shared
-        return QuizQuestion.objects.select_related("package").prefetch_related("options").filter(
+        # (join ke paket adalah FK forward, tidak menggandakan baris)
+        qs = QuizQuestion.objects.select_related("package").prefetch_related("options").filter(
             Q(package__owner=user) | Q(package__visibility=QuizPackage.VISIBILITY_SHARED)
-        ).distinct()
+        )
+        query = self.request.query_params.get("search", "").strip()
+        if query and self.action == "list":
+            qs = self._apply_search(qs, query)
+        return qs
+
+    def _apply_search(self, qs, query: str):
+        # Filter akses ikut di query index: LIMIT berlaku setelah filter
+        ranks = search_question_ids(query, visible_to=self.request.user.id)
+        if ranks is None:
+            # Database tanpa full-text index: fallback LIKE
+            return qs.filter(
+                Q(body_text__icontains=query)
+                | Q(explanation__icontains=query)
+                | Q(package__topic__icontains=query)
+                | Q(package__title__icontains=query)
+            )
+        ordered_ids = sorted(ranks, key=ranks.get)
+        if not ordered_ids:
+            return qs.none()
+        relevance = Case(
+            *[When(id=question_id, then=position) for position, question_id in enumerate(ordered_ids)],
+            output_field=IntegerField(),
+        )
+        return qs.filter(id__in=ordered_ids).order_by(relevance)
 
     @action(detail=True, methods=["post"])
     def copy_to_package(self, request, pk=None):
@@ -118,45 +354,201 @@ class QuestionBankViewSet(viewsets.ReadOnlyModelViewSet):
         Body: {"target_package_id": int}
         """
         source_question = self.get_object()
+        target_package = self._get_target_package(request)
+        [new_question] = copy_questions([source_question], target_package)
+        serializer = self.get_serializer(new_question)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path="copy_to_package")
+    def copy_many_to_package(self, request):
+        """
+        Copy banyak pertanyaan sekaligus ke paket lain, sesuai urutan question_ids.
+        Body: {"question_ids": [int], "target_package_id": int}
+        """
+        question_ids = request.data.get("question_ids")
+        if not isinstance(question_ids, list) or not question_ids:
+            raise ValidationError({"question_ids": "Wajib memilih minimal satu pertanyaan."})
+        try:
+            question_ids = list(dict.fromkeys(int(question_id) for question_id in question_ids))
+        except (TypeError, ValueError):
+            raise ValidationError({"question_ids": "ID pertanyaan harus berupa angka."})
+        target_package = self._get_target_package(request)
+
+        sources = {
+            question.id: question
+            for question in self.get_queryset().filter(id__in=question_ids)
+        }
+        missing = [question_id for question_id in question_ids if question_id not in sources]
+        if missing:
+            raise ValidationError({"question_ids": f"Pertanyaan tidak ditemukan: {missing}"})
+
+        new_questions = copy_questions([sources[question_id] for question_id in question_ids], target_package)
+        new_questions = QuizQuestion.objects.filter(
+            id__in=[question.id for question in new_questions]
+        ).prefetch_related("options")
+        serializer = self.get_serializer(new_questions, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def _get_target_package(self, request) -> QuizPackage:
         target_package_id = request.data.get("target_package_id")
         if not target_package_id:
             raise ValidationError({"target_package_id": "Wajib memilih paket tujuan."})
-        
         target_package = get_object_or_404(QuizPackage, pk=target_package_id)
         if target_package.owner_id != request.user.id:
             raise ValidationError("Anda tidak memiliki akses ke paket tujuan.")
-        
-        # Hitung order baru
-        max_order = target_package.questions.aggregate(Max("order"))["order__max"] or 0
-        new_order = max_order + 1
-        
-        # Copy question
-        new_question = QuizQuestion.objects.create(
-            package=target_package,
-            body_text=source_question.body_text,
-            explanation=source_question.explanation,
-            media_url=source_question.media_url,
-            question_type=source_question.question_type,
-            difficulty_tag=source_question.difficulty_tag,
-            order=new_order,
-            is_active=source_question.is_active,
-        )
-        
-        # Copy options
-        options_to_create = []
-        for option in source_question.options.all():
-            options_to_create.append(
-                QuizOption(
-                    question=new_question,
-                    label=option.label,
-                    body_text=option.body_text,
-                    is_correct=option.is_correct,
-                )
+        return target_package
+
+
+class QuizSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Sesi kuis live. Host (dosen) membuat sesi dari paket, membuka pertanyaan
+    satu per satu, dan meneruskan jawaban device polling lewat `answers`.
+    Peserta web mengirim jawaban sendiri ke endpoint yang sama.
+    """
+    serializer_class = QuizSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    host_actions = {"create", "advance", "close_question", "finish", "results", "analysis"}
+
+    def get_queryset(self):
+        user = self.request.user
+        qs = QuizSession.objects.select_related("package", "host")
+        if _is_instructor(user) and self.action != "answers":
+            return qs.filter(host=user)
+        # Peserta hanya melihat sesi yang sedang berjalan
+        return qs.filter(status=QuizSession.STATUS_ACTIVE)
+
+    def get_permissions(self):
+        if self.action in self.host_actions:
+            return [IsLecturer()]
+        return super().get_permissions()
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        package = serializer.validated_data["package"]
+        if package.owner_id != request.user.id and package.visibility != QuizPackage.VISIBILITY_SHARED:
+            raise ValidationError("Anda tidak memiliki akses ke paket ini.")
+        try:
+            session = live.activate(
+                package,
+                request.user,
+                class_id=serializer.validated_data.get("class_id", ""),
+                question_duration=serializer.validated_data.get("question_duration"),
             )
-        QuizOption.objects.bulk_create(options_to_create)
-        
-        serializer = self.get_serializer(new_question)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        except live.LiveSessionError as exc:
+            raise ValidationError(str(exc))
+        return Response(self.get_serializer(session).data, status=status.HTTP_201_CREATED)
+
+    def _apply(self, operation, *args) -> QuizSession:
+        session = self.get_object()
+        try:
+            operation(session, *args)
+        except live.LiveSessionError as exc:
+            raise ValidationError(str(exc))
+        return session
+
+    def _run(self, operation, *args):
+        return Response(self.get_serializer(self._apply(operation, *args)).data)
+
+    def _current_payload(self, session: QuizSession):
+        if session.status != QuizSession.STATUS_ACTIVE or session.current_question_id is None:
+            return None
+        return payloads.get_question_payload(
+            session.package_id, session.current_question_id, session.package.updated_at
+        )
+
+    @action(detail=True, methods=["post"])
+    def advance(self, request, pk=None):
+        """Buka pertanyaan berikutnya. Body (opsional): {"index": int, "duration": int detik}"""
+        try:
+            index = request.data.get("index")
+            index = int(index) if index is not None else None
+            duration = int(request.data.get("duration") or 0) or None
+        except (TypeError, ValueError):
+            raise ValidationError("index dan duration harus berupa angka.")
+        session = self._apply(live.advance, index, duration)
+        data = self.get_serializer(session).data
+        # Payload device siap di-publish ke topic polling tanpa request tambahan
+        payload = self._current_payload(session)
+        data["device_payload"] = payload["json"] if payload else None
+        return Response(data)
+
+    @action(detail=True, methods=["post"])
+    def close_question(self, request, pk=None):
+        return self._run(live.close_question)
+
+    @action(detail=True, methods=["post"])
+    def finish(self, request, pk=None):
+        return self._run(live.finish)
+
+    @action(detail=True, methods=["post"])
+    def answers(self, request, pk=None):
+        """
+        Kirim jawaban (idempotent). Body: {"answers": [{participant, label, question_id?,
+        source?, device_code?, answered_at?}]} atau satu objek jawaban.
+        Peserta non-dosen hanya bisa menjawab atas NIM akunnya sendiri.
+        """
+        session = self.get_object()
+        answers = request.data.get("answers")
+        if answers is None:
+            answers = [request.data]
+        if not isinstance(answers, list):
+            raise ValidationError({"answers": "Wajib berupa list jawaban."})
+
+        trusted = session.host_id == request.user.id
+        if not trusted:
+            nim = getattr(request.user, "nim", "")
+            if not nim:
+                raise ValidationError("Akun Anda tidak memiliki NIM.")
+            answers = [
+                {"participant": nim, "label": answer.get("label"), "question_id": answer.get("question_id"),
+                 "source": QuizResponse.SOURCE_WEB}
+                for answer in answers[:1] if isinstance(answer, dict)
+            ]
+        try:
+            report = live.submit_answers(session, answers, trusted=trusted)
+        except live.LiveSessionError as exc:
+            raise ValidationError(str(exc))
+        return Response(report.as_dict())
+
+    @action(detail=True, methods=["get"])
+    def payload(self, request, pk=None):
+        """
+        Payload ringkas pertanyaan yang sedang dibuka untuk device polling.
+        Query (opsional): ?encoding=binary -> record biner fixed.
+        """
+        session = self.get_object()
+        payload = self._current_payload(session)
+        if payload is None:
+            return Response({"error": "Belum ada pertanyaan yang dibuka."}, status=status.HTTP_404_NOT_FOUND)
+        compiled = payloads.get_package_payloads(session.package_id, session.package.updated_at)
+        return _device_payload_response(
+            request, compiled, payload["json"], payload["binary"], suffix=f"-{session.current_question_id}"
+        )
+
+    @action(detail=True, methods=["get"])
+    def results(self, request, pk=None):
+        """Distribusi jawaban. Query (opsional): ?question=<id>"""
+        session = self.get_object()
+        question_id = request.query_params.get("question")
+        try:
+            question_id = int(question_id) if question_id else None
+        except ValueError:
+            raise ValidationError({"question": "ID pertanyaan harus berupa angka."})
+        return Response(live.question_results(session, question_id))
+
+    @action(detail=True, methods=["get"])
+    def analysis(self, request, pk=None):
+        """Skor dan analisis butir soal untuk sesi yang sudah selesai."""
+        session = self.get_object()
+        if session.status != QuizSession.STATUS_FINISHED:
+            raise ValidationError("Analisis hanya tersedia untuk sesi yang sudah selesai.")
+        return Response(analyze_sessions([session]))
 
 
 class QuizMediaUploadViewSet(viewsets.ViewSet):
@@ -193,9 +585,44 @@ class QuizMediaUploadViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Simpan file
-        file_path = f"quiz_images/{request.user.id}/{file.name}"
-        saved_path = default_storage.save(file_path, file)
-        file_url = request.build_absolute_uri(default_storage.url(saved_path))
-        
-        return Response({"url": file_url}, status=status.HTTP_201_CREATED)
+        # Proses gambar (dedup hash, varian ukuran, strip metadata)
+        try:
+            media, created = store_upload(file.read(), original_name=file.name, user=request.user)
+        except MediaProcessingError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        variants = {
+            name: request.build_absolute_uri(variant_url_path(media.sha256, name))
+            for name in media.variants
+        }
+        return Response(
+            {
+                "url": variants[QuizMedia.VARIANT_DISPLAY],
+                "sha256": media.sha256,
+                "width": media.width,
+                "height": media.height,
+                "variants": variants,
+                "deduplicated": not created,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def quiz_media_file(request, sha256, variant):
+    """
+    Varian gambar soal. Path berbasis hash -> isi tidak pernah berubah, cache immutable.
+    """
+    info = get_variant(sha256, variant)
+    if not info or not default_storage.exists(info["path"]):
+        return Response({"error": "Gambar tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
+
+    etag = f'"{sha256}-{variant}"'
+    if _etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(default_storage.open(info["path"], "rb"), content_type=info["content_type"])
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return response
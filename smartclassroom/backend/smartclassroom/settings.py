@@ -168,4 +168,44 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-]
\ No newline at end of file
+]
+
+# Attendance: jumlah sesi aktif yang galeri biometriknya disimpan di memori (LRU)
+ATTENDANCE_GALLERY_CACHE_SIZE = 8
+
+# Biometric: True -> create/update dijawab 202 dan diproses oleh worker
+# `manage.py process_biometric_jobs` (wajib dijalankan, lihat API_SETUP.md)
+BIOMETRIC_ASYNC_PROCESSING = False
+
+# SIS photo proxy: cache disk foto SIS di MEDIA_ROOT/sis-photos (TTL detik, batas ukuran total byte)
+SIS_PHOTO_CACHE_TTL = 60 * 60 * 24 * 7
+SIS_PHOTO_CACHE_MAX_BYTES = 200 * 1024 * 1024
+SIS_PHOTO_MAX_AGE = 60 * 60 * 24
+# photo_url relatif (path di server SIS) di-resolve terhadap base URL ini;
+# prefix document root server SIS dibuang lebih dulu
+SIS_PHOTO_BASE_URL = "https://sis.trisakti.ac.id/"
+SIS_PHOTO_DOCUMENT_ROOT = "/var/www/html/sis/"
+
+# Jadwal SIS (hari / jam kuliah) dalam waktu lokal kampus
+SIS_SCHEDULE_TIME_ZONE = "Asia/Jakarta"
+
+# SIS pull (`manage.py pull_sis_data`): URL export dengan placeholder {program}
+SIS_PULL_URL_TEMPLATE = ""
+SIS_PULL_PROGRAMS = ["IF"]
+SIS_PULL_INTERVAL = 60 * 15
+
+# Quiz question bank: batas hasil full-text search (`?search=`)
+QUIZ_SEARCH_MAX_RESULTS = 1000
+
+# Quiz import massal (`/api/quiz/packages/<id>/import/`): batas baris per file
+QUIZ_IMPORT_MAX_ROWS = 2000
+
+# Quiz media: sisi terpanjang (px) tiap varian gambar soal
+QUIZ_MEDIA_VARIANT_SIZES = {"display": 1600, "small": 480}
+QUIZ_MEDIA_MAX_PIXELS = 40_000_000
+
+# Quiz live: jumlah sesi yang kunci jawabannya disimpan di memori (LRU),
+# toleransi latensi jawaban (detik) dan batas jawaban per request bulk
+QUIZ_LIVE_CACHE_SIZE = 16
+QUIZ_LIVE_ANSWER_GRACE_SECONDS = 2
+QUIZ_LIVE_MAX_ANSWERS_PER_REQUEST = 1000
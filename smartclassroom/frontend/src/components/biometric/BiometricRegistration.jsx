@@ -2,6 +2,7 @@ import React, { useCallback, useEffect, useRef, useState } from "react";
 import "./BiometricRegistration.css";
 import { fetchStudentData } from "../../services/studentDataService";
 import {
+  BiometricJobError,
   createBiometricRegistration,
   createFaceDataset,
   createVoiceDataset,
@@ -332,7 +333,10 @@ export default function BiometricRegistration() {
       setSaveStatus({
         loading: false,
         success: "",
-        error: "Gagal menyimpan registrasi biometrik. Periksa koneksi server.",
+        error:
+          error instanceof BiometricJobError
+            ? `Gagal menyimpan registrasi biometrik: ${error.message}`
+            : "Gagal menyimpan registrasi biometrik. Periksa koneksi server.",
       });
     }
   }, [allFacesCaptured, allVoicesCaptured, nim, studentInfo, faceCaptures, voiceRecordings]);
@@ -376,7 +380,10 @@ export default function BiometricRegistration() {
       setFaceSaveStatus({
         loading: false,
         success: "",
-        error: "Gagal menyimpan dataset wajah.",
+        error:
+          error instanceof BiometricJobError
+            ? `Gagal menyimpan dataset wajah: ${error.message}`
+            : "Gagal menyimpan dataset wajah.",
       });
     }
   }, [allFacesCaptured, nim, studentInfo, faceCaptures]);
@@ -420,7 +427,10 @@ export default function BiometricRegistration() {
       setVoiceSaveStatus({
         loading: false,
         success: "",
-        error: "Gagal menyimpan dataset suara.",
+        error:
+          error instanceof BiometricJobError
+            ? `Gagal menyimpan dataset suara: ${error.message}`
+            : "Gagal menyimpan dataset suara.",
       });
     }
   }, [allVoicesCaptured, nim, studentInfo, voiceRecordings]);
@@ -1032,6 +1032,58 @@ export async function getStudentAllCoursesAttendance(nim) {
   }
 }
 
+/**
+ * URL foto mahasiswa lewat proxy + cache disk backend
+ * @param {string} nim - NIM mahasiswa
+ * @param {string} [version] - hash foto (ETag) untuk URL yang bisa di-cache permanen
+ * @returns {string} URL <img src>
+ */
+export function getStudentPhotoUrl(nim, version = null) {
+  const query = version ? `?v=${encodeURIComponent(version)}` : '';
+  return `${ATTENDANCE_API}/photos/students/${encodeURIComponent(nim)}/${query}`;
+}
+
+/**
+ * URL foto dosen lewat proxy + cache disk backend
+ * @param {string} lecturerId - ID dosen (StaffId)
+ * @param {string} [version] - hash foto (ETag) untuk URL yang bisa di-cache permanen
+ * @returns {string} URL <img src>
+ */
+export function getLecturerPhotoUrl(lecturerId, version = null) {
+  const query = version ? `?v=${encodeURIComponent(version)}` : '';
+  return `${ATTENDANCE_API}/photos/lecturers/${encodeURIComponent(lecturerId)}/${query}`;
+}
+
+// Roster per kelas yang sudah dimuat (classId -> { etag, roster })
+const rosterCache = new Map();
+
+/**
+ * Get roster ringkas satu kelas SIS (revalidasi dengan ETag, 304 = pakai cache)
+ * @param {string} classId - ID kelas SIS (IdCourse_KodeKelas)
+ * @returns {Promise<Array>} [{ nim, name, photo, biometric }]
+ */
+export async function getClassRoster(classId) {
+  const cached = rosterCache.get(classId);
+  const response = await fetch(`${ATTENDANCE_API}/classes/${encodeURIComponent(classId)}/roster/`, {
+    headers: cached ? { 'If-None-Match': cached.etag } : {},
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.roster;
+  }
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const data = await response.json();
+  const roster = data.students.map((row) => {
+    const student = Object.fromEntries(data.fields.map((field, index) => [field, row[index]]));
+    return { ...student, photo: student.photo ? `${API_BASE_URL}${student.photo}` : null };
+  });
+  rosterCache.set(classId, { etag: response.headers.get('ETag'), roster });
+  return roster;
+}
+
 export default {
   ATTENDANCE_STATUS,
   ATTENDANCE_STATUS_LABEL,
@@ -1057,4 +1109,8 @@ export default {
   getStudentEnrollments,
   getStudentCourseAttendance,
   getStudentAllCoursesAttendance,
+  // SIS photo proxy
+  getStudentPhotoUrl,
+  getLecturerPhotoUrl,
+  getClassRoster,
 };
@@ -6,6 +6,32 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || "http://localhost:8000";
 const BIOMETRIC_API = `${API_BASE_URL}/api/attendance/biometric-registrations`;
 const BIOMETRIC_FACE_API = `${API_BASE_URL}/api/attendance/biometric-face-datasets`;
 const BIOMETRIC_VOICE_API = `${API_BASE_URL}/api/attendance/biometric-voice-datasets`;
+const BIOMETRIC_JOB_API = `${API_BASE_URL}/api/attendance/biometric-jobs`;
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 2 * 60 * 1000;
+
+/**
+ * Job biometrik gagal (validasi / decode di worker) atau belum selesai sampai timeout
+ */
+export class BiometricJobError extends Error {
+  constructor(message, job) {
+    super(message);
+    this.name = "BiometricJobError";
+    this.job = job;
+  }
+}
+
+function formatJobError(error) {
+  if (!error) return "Pemrosesan biometrik gagal.";
+  if (typeof error === "string") return error;
+  if (error.message) return error.message;
+  // Error validasi serializer: {field: [pesan, ...]}
+  return Object.entries(error)
+    .map(([field, messages]) => `${field}: ${[].concat(messages).join(" ")}`)
+    .join("; ");
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 async function apiRequest(endpoint = "", options = {}, baseUrl = BIOMETRIC_API) {
   const url = `${baseUrl}${endpoint}`;
@@ -25,25 +51,52 @@ async function apiRequest(endpoint = "", options = {}, baseUrl = BIOMETRIC_API)
   return response.json();
 }
 
-export async function createBiometricRegistration(payload) {
-  return apiRequest("/", {
+// Create/update diproses di background; response berisi job id untuk polling status
+export async function getBiometricJob(jobId) {
+  return apiRequest(`/${jobId}/`, {}, BIOMETRIC_JOB_API);
+}
+
+/**
+ * Poll job sampai completed / failed. Failed -> BiometricJobError berisi pesan dari worker.
+ */
+export async function waitForBiometricJob(job, { interval = JOB_POLL_INTERVAL_MS, timeout = JOB_POLL_TIMEOUT_MS } = {}) {
+  const deadline = Date.now() + timeout;
+  let current = job;
+  while (current.status !== "completed") {
+    if (current.status === "failed") {
+      throw new BiometricJobError(formatJobError(current.error), current);
+    }
+    if (Date.now() > deadline) {
+      throw new BiometricJobError("pemrosesan belum selesai, cek kembali beberapa saat lagi.", current);
+    }
+    await sleep(interval);
+    current = await getBiometricJob(current.id);
+  }
+  return current;
+}
+
+// Mode async (202 + job) menunggu job selesai; mode sync langsung mengembalikan objek
+async function submitBiometric(baseUrl, payload) {
+  const data = await apiRequest("/", {
     method: "POST",
     body: JSON.stringify(payload),
-  });
+  }, baseUrl);
+  if (data && data.status_url && data.status) {
+    return waitForBiometricJob(data);
+  }
+  return data;
+}
+
+export async function createBiometricRegistration(payload) {
+  return submitBiometric(BIOMETRIC_API, payload);
 }
 
 export async function createFaceDataset(payload) {
-  return apiRequest("/", {
-    method: "POST",
-    body: JSON.stringify(payload),
-  }, BIOMETRIC_FACE_API);
+  return submitBiometric(BIOMETRIC_FACE_API, payload);
 }
 
 export async function createVoiceDataset(payload) {
-  return apiRequest("/", {
-    method: "POST",
-    body: JSON.stringify(payload),
-  }, BIOMETRIC_VOICE_API);
+  return submitBiometric(BIOMETRIC_VOICE_API, payload);
 }
 
 export async function getBiometricRegistrations(filters = {}) {
@@ -58,5 +111,7 @@ export default {
   createBiometricRegistration,
   createFaceDataset,
   createVoiceDataset,
+  getBiometricJob,
+  waitForBiometricJob,
   getBiometricRegistrations,
 };
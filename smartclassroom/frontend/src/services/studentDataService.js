@@ -4,6 +4,9 @@
 
 import { parseNIM } from '../utils/nimParser';
 
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+const LOOKUP_API = `${API_BASE_URL}/api/attendance/students/lookup/`;
+
 const CACHE_KEY = 'studentDataCache';
 const CACHE_VERSION = 'v2';
 const CACHE_EXPIRY_DAYS = 7;
@@ -178,20 +181,63 @@ export async function fetchStudentData(nim) {
   return fetchPromise;
 }
 
+/**
+ * Batch lookup nama + foto dari database SIS backend (satu request)
+ * Foto dikembalikan sebagai URL photo proxy backend
+ */
+export async function lookupStudents(nims) {
+  const response = await fetch(LOOKUP_API, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ nims }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const data = await response.json();
+  return data.students || {};
+}
+
 /**
  * Batch fetch multiple students dengan rate limiting
- * Max concurrent requests: 5
+ * Backend lookup dulu; sisanya ke SIS API dengan max 5 concurrent requests
  */
 export async function fetchMultipleStudents(nims, onProgress = null) {
   const MAX_CONCURRENT = 5;
   const results = new Map();
 
   // Filter out NIMs already in cache with photo
-  const nimsToFetch = nims.filter((nim) => {
+  let nimsToFetch = nims.filter((nim) => {
     const cached = getStudentFromCache(nim);
     return !cached || !cached.photo;
   });
 
+  if (nimsToFetch.length > 0) {
+    try {
+      const found = await lookupStudents(nimsToFetch);
+      const cache = getCache();
+      for (const [nim, student] of Object.entries(found)) {
+        if (!student.photo) continue;
+        const studentData = {
+          nim,
+          name: student.name || null,
+          photo: `${API_BASE_URL}${student.photo}`,
+          fetchedAt: Date.now(),
+        };
+        memoryCache.set(nim, studentData);
+        cache[nim] = studentData;
+      }
+      saveCache(cache);
+      nimsToFetch = nimsToFetch.filter((nim) => !found[nim]?.photo);
+    } catch (error) {
+      console.warn('Student lookup failed, falling back to SIS API:', error);
+    }
+  }
+
   if (nimsToFetch.length === 0) {
     // All in cache
     return new Map(nims.map((nim) => [nim, getStudentFromCache(nim)]));